@@ -0,0 +1,322 @@
+"""Local stand-ins for the OMDb API and the Google Sheets/Drive endpoints.
+
+Both servers keep their data in memory, count the requests they receive
+and can delay every response to simulate network latency.
+"""
+
+import csv
+import io
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlparse
+
+import requests
+
+from sheepy.spreadsheet.sheet_config import COLUMNS
+
+SPREADSHEET_ID = "benchmark"
+WORKSHEET_TITLE = "Sheepy"
+SEARCH_RESULTS = 25
+# prefixes of Google endpoints rewritten to the fake server
+GOOGLE_HOSTS = {
+    "https://sheets.googleapis.com": "/sheets",
+    "https://www.googleapis.com": "/drive",
+    "https://docs.google.com": "/docs",
+}
+
+_A1_PATTERN = re.compile(r"^([A-Z]*)(\d*)$")
+
+
+class FakeServer(ThreadingHTTPServer):
+    """Threaded HTTP server on localhost counting requests per category
+
+    Args:
+        ThreadingHTTPServer: Handles every request in its own thread
+    """
+
+    daemon_threads = True
+
+    def __init__(self, handler: type[BaseHTTPRequestHandler], latency: float) -> None:
+        super(FakeServer, self).__init__(("127.0.0.1", 0), handler)
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        self._calls_lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, category: str) -> None:
+        with self._calls_lock:
+            self.calls[category] += 1
+
+    def __enter__(self) -> "FakeServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeServer
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+    def _read_json(self) -> dict[str, Any]:
+        length: int = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        time.sleep(self.server.latency)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, body: dict[str, Any]) -> None:
+        self._send(status, json.dumps(body).encode(), "application/json")
+
+
+def fake_movie(imdb_id: str, title: str | None = None, year: str = "1982") -> dict:
+    """Builds an OMDb response for a made up movie"""
+    return {
+        "Title": title or f"Movie {imdb_id}",
+        "Year": year,
+        "Runtime": "117 min",
+        "Genre": "Action, Drama, Sci-Fi",
+        "Director": "Ridley Scott",
+        "Plot": "A blade runner must pursue and terminate four replicants.",
+        "Poster": "https://m.media-amazon.com/images/poster.jpg",
+        "Ratings": [{"Source": "Rotten Tomatoes", "Value": "89%"}],
+        "imdbRating": "8.1",
+        "imdbID": imdb_id,
+        "Response": "True",
+    }
+
+
+def fake_search(query: str, page: int) -> dict:
+    """Builds a page of OMDb search results for a made up query"""
+    start: int = (page - 1) * 10
+    if start >= SEARCH_RESULTS:
+        return {"Response": "False", "Error": "Movie not found!"}
+    return {
+        "Search": [
+            {
+                "Title": f"{query} {i}",
+                "Year": "1982",
+                "imdbID": f"tt9{i:06d}",
+                "Type": "movie",
+                "Poster": "https://m.media-amazon.com/images/poster.jpg",
+            }
+            for i in range(start, min(start + 10, SEARCH_RESULTS))
+        ],
+        "totalResults": str(SEARCH_RESULTS),
+        "Response": "True",
+    }
+
+
+class FakeOmdbHandler(_Handler):
+    """Answers OMDb lookups by IMDb ID (i=), by title and year (t=, y=)
+    and searches (s=, page=) with SEARCH_RESULTS results
+    """
+
+    def do_GET(self) -> None:
+        query = parse_qs(urlparse(self.path).query)
+        self.server.count("omdb")
+        if "i" in query:
+            self._send_json(200, fake_movie(query["i"][0]))
+        elif "t" in query:
+            title: str = query["t"][0]
+            year: str = query.get("y", ["1982"])[0]
+            imdb_id: str = f"tt{abs(hash((title, year))) % 10**7:07d}"
+            self._send_json(200, fake_movie(imdb_id, title, year))
+        elif "s" in query:
+            self._send_json(200, fake_search(query["s"][0], int(query["page"][0])))
+        else:
+            self._send_json(200, {"Response": "False", "Error": "Incorrect IMDb ID."})
+
+
+class FakeGoogleServer(FakeServer):
+    """Fake Sheets, Drive and export endpoints for one spreadsheet
+    with one worksheet, holding the worksheet values in memory
+    """
+
+    def __init__(self, latency: float, rows: int = 0) -> None:
+        super(FakeGoogleServer, self).__init__(FakeGoogleHandler, latency)
+        self.values: list[list[Any]] = [list(COLUMNS)]
+        self.values += [fake_row(i) for i in range(rows)]
+        self.version: int = 1
+        self.lock = threading.Lock()
+
+    def metadata(self) -> dict[str, Any]:
+        return {
+            "spreadsheetId": SPREADSHEET_ID,
+            "properties": {"title": "Sheepy_Spreadsheet", "locale": "en_US"},
+            "sheets": [
+                {
+                    "properties": {
+                        "sheetId": 0,
+                        "title": WORKSHEET_TITLE,
+                        "index": 0,
+                        "sheetType": "GRID",
+                        "gridProperties": {
+                            "rowCount": max(1000, len(self.values)),
+                            "columnCount": 20,
+                        },
+                    }
+                }
+            ],
+        }
+
+
+def fake_row(i: int) -> list[str]:
+    """Builds worksheet row for a made up movie"""
+    movie = fake_movie(f"tt{i:07d}")
+    return [
+        "FALSE",
+        movie["Title"],
+        movie["Year"],
+        movie["Genre"],
+        movie["Runtime"],
+        "Benchmark",
+        movie["imdbRating"],
+        "89%",
+        movie["Director"],
+        movie["Plot"],
+        f'=IMAGE("{movie["Poster"]}")',
+    ]
+
+
+def _column_index(letters: str) -> int:
+    index: int = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+
+def _parse_range(range_name: str) -> tuple[int, int | None, int, int | None]:
+    # returns zero-based first row, end row, first column and end column
+    cells: str = unquote(range_name).split("!")[-1]
+    start, _, end = cells.partition(":")
+    start_match = _A1_PATTERN.match(start)
+    end_match = _A1_PATTERN.match(end or start)
+    assert start_match is not None and end_match is not None, range_name
+    start_col, start_row = start_match.groups()
+    end_col, end_row = end_match.groups()
+    return (
+        int(start_row) - 1 if start_row else 0,
+        int(end_row) if end_row else None,
+        _column_index(start_col) if start_col else 0,
+        _column_index(end_col) + 1 if end_col else None,
+    )
+
+
+class FakeGoogleHandler(_Handler):
+    """Routes rewritten Google requests to the fake spreadsheet"""
+
+    server: FakeGoogleServer
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        sheets_prefix = f"/sheets/v4/spreadsheets/{SPREADSHEET_ID}"
+        if url.path == sheets_prefix:
+            self.server.count("sheets")
+            self._send_json(200, self.server.metadata())
+        elif url.path.startswith(f"{sheets_prefix}/values/"):
+            self.server.count("sheets")
+            self._send_json(200, self._get_values(url.path, query))
+        elif url.path == f"/drive/drive/v3/files/{SPREADSHEET_ID}":
+            self.server.count("drive")
+            self._send_json(200, {"version": str(self.server.version)})
+        elif url.path in (
+            f"/docs/spreadsheets/d/{SPREADSHEET_ID}/export",
+            f"/drive/drive/v3/files/{SPREADSHEET_ID}/export",
+        ):
+            self.server.count("export")
+            self._send(200, self._export_csv(), "text/csv")
+        else:
+            self.server.count("unknown")
+            self._send_json(404, {"error": {"code": 404, "message": url.path}})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        payload: dict[str, Any] = self._read_json()
+        sheets_prefix = f"/sheets/v4/spreadsheets/{SPREADSHEET_ID}"
+        self.server.count("sheets")
+        if url.path == f"{sheets_prefix}:batchUpdate":
+            with self.server.lock:
+                self.server.version += 1
+            self._send_json(200, {"spreadsheetId": SPREADSHEET_ID, "replies": []})
+        elif url.path.endswith(":append"):
+            with self.server.lock:
+                first_row: int = len(self.server.values) + 1
+                self.server.values += payload.get("values", [])
+                last_row: int = len(self.server.values)
+                self.server.version += 1
+            self._send_json(
+                200,
+                {
+                    "updates": {
+                        "updatedRange": f"'{WORKSHEET_TITLE}'!A{first_row}:K{last_row}"
+                    }
+                },
+            )
+        else:
+            self._send_json(404, {"error": {"code": 404, "message": url.path}})
+
+    def do_PUT(self) -> None:
+        self._read_json()
+        self.server.count("sheets")
+        with self.server.lock:
+            self.server.version += 1
+        self._send_json(200, {"spreadsheetId": SPREADSHEET_ID})
+
+    def _get_values(self, path: str, query: dict[str, list[str]]) -> dict[str, Any]:
+        range_name: str = path.rsplit("/", 1)[-1]
+        first_row, end_row, first_col, end_col = _parse_range(range_name)
+        with self.server.lock:
+            rows = [row[first_col:end_col] for row in self.server.values]
+        rows = rows[first_row:end_row]
+        dimension: str = query.get("majorDimension", ["ROWS"])[0]
+        if dimension == "COLUMNS":
+            width: int = max((len(row) for row in rows), default=0)
+            rows = [
+                [row[i] if i < len(row) else "" for row in rows] for i in range(width)
+            ]
+        return {
+            "range": unquote(range_name),
+            "majorDimension": dimension,
+            "values": rows,
+        }
+
+    def _export_csv(self) -> bytes:
+        out = io.StringIO()
+        with self.server.lock:
+            csv.writer(out).writerows(self.server.values)
+        return out.getvalue().encode()
+
+
+class RedirectSession(requests.Session):
+    """Session sending requests for Google endpoints to the fake server"""
+
+    def __init__(self, base_url: str) -> None:
+        super(RedirectSession, self).__init__()
+        self.base_url = base_url
+
+    def request(self, method: str, url: str, *args: Any, **kwargs: Any) -> Any:
+        for host, prefix in GOOGLE_HOSTS.items():
+            if url.startswith(host):
+                url = f"{self.base_url}{prefix}{url[len(host) :]}"
+                break
+        return super(RedirectSession, self).request(method, url, *args, **kwargs)
@@ -0,0 +1,236 @@
+"""Load tests of sheet insert paths against the in-memory spreadsheet backend.
+
+Usage:
+    python -m benchmarks.load [--rows N] [--repeat N] [--latency SECONDS]
+                              [--rate-limit FRACTION] [--json]
+
+The worksheet is filled with --rows movies before the scenarios run, so
+inserts can be measured at sheet sizes that are impractical against Google.
+With --rate-limit a fraction of requests is answered with 429, failed runs
+are counted instead of measured.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import tempfile
+import time
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from typing import Any
+from unittest import mock
+
+import gspread
+import requests
+from tabulate import tabulate
+
+from benchmarks.fake_servers import SPREADSHEET_ID, WORKSHEET_TITLE, fake_row
+from benchmarks.run import Scenario, _percentile
+
+LOAD_ROWS = 100_000
+BULK_SIZE = 50
+
+
+@dataclass
+class LoadResult:
+    """Measurements of one scenario against the in-memory backend"""
+
+    scenario: str
+    runs: int
+    failed: int
+    p50: float
+    p95: float
+    calls: float
+    operations: dict[str, float]
+
+
+@contextlib.contextmanager
+def load_environment(rows: int) -> Iterator[tuple[Any, str]]:
+    """Creates an in-memory spreadsheet filled with movies
+
+    Args:
+        rows (int): number of movies in the worksheet
+
+    Yields:
+        tuple[InMemorySheets, str]: backend and temporary working directory
+    """
+    from sheepy.spreadsheet.memory import InMemorySheets
+    from sheepy.spreadsheet.sheet_config import COLUMNS
+    from sheepy.util import file
+
+    backend = InMemorySheets(seed=0)
+    backend.create_spreadsheet(SPREADSHEET_ID, worksheet=WORKSHEET_TITLE)
+    backend.add_rows(SPREADSHEET_ID, [list(COLUMNS)])
+    backend.add_rows(SPREADSHEET_ID, [fake_row(i) for i in range(rows)])
+    with (
+        tempfile.TemporaryDirectory() as tmp_dir,
+        mock.patch.object(file, "CACHE_DIR", tmp_dir),
+    ):
+        yield backend, tmp_dir
+
+
+def build_scenarios(backend: Any, tmp_dir: str) -> list[Scenario]:
+    """Builds load test scenarios
+
+    Args:
+        backend (InMemorySheets): backend holding the spreadsheet
+        tmp_dir (str): directory for downloaded files
+
+    Returns:
+        list[Scenario]: scenarios in order of execution
+    """
+    from sheepy.spreadsheet.memory import memory_client
+    from sheepy.spreadsheet.sheet_config import COLUMNS
+    from sheepy.spreadsheet.spreadsheet import SheepySpreadsheet
+
+    client: gspread.Client = memory_client(backend)
+    ss = SheepySpreadsheet(SPREADSHEET_ID, "0", client=client)
+    csv_file: str = os.path.join(tmp_dir, "sheepy.csv")
+
+    def movies(i: int, count: int) -> list[dict[str, str]]:
+        return [
+            dict(zip(COLUMNS, fake_row(i * count + j), strict=True))
+            for j in range(count)
+        ]
+
+    return [
+        Scenario("open", lambda i: SheepySpreadsheet(SPREADSHEET_ID, "0", client)),
+        Scenario("add", lambda i: ss.add_rows_to_sheet(movies(i, 1))),
+        Scenario(
+            "add (free row)",
+            lambda i: ss.add_rows_to_sheet(movies(i, 1), append=False),
+        ),
+        Scenario(
+            f"bulk add ({BULK_SIZE})",
+            lambda i: ss.add_rows_to_sheet(movies(i, BULK_SIZE)),
+        ),
+        Scenario("read rows", lambda i: ss.read_rows()),
+        Scenario("dl", lambda i: ss.download_csv(csv_file, force=True)),
+    ]
+
+
+def run_scenario(scenario: Scenario, repeat: int, backend: Any) -> LoadResult:
+    """Runs scenario repeatedly and measures it
+
+    Args:
+        scenario (Scenario): scenario to run
+        repeat (int): number of runs
+        backend (InMemorySheets): backend counting requests
+
+    Returns:
+        LoadResult: measurements of scenario
+    """
+    backend.reset_calls()
+    durations: list[float] = []
+    failed: int = 0
+    for i in range(repeat):
+        start: float = time.perf_counter()
+        try:
+            scenario.run(i)
+        except (gspread.exceptions.APIError, requests.HTTPError):
+            failed += 1
+            continue
+        durations.append(time.perf_counter() - start)
+    return LoadResult(
+        scenario=scenario.name,
+        runs=repeat,
+        failed=failed,
+        p50=_percentile(durations, 50) if durations else 0.0,
+        p95=_percentile(durations, 95) if durations else 0.0,
+        calls=backend.total_calls / repeat,
+        operations={k: v / repeat for k, v in sorted(backend.calls.items())},
+    )
+
+
+def run_load(
+    rows: int = LOAD_ROWS,
+    repeat: int = 10,
+    latency: float = 0.0,
+    rate_limit: float = 0.0,
+) -> list[LoadResult]:
+    """Runs all load test scenarios
+
+    Args:
+        rows (int, optional): number of movies in the worksheet
+        repeat (int, optional): number of runs per scenario
+        latency (float, optional): seconds every response is delayed
+        rate_limit (float, optional): fraction of requests answered with 429
+
+    Returns:
+        list[LoadResult]: measurements of all scenarios
+    """
+    with load_environment(rows) as (backend, tmp_dir):
+        scenarios: list[Scenario] = build_scenarios(backend, tmp_dir)
+        # latency and errors only apply to measured runs
+        backend.latency = latency
+        backend.rate_limit = rate_limit
+        return [run_scenario(s, repeat, backend) for s in scenarios]
+
+
+def print_results(results: list[LoadResult]) -> None:
+    """Prints results as table"""
+    print(
+        tabulate(
+            [
+                [
+                    r.scenario,
+                    r.runs,
+                    r.failed,
+                    f"{r.p50 * 1000:.1f}",
+                    f"{r.p95 * 1000:.1f}",
+                    f"{r.calls:g}",
+                    ", ".join(f"{k}={v:g}" for k, v in r.operations.items()),
+                ]
+                for r in results
+            ],
+            headers=[
+                "Scenario",
+                "Runs",
+                "Failed",
+                "p50 [ms]",
+                "p95 [ms]",
+                "Calls",
+                "Operations per run",
+            ],
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=LOAD_ROWS,
+        help=f"Movies in the worksheet (Defaults to {LOAD_ROWS})",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=10, help="Runs per scenario (Defaults to 10)"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Seconds every response is delayed (Defaults to 0)",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=0.0,
+        help="Fraction of requests answered with 429 (Defaults to 0)",
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results: list[LoadResult] = run_load(
+        args.rows, args.repeat, args.latency, args.rate_limit
+    )
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        print_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Memory and serialization time of Movie objects before and after slots.
+
+Usage:
+    python -m benchmarks.movie [--count N] [--json]
+
+The movie class from before slots is kept here as reference. Both classes
+are measured building the same movies and running the same serialization,
+build_dict, which builds the values written by add.
+"""
+
+import argparse
+import dataclasses
+import json
+import operator
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from tabulate import tabulate
+
+MOVIE_COUNT = 100_000
+
+# shared strings, so only the objects themselves are measured
+WATCHED, TITLE, GENRE, SUGGESTED_BY, DIRECTOR, PLOT, POSTER = (
+    "TRUE",
+    "Test",
+    "Horror",
+    "Jannes",
+    "Somebody",
+    "Plot",
+    "url",
+)
+
+
+class _DictRating:
+    """Rating as stored before slots, with a per-instance __dict__"""
+
+    def __init__(self, imdb_rating: str, tomatometer: str) -> None:
+        self.imdb_rating = imdb_rating
+        self.tomatometer = tomatometer
+
+
+@dataclasses.dataclass
+class _DictMovie:
+    """Movie as stored before slots, including its former build_dict"""
+
+    watched: str
+    title: str
+    year: str
+    genre: str
+    runtime: str
+    suggested_by: str
+    rating: _DictRating
+    director: str
+    plot: str
+    poster: str
+
+    def build_dict(self) -> dict[str, str]:
+        mov_dict: dict[str, str] = {}
+        rating_getter = operator.attrgetter("rating")(self)
+        for field in list(self.__dict__.items()):
+            if field[0] == "rating":
+                mov_dict["imdb_rating"] = rating_getter.imdb_rating
+                mov_dict["tomatometer"] = rating_getter.tomatometer
+                continue
+            mov_dict[field[0]] = field[1]
+        return mov_dict
+
+
+@dataclass
+class MovieResult:
+    """Measurements of one movie class"""
+
+    movie: str
+    count: int
+    memory: int
+    build_dict: float
+
+
+def _old_movie(i: int) -> Any:
+    return _DictMovie(
+        WATCHED,
+        TITLE,
+        "1992",
+        GENRE,
+        "109 min",
+        SUGGESTED_BY,
+        _DictRating("4.5", "45%"),
+        DIRECTOR,
+        PLOT,
+        POSTER,
+    )
+
+
+def _new_movie(i: int) -> Any:
+    from sheepy.model.movie import Movie
+    from sheepy.model.rating import Rating
+
+    return Movie(
+        WATCHED,
+        TITLE,
+        1992,
+        GENRE,
+        109,
+        SUGGESTED_BY,
+        Rating(4.5, 45),
+        DIRECTOR,
+        PLOT,
+        POSTER,
+    )
+
+
+def _time(movies: list[Any], serialize: Callable[[Any], Any]) -> float:
+    start: float = time.perf_counter()
+    for movie in movies:
+        serialize(movie)
+    return time.perf_counter() - start
+
+
+def measure(name: str, build: Callable[[int], Any], count: int) -> MovieResult:
+    """Builds count movies and serializes them
+
+    Args:
+        name (str): name of measured class
+        build (Callable[[int], Any]): builds the i-th movie
+        count (int): number of movies
+
+    Returns:
+        MovieResult: bytes allocated by the movies and seconds to serialize them
+    """
+    build(0)  # imports are not measured
+    tracemalloc.start()
+    movies: list[Any] = [build(i) for i in range(count)]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return MovieResult(
+        movie=name,
+        count=count,
+        memory=allocated,
+        build_dict=_time(movies, lambda m: m.build_dict()),
+    )
+
+
+def run_movie_benchmark(count: int = MOVIE_COUNT) -> list[MovieResult]:
+    """Measures movies before and after slots
+
+    Args:
+        count (int, optional): number of movies per class
+
+    Returns:
+        list[MovieResult]: measurements of both classes
+    """
+    return [
+        measure("dict (before)", _old_movie, count),
+        measure("slots", _new_movie, count),
+    ]
+
+
+def print_results(results: list[MovieResult]) -> None:
+    """Prints results as table"""
+    print(
+        tabulate(
+            [
+                [
+                    r.movie,
+                    r.count,
+                    f"{r.memory / 2**20:.1f}",
+                    f"{r.build_dict * 1000:.0f}",
+                ]
+                for r in results
+            ],
+            headers=["Movie", "Count", "Memory [MiB]", "build_dict [ms]"],
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=MOVIE_COUNT,
+        help=f"Movies per class (Defaults to {MOVIE_COUNT})",
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results: list[MovieResult] = run_movie_benchmark(args.count)
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        print_results(results)
+
+
+if __name__ == "__main__":
+    main()
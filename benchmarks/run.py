@@ -0,0 +1,336 @@
+"""End-to-end benchmarks of sheepy commands against local fake servers.
+
+Usage:
+    python -m benchmarks.run [--latency SECONDS] [--repeat N] [--json]
+                             [--save FILE] [--compare FILE] [--tolerance FRACTION]
+
+Every scenario runs the same code as the CLI, only the OMDb and Google
+endpoints are replaced by the servers in benchmarks.fake_servers.
+Reports wall time, p50/p95 latency and API round trips per run.
+With --compare the run fails if a scenario needs more round trips than the
+saved baseline or its p50 latency grew by more than the tolerance.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass
+from typing import Any
+from unittest import mock
+
+import gspread
+from tabulate import tabulate
+
+from benchmarks.fake_servers import (
+    SPREADSHEET_ID,
+    FakeGoogleServer,
+    FakeOmdbHandler,
+    FakeServer,
+    RedirectSession,
+)
+
+BULK_SIZE = 50
+IMPORT_SIZE = 100
+
+
+@dataclass
+class Scenario:
+    """Benchmarked operation, run is called with the number of the run"""
+
+    name: str
+    run: Callable[[int], Any]
+    setup: Callable[[], Any] | None = None
+
+
+@dataclass
+class Result:
+    """Measurements of one scenario"""
+
+    scenario: str
+    runs: int
+    wall: float
+    p50: float
+    p95: float
+    omdb_calls: float
+    google_calls: float
+
+
+@contextlib.contextmanager
+def fake_environment(
+    latency: float, rows: int = 100
+) -> Iterator[tuple[FakeServer, FakeGoogleServer, str]]:
+    """Starts fake servers and points sheepy at them
+
+    Args:
+        latency (float): seconds every fake response is delayed
+        rows (int, optional): number of movies already in the worksheet
+
+    Yields:
+        tuple[FakeServer, FakeGoogleServer, str]: OMDb server, Google server
+         and temporary working directory
+    """
+    from sheepy.omdb import api
+    from sheepy.omdb.quota import OmdbQuota
+    from sheepy.util import file
+
+    with (
+        FakeServer(FakeOmdbHandler, latency) as omdb,
+        FakeGoogleServer(latency, rows) as google,
+        tempfile.TemporaryDirectory() as tmp_dir,
+        mock.patch.dict(
+            os.environ,
+            {
+                "SPREADSHEET_ID": SPREADSHEET_ID,
+                "WORKSHEET_INDEX": "0",
+                "OMDB_API_KEY": "benchmark",
+                "SUGGESTED_BY": "Benchmark",
+            },
+        ),
+        mock.patch.object(file, "CACHE_DIR", tmp_dir),
+        mock.patch.object(api, "URL", f"{omdb.url}/?apikey="),
+        mock.patch.object(api, "_cache", None),
+        mock.patch.object(api, "_cache_enabled", False),
+        mock.patch.object(
+            api, "_quota", OmdbQuota(daily_limit=10**9, rate_limit=10**9)
+        ),
+        mock.patch.object(
+            gspread,
+            "service_account",
+            lambda *args, **kwargs: gspread.Client(
+                None,  # type: ignore
+                session=RedirectSession(google.url),
+            ),
+        ),
+    ):
+        yield omdb, google, tmp_dir
+
+
+def build_scenarios(tmp_dir: str) -> list[Scenario]:
+    """Builds benchmarked scenarios
+
+    Args:
+        tmp_dir (str): directory for downloaded and imported files
+
+    Returns:
+        list[Scenario]: scenarios in order of execution
+    """
+    from sheepy import core
+    from sheepy.omdb import api
+
+    ss = core.get_env_spreadsheet()
+    csv_file: str = os.path.join(tmp_dir, "sheepy.csv")
+    import_file: str = os.path.join(tmp_dir, "import.csv")
+    with open(import_file, "w") as f:
+        f.writelines(f"Movie {i},{1950 + i % 70}\n" for i in range(IMPORT_SIZE))
+
+    def download_unchanged(i: int) -> None:
+        core.download_csv(core.get_env_spreadsheet(), csv_file)
+
+    return [
+        Scenario("open", lambda i: core.get_env_spreadsheet()),
+        Scenario("view", lambda i: core.view_movie_info(f"tt{i:07d}")),
+        Scenario("find", lambda i: core.find_movies(f"Movie {i}")),
+        Scenario(
+            "view (cached)",
+            lambda i: core.view_movie_info("tt0083658"),
+            setup=lambda: api.configure_cache(enabled=True),
+        ),
+        Scenario(
+            "add",
+            lambda i: core.add_movie_to_sheet(
+                core.get_env_spreadsheet(), f"tt1{i:06d}"
+            ),
+            setup=lambda: api.configure_cache(enabled=False),
+        ),
+        Scenario(
+            "clipboard add", lambda i: core._add_from_clipboard(ss, [f"tt2{i:06d}"])
+        ),
+        Scenario(
+            f"bulk add ({BULK_SIZE})",
+            lambda i: core.add_movies_to_sheet(
+                ss, [f"tt3{i:03d}{j:03d}" for j in range(BULK_SIZE)]
+            ),
+        ),
+        Scenario(
+            f"import ({IMPORT_SIZE})",
+            lambda i: core.import_movies(ss, import_file, restart=True),
+        ),
+        Scenario("dl", lambda i: core.download_csv(ss, csv_file, force=True)),
+        Scenario("dl (unchanged)", download_unchanged),
+        Scenario("sync", lambda i: core.sync_mirror(ss, force=True)),
+        Scenario(
+            "search",
+            lambda i: core.search_movies(
+                False, ["drama"], ["scott"], {"year": (1980, 1990)}
+            ),
+        ),
+    ]
+
+
+def _percentile(durations: list[float], percent: int) -> float:
+    if len(durations) < 2:
+        return durations[0]
+    return statistics.quantiles(durations, n=100, method="inclusive")[percent - 1]
+
+
+def run_scenario(
+    scenario: Scenario, repeat: int, omdb: FakeServer, google: FakeServer
+) -> Result:
+    """Runs scenario repeatedly and measures it
+
+    Args:
+        scenario (Scenario): scenario to run
+        repeat (int): number of measured runs
+        omdb (FakeServer): fake OMDb server
+        google (FakeServer): fake Google server
+
+    Returns:
+        Result: measurements of scenario
+    """
+    if scenario.setup is not None:
+        scenario.setup()
+    omdb_before: int = omdb.calls.total()
+    google_before: int = google.calls.total()
+    durations: list[float] = []
+    start: float = time.perf_counter()
+    for i in range(repeat):
+        run_start: float = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            scenario.run(i)
+        durations.append(time.perf_counter() - run_start)
+    return Result(
+        scenario=scenario.name,
+        runs=repeat,
+        wall=time.perf_counter() - start,
+        p50=_percentile(durations, 50),
+        p95=_percentile(durations, 95),
+        omdb_calls=(omdb.calls.total() - omdb_before) / repeat,
+        google_calls=(google.calls.total() - google_before) / repeat,
+    )
+
+
+def run_benchmarks(latency: float = 0.05, repeat: int = 10) -> list[Result]:
+    """Runs all scenarios against fake servers
+
+    Args:
+        latency (float, optional): seconds every fake response is delayed
+        repeat (int, optional): number of measured runs per scenario
+
+    Returns:
+        list[Result]: measurements of all scenarios
+    """
+    with fake_environment(latency) as (omdb, google, tmp_dir):
+        # first open stores sheet metadata, as after the first run of the CLI
+        scenarios: list[Scenario] = build_scenarios(tmp_dir)
+        return [run_scenario(s, repeat, omdb, google) for s in scenarios]
+
+
+def compare(
+    results: list[Result], baseline: list[dict[str, Any]], tolerance: float
+) -> list[str]:
+    """Compares results with a saved baseline
+
+    Args:
+        results (list[Result]): current measurements
+        baseline (list[dict[str, Any]]): saved measurements
+        tolerance (float): allowed relative growth of p50 latency
+
+    Returns:
+        list[str]: descriptions of regressions
+    """
+    saved: dict[str, dict[str, Any]] = {r["scenario"]: r for r in baseline}
+    regressions: list[str] = []
+    for result in results:
+        old = saved.get(result.scenario)
+        if old is None:
+            continue
+        for calls in ("omdb_calls", "google_calls"):
+            if getattr(result, calls) > old[calls]:
+                regressions.append(
+                    f"{result.scenario}: {calls} {old[calls]} -> "
+                    f"{getattr(result, calls)}"
+                )
+        if result.p50 > old["p50"] * (1 + tolerance):
+            regressions.append(
+                f"{result.scenario}: p50 {old['p50'] * 1000:.1f} ms -> "
+                f"{result.p50 * 1000:.1f} ms"
+            )
+    return regressions
+
+
+def print_results(results: list[Result]) -> None:
+    """Prints results as table"""
+    print(
+        tabulate(
+            [
+                [
+                    r.scenario,
+                    r.runs,
+                    f"{r.wall:.2f}",
+                    f"{r.p50 * 1000:.1f}",
+                    f"{r.p95 * 1000:.1f}",
+                    f"{r.omdb_calls:g}",
+                    f"{r.google_calls:g}",
+                ]
+                for r in results
+            ],
+            headers=[
+                "Scenario",
+                "Runs",
+                "Wall [s]",
+                "p50 [ms]",
+                "p95 [ms]",
+                "OMDb calls",
+                "Google calls",
+            ],
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="Seconds every fake response is delayed (Defaults to 0.05)",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=10, help="Runs per scenario (Defaults to 10)"
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--save", type=str, help="Save results as baseline")
+    parser.add_argument("--compare", type=str, help="Compare with saved baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed growth of p50 latency compared to baseline (Defaults to 0.2)",
+    )
+    args = parser.parse_args()
+
+    results: list[Result] = run_benchmarks(args.latency, args.repeat)
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        print_results(results)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions: list[str] = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions:", *regressions, sep="\n  ")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
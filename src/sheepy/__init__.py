@@ -1,14 +1,21 @@
 # ruff: noqa
-from dotenv import load_dotenv
+from typing import Any
 
-load_dotenv()
+__all__ = [
+    "add_movie_to_sheet",
+    "add_movies_to_sheet",
+    "create_new_sheet",
+    "download_csv",
+    "get_env_spreadsheet",
+    "view_movie_info",
+    "watch_clipboard",
+]
 
 
-from sheepy.core import (
-    add_movie_to_sheet,
-    create_new_sheet,
-    download_csv,
-    get_env_spreadsheet,
-    view_movie_info,
-    watch_clipboard,
-)
+def __getattr__(name: str) -> Any:
+    # import core lazily so that importing sheepy stays cheap
+    if name in __all__:
+        from sheepy import core
+
+        return getattr(core, name)
+    raise AttributeError(f"module 'sheepy' has no attribute {name!r}")
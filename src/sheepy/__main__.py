@@ -1,8 +1,11 @@
 import argparse
 import logging
+import sys
 
 from sheepy.cli.cli import read_user_cli_args
-from sheepy.util.logger import get_logger
+from sheepy.util import LOG_DIR, LOG_FILE
+from sheepy.util.config import load_config
+from sheepy.util.logger import get_logger, setup_logging
 
 
 def main() -> None:
@@ -10,10 +13,24 @@ def main() -> None:
     Main entry for application
     """
     logger: logging.Logger = get_logger(__name__)
-    print("\N{SNAKE}\N{SNAKE} Hello, welcome to Sheepy \N{SNAKE}\N{SNAKE}\n")
     args: argparse.Namespace = read_user_cli_args()
+    # keep stdout clean when data is written to it
+    out = sys.stderr if getattr(args, "output", None) == "-" else sys.stdout
+    print("\N{SNAKE}\N{SNAKE} Hello, welcome to Sheepy \N{SNAKE}\N{SNAKE}\n", file=out)
+    load_config()
+    setup_logging(LOG_DIR, LOG_FILE, out)
     logger.debug(args)
 
+    if args.stats:
+        from sheepy.util.stats import enable_stats
+
+        enable_stats(args.stats)
+
+    if args.no_cache or args.refresh:
+        from sheepy.omdb.api import configure_cache
+
+        configure_cache(enabled=not args.no_cache, refresh=args.refresh)
+
     args.func(args)
 
 
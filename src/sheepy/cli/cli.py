@@ -1,15 +1,11 @@
+"""Command line interface.
+Subcommands import their dependencies when they are run to keep startup fast."""
+
 import argparse
+import os
 import sys
 
-from sheepy import (
-    add_movie_to_sheet,
-    create_new_sheet,
-    download_csv,
-    get_env_spreadsheet,
-    view_movie_info,
-    watch_clipboard,
-)
-from sheepy.spreadsheet.spreadsheet import SheepySpreadsheet
+from sheepy.util.config import IMPORT_BATCH_SIZE, MAX_WORKERS, SERVER_PORT
 
 
 def read_user_cli_args() -> argparse.Namespace:
@@ -22,6 +18,35 @@ def read_user_cli_args() -> argparse.Namespace:
         description="Add or view movies to your personal database.", prog="sheepy"
     )
 
+    global_parser.add_argument(
+        "--local",
+        action="store_true",
+        help="Do not forward commands to a running sheepy server",
+    )
+    global_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not use the local OMDb response cache",
+    )
+    global_parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached OMDb responses and refresh them",
+    )
+    global_parser.add_argument(
+        "--stats",
+        action="store_const",
+        const="text",
+        help="Print API calls, their latency and cache hits on exit",
+    )
+    global_parser.add_argument(
+        "--stats-json",
+        dest="stats",
+        action="store_const",
+        const="json",
+        help="Like --stats, but print the summary as json",
+    )
+
     subparsers = global_parser.add_subparsers(
         title="subcommands", help="Commands offered by sheepy"
     )
@@ -40,7 +65,20 @@ def read_user_cli_args() -> argparse.Namespace:
 
     add_parser = subparsers.add_parser("add", help="Add Movie to Sheet")
     add_parser.add_argument(
-        "imdb_id", nargs=1, type=str, help="Enter the movies imdb id to add."
+        "imdb_id", nargs="*", type=str, help="Enter the movies imdb ids to add."
+    )
+    add_parser.add_argument(
+        "-f",
+        "--from-file",
+        type=str,
+        help="File containing imdb ids to add, one per line",
+    )
+    add_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=MAX_WORKERS,
+        help=f"Number of concurrent OMDb requests (Defaults to {MAX_WORKERS})",
     )
     add_parser.add_argument(
         "-w",
@@ -49,16 +87,188 @@ def read_user_cli_args() -> argparse.Namespace:
         help="Set to mark movie as already watched (Defaults to False)",
     )
     add_parser.set_defaults(func=cli_add_movie)
+    find_parser = subparsers.add_parser(
+        "find",
+        help="Find movies on OMDb by title",
+        description="Find movies on OMDb by title and show their IMDb IDs."
+        " With --add a movie from the results can be added to the sheet.",
+    )
+    find_parser.add_argument("title", type=str, help="Title or part of title")
+    find_parser.add_argument("-y", "--year", type=int, help="Release year")
+    find_parser.add_argument(
+        "-p",
+        "--pages",
+        type=int,
+        default=3,
+        help="Number of result pages with 10 movies each (Defaults to 3)",
+    )
+    find_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=MAX_WORKERS,
+        help=f"Number of concurrent OMDb requests (Defaults to {MAX_WORKERS})",
+    )
+    find_parser.add_argument(
+        "-a",
+        "--add",
+        action="store_true",
+        help="Choose a movie from the results and add it to the sheet",
+    )
+    find_parser.add_argument(
+        "-w",
+        "--watched",
+        action="store_true",
+        help="Set to mark added movie as already watched (Defaults to False)",
+    )
+    find_parser.set_defaults(func=cli_find)
+    import_parser = subparsers.add_parser(
+        "import",
+        help="Import movies from csv/tsv file",
+        description="Import movies from a csv or tsv file with IMDb IDs or titles"
+        " and years, e.g. an IMDb or Letterboxd export. An interrupted import"
+        " continues where it stopped when run again.",
+    )
+    import_parser.add_argument("file", type=str, help="csv or tsv file to import")
+    import_parser.add_argument(
+        "-b",
+        "--batch-size",
+        type=int,
+        default=IMPORT_BATCH_SIZE,
+        help=f"Number of rows written at once (Defaults to {IMPORT_BATCH_SIZE})",
+    )
+    import_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=MAX_WORKERS,
+        help=f"Number of concurrent OMDb requests (Defaults to {MAX_WORKERS})",
+    )
+    import_parser.add_argument(
+        "-w",
+        "--watched",
+        action="store_true",
+        help="Set to mark movies as already watched (Defaults to False)",
+    )
+    import_parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Start from the beginning even if a previous import was interrupted",
+    )
+    import_parser.set_defaults(func=cli_import)
     dl_parser = subparsers.add_parser("dl", help="Download spreadsheet as csv")
+    dl_parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default="sheepy.csv",
+        help="Path of csv file, use - for stdout (Defaults to sheepy.csv)",
+    )
+    dl_parser.add_argument(
+        "-a",
+        "--all-worksheets",
+        action="store_true",
+        help="Export every worksheet to its own file, named after the worksheet",
+    )
+    dl_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Export even if the spreadsheet has not changed since the last download",
+    )
     dl_parser.set_defaults(func=cli_download_csv)
+    sync_parser = subparsers.add_parser(
+        "sync", help="Sync local copy of the sheet used by read-only commands"
+    )
+    sync_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Read all rows even if the spreadsheet has not changed",
+    )
+    sync_parser.set_defaults(func=cli_sync)
+    reformat_parser = subparsers.add_parser(
+        "reformat",
+        help="Replace row colors with alternating colors",
+        description="Replace background colors of single rows with alternating"
+        " colors, which stay correct when rows are sorted or deleted.",
+    )
+    reformat_parser.set_defaults(func=cli_reformat)
+    search_parser = subparsers.add_parser(
+        "search",
+        help="Search movies in local copy of the sheet",
+        description="Search movies in local copy of the sheet, run sync first."
+        " RANGE is MIN:MAX, either bound may be left out, a single value"
+        " matches exactly.",
+    )
+    watched_group = search_parser.add_mutually_exclusive_group()
+    watched_group.add_argument(
+        "--watched",
+        dest="watched",
+        action="store_const",
+        const=True,
+        help="Only watched movies",
+    )
+    watched_group.add_argument(
+        "--unwatched",
+        dest="watched",
+        action="store_const",
+        const=False,
+        help="Only movies not watched yet",
+    )
+    search_parser.add_argument(
+        "-t", "--title", action="append", help="Title, can be used multiple times"
+    )
+    search_parser.add_argument(
+        "-g", "--genre", action="append", help="Genre, can be used multiple times"
+    )
+    search_parser.add_argument(
+        "-d",
+        "--director",
+        action="append",
+        help="Director name, can be used multiple times",
+    )
+    for option, help_text in [
+        ("year", "Release year"),
+        ("runtime", "Runtime in minutes"),
+        ("rating", "IMDb rating"),
+        ("tomatometer", "Tomatometer in percent"),
+    ]:
+        search_parser.add_argument(
+            f"--{option}", type=_parse_range, metavar="RANGE", help=help_text
+        )
+    search_parser.set_defaults(func=cli_search)
     watch_parser = subparsers.add_parser(
         "watch", help="Watches clipboard for valid IMDb IDs"
     )
     watch_parser.set_defaults(func=cli_watch_clipboard)
+    serve_parser = subparsers.add_parser(
+        "serve", help="Run server that keeps connections open for other commands"
+    )
+    serve_parser.add_argument(
+        "-p",
+        "--port",
+        type=int,
+        default=None,
+        help=f"Port to listen on (Defaults to SHEEPY_SERVER_PORT or {SERVER_PORT})",
+    )
+    serve_parser.set_defaults(func=cli_serve)
 
     return global_parser.parse_args(args=None if sys.argv[1:] else ["--help"])
 
 
+def _parse_range(value: str) -> tuple[float | None, float | None]:
+    low, separator, high = value.partition(":")
+    try:
+        bounds = (float(low) if low else None, float(high) if high else None)
+    except ValueError as ve:
+        raise argparse.ArgumentTypeError(f"invalid range: {value}") from ve
+    return bounds if separator else (bounds[0], bounds[0])
+
+
+def _use_server(args: argparse.Namespace) -> bool:
+    # cache and stats options only apply to the local process
+    return not (args.local or args.no_cache or args.refresh or args.stats)
+
+
 def cli_new_sheet(args: argparse.Namespace) -> None:
     """
     Creates a new sheet when new command is used
@@ -66,6 +276,8 @@ def cli_new_sheet(args: argparse.Namespace) -> None:
     Args:
         args (argparse.Namespace): Arguments parsed from command line
     """
+    from sheepy.core import create_new_sheet
+
     create_new_sheet(args.email[0])
 
 
@@ -76,6 +288,20 @@ def cli_view_movie(args: argparse.Namespace) -> None:
     Args:
         args (argparse.Namespace): Arguments parsed from command line
     """
+    from sheepy.util.exceptions import MovieRetrievalError, ServerError
+
+    if _use_server(args):
+        from sheepy.server.client import forward_view
+
+        try:
+            info: str | None = forward_view(args.imdb_id[0])
+        except (MovieRetrievalError, ServerError) as e:
+            raise SystemExit(f"Error: {e}") from e
+        if info is not None:
+            print(info)
+            return
+    from sheepy.core import view_movie_info
+
     view_movie_info(args.imdb_id[0])
 
 
@@ -86,8 +312,123 @@ def cli_add_movie(args: argparse.Namespace) -> None:
     Args:
         args (argparse.Namespace): Arguments parsed from command line
     """
-    ss: SheepySpreadsheet = get_env_spreadsheet()
-    add_movie_to_sheet(ss=ss, imdb_id=args.imdb_id[0], watched=args.watched)
+    imdb_ids: list[str] = list(args.imdb_id)
+    if args.from_file is not None:
+        from sheepy.util.file import read_imdb_ids
+
+        imdb_ids.extend(read_imdb_ids(args.from_file))
+    if not imdb_ids:
+        raise SystemExit("Provide at least one imdb id or a file with --from-file")
+    failed: dict[str, str] | None = None
+    if _use_server(args):
+        from sheepy.server.client import forward_add
+        from sheepy.util.exceptions import ServerError
+
+        try:
+            failed = forward_add(
+                imdb_ids, args.watched, args.jobs, bulk=args.from_file is not None
+            )
+        except ServerError as se:
+            raise SystemExit(f"Error: {se}") from se
+    if failed is None:
+        from sheepy.core import add_movies_to_sheet, get_env_spreadsheet
+
+        ss = get_env_spreadsheet()
+        errors = add_movies_to_sheet(
+            ss=ss,
+            imdb_ids=imdb_ids,
+            watched=args.watched,
+            max_workers=args.jobs,
+            bulk=args.from_file is not None,
+        )
+        failed = {imdb_id: str(e) for imdb_id, e in errors.items()}
+    if failed:
+        print(f"Could not add {len(failed)} of {len(set(imdb_ids))} movies:")
+        for imdb_id, error in failed.items():
+            print(f"  {imdb_id}: {error}")
+        sys.exit(-1)
+
+
+def _choose(count: int) -> int | None:
+    while True:
+        choice: str = input(f"Movie to add [1-{count}, Enter to skip]: ").strip()
+        if not choice:
+            return None
+        if choice.isdigit() and 1 <= int(choice) <= count:
+            return int(choice) - 1
+        print(f"Enter a number between 1 and {count}")
+
+
+def cli_find(args: argparse.Namespace) -> None:
+    """Finds movies on OMDb by title, optionally adds one of them to the sheet
+
+    Args:
+        args (argparse.Namespace): Arguments parsed from command line
+    """
+    from tabulate import tabulate
+
+    from sheepy.core import find_movies
+    from sheepy.util.exceptions import MovieRetrievalError
+
+    try:
+        movies: list[dict[str, str]] = find_movies(
+            args.title, args.year, args.pages, args.jobs
+        )
+    except MovieRetrievalError as mre:
+        raise SystemExit(f"Error: {mre}") from mre
+    columns: dict[str, str] = {
+        "Title": "Title",
+        "Year": "Year",
+        "Type": "Type",
+        "Director": "Director",
+        "imdbRating": "IMDb",
+        "imdbID": "IMDb ID",
+    }
+    print(
+        tabulate(
+            [
+                [i, *(movie.get(key, "") for key in columns)]
+                for i, movie in enumerate(movies, start=1)
+            ],
+            headers=["#", *columns.values()],
+            tablefmt="plain",
+        )
+    )
+    print(f"\n{len(movies)} movies found")
+    if not args.add or not movies:
+        return
+    choice: int | None = _choose(len(movies))
+    if choice is None:
+        return
+    from sheepy.core import add_movie_to_sheet, get_env_spreadsheet
+
+    add_movie_to_sheet(get_env_spreadsheet(), movies[choice]["imdbID"], args.watched)
+
+
+def cli_import(args: argparse.Namespace) -> None:
+    """Imports movies from csv or tsv file
+
+    Args:
+        args (argparse.Namespace): Arguments parsed from command line
+    """
+    from sheepy.core import get_env_spreadsheet, import_movies
+
+    if not os.path.isfile(args.file):
+        raise SystemExit(f"File not found: {args.file}")
+    added, failed = import_movies(
+        get_env_spreadsheet(),
+        args.file,
+        batch_size=args.batch_size,
+        watched=args.watched,
+        max_workers=args.jobs,
+        restart=args.restart,
+    )
+    print(f"Added {added} movies")
+    if failed:
+        print(f"Could not add {len(failed)} movies:")
+        for movie, error in failed.items():
+            print(f"  {movie}: {error}")
+        sys.exit(-1)
 
 
 def cli_download_csv(args: argparse.Namespace) -> None:
@@ -96,8 +437,86 @@ def cli_download_csv(args: argparse.Namespace) -> None:
     Args:
         args (argparse.Namespace): Arguments parsed from command line
     """
-    ss: SheepySpreadsheet = get_env_spreadsheet()
-    download_csv(ss)
+    # files are only exported if the spreadsheet changed, which needs
+    # a single metadata request and is not worth forwarding
+    if _use_server(args) and args.output == "-":
+        from sheepy.server.client import forward_download
+        from sheepy.util.exceptions import ServerError
+
+        try:
+            if forward_download(sys.stdout.buffer):
+                return
+        except ServerError as se:
+            raise SystemExit(f"Error: {se}") from se
+    from sheepy.core import download_csv, get_env_spreadsheet
+
+    download_csv(get_env_spreadsheet(), args.output, args.all_worksheets, args.force)
+
+
+def cli_sync(args: argparse.Namespace) -> None:
+    """Syncs local mirror of the worksheet
+
+    Args:
+        args (argparse.Namespace): Arguments parsed from command line
+    """
+    from sheepy.core import get_env_spreadsheet, sync_mirror
+
+    print(sync_mirror(get_env_spreadsheet(), args.force))
+
+
+def cli_reformat(args: argparse.Namespace) -> None:
+    """Migrates row colors of the worksheet to alternating colors
+
+    Args:
+        args (argparse.Namespace): Arguments parsed from command line
+    """
+    from sheepy.core import get_env_spreadsheet, reformat_sheet
+
+    reformat_sheet(get_env_spreadsheet())
+    print("Sheet reformatted")
+
+
+def cli_search(args: argparse.Namespace) -> None:
+    """Searches movies in local copy of the sheet
+
+    Args:
+        args (argparse.Namespace): Arguments parsed from command line
+    """
+    from tabulate import tabulate
+
+    from sheepy.core import search_movies
+
+    ranges = {
+        field: getattr(args, option)
+        for field, option in [
+            ("year", "year"),
+            ("runtime", "runtime"),
+            ("imdb_rating", "rating"),
+            ("tomatometer", "tomatometer"),
+        ]
+        if getattr(args, option) is not None
+    }
+    movies = search_movies(
+        args.watched, args.genre, args.director, ranges, titles=args.title
+    )
+    columns: dict[str, str] = {
+        "title": "Title",
+        "year": "Year",
+        "genre": "Genre",
+        "runtime": "Runtime",
+        "imdb_rating": "IMDb",
+        "tomatometer": "Tomatometer",
+        "director": "Director",
+        "watched": "Watched?",
+    }
+    print(
+        tabulate(
+            [[movie[key] for key in columns] for movie in movies],
+            headers=list(columns.values()),
+            tablefmt="plain",
+        )
+    )
+    print(f"\n{len(movies)} movies found")
 
 
 def cli_watch_clipboard(args: argparse.Namespace) -> None:
@@ -106,4 +525,18 @@ def cli_watch_clipboard(args: argparse.Namespace) -> None:
     Args:
         args (argparse.Namespace): Arguments parsed from command line
     """
+    from sheepy.core import watch_clipboard
+
     watch_clipboard()
+
+
+def cli_serve(args: argparse.Namespace) -> None:
+    """Runs sheepy server which keeps spreadsheet and OMDb connections open.
+     Other commands are forwarded to it while it is running
+
+    Args:
+        args (argparse.Namespace): Arguments parsed from command line
+    """
+    from sheepy.server.server import serve
+
+    serve(args.port)
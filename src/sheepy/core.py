@@ -1,18 +1,39 @@
+import contextlib
+import contextvars
+import functools
+import itertools
+import json
 import sys
 import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
 
-from sheepy.omdb.api import process_movie_request_imdb_id, show_info
-from sheepy.parser.clipboard_parser import ClipboardWatcher, check_for_imdb_id
-from sheepy.spreadsheet.spreadsheet import SheepySpreadsheet
+from sheepy.omdb.api import (
+    SEARCH_PAGES,
+    bulk_requests,
+    process_movie_request_imdb_id,
+    process_movie_request_name_year,
+    search_omdb,
+    show_info,
+)
+from sheepy.util.config import IMPORT_BATCH_SIZE, MAX_WORKERS
 from sheepy.util.exceptions import MovieRetrievalError
-from sheepy.util.file import create_env_file
+from sheepy.util.file import atomic_write, create_env_file
 from sheepy.util.logger import get_logger
 
+if TYPE_CHECKING:
+    from sheepy.mirror.mirror import SyncResult
+    from sheepy.parser.import_parser import ImportEntry
+    from sheepy.spreadsheet.spreadsheet import SheepySpreadsheet
+
 core_logger = get_logger(__name__)
 
+CHECKPOINT_SUFFIX = ".checkpoint.json"
+
 
 def add_movie_to_sheet(
-    ss: SheepySpreadsheet,
+    ss: "SheepySpreadsheet",
     imdb_id: str,
     watched: bool = False,
 ) -> None:
@@ -34,6 +55,197 @@ def add_movie_to_sheet(
     ss.add_values_to_sheet(insert_data)
 
 
+def _map_in_context(
+    executor: ThreadPoolExecutor, fn: Callable[[Any], Any], items: list[Any]
+) -> list[Any]:
+    # workers run in a copy of the caller's context to keep bulk_requests
+    futures = [
+        executor.submit(contextvars.copy_context().run, fn, item) for item in items
+    ]
+    return [future.result() for future in futures]
+
+
+def _fetch_movie(imdb_id: str, watched: bool) -> dict[str, str] | Exception:
+    try:
+        return process_movie_request_imdb_id(imdb_id, watched, True)
+    except MovieRetrievalError as mre:
+        return mre
+
+
+def add_movies_to_sheet(
+    ss: "SheepySpreadsheet",
+    imdb_ids: list[str],
+    watched: bool = False,
+    max_workers: int = MAX_WORKERS,
+    bulk: bool = False,
+) -> dict[str, Exception]:
+    """
+    Add multiple movies to a Spreadsheet.
+    Movie data is fetched concurrently and all rows are written in one batch
+
+    Args:
+        ss (SheepySpreadsheet): SheepySpreadsheet instance
+        imdb_ids (list[str]): IMDB IDs of movies
+        watched (bool, optional): Whether to tick watched checkbox
+        max_workers (int, optional): Number of concurrent OMDb requests
+        bulk (bool, optional): Whether to send OMDb requests as bulk work,
+         see bulk_requests. Defaults to False.
+
+    Returns:
+        dict[str, Exception]: IMDB IDs that could not be added and their errors
+    """
+    unique_ids: list[str] = list(dict.fromkeys(imdb_ids))
+    with (
+        bulk_requests() if bulk else contextlib.nullcontext(),
+        ThreadPoolExecutor(max_workers=max_workers) as executor,
+    ):
+        results = _map_in_context(
+            executor, lambda i: _fetch_movie(i, watched), unique_ids
+        )
+    insert_data: list[dict[str, str]] = []
+    failed: dict[str, Exception] = {}
+    for imdb_id, result in zip(unique_ids, results, strict=True):
+        if isinstance(result, Exception):
+            failed[imdb_id] = result
+        else:
+            insert_data.append(result)
+    ss.add_rows_to_sheet(insert_data)
+    return failed
+
+
+def _fetch_entry(entry: "ImportEntry", watched: bool) -> dict[str, str] | Exception:
+    try:
+        if entry.imdb_id is not None:
+            return process_movie_request_imdb_id(entry.imdb_id, watched, True)
+        return process_movie_request_name_year(
+            entry.title,  # type: ignore
+            entry.year,  # type: ignore
+            watched,
+            True,
+        )
+    except MovieRetrievalError as mre:
+        return mre
+
+
+def _load_checkpoint(filename: str, sheet: str, restart: bool) -> dict[str, Any]:
+    checkpoint: dict[str, Any] = {}
+    try:
+        with open(filename, "r") as f:
+            checkpoint = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    if restart or checkpoint.get("sheet") != sheet:
+        return {"sheet": sheet, "line": 0, "added": 0, "failed": {}}
+    return checkpoint
+
+
+def _save_checkpoint(filename: str, checkpoint: dict[str, Any]) -> None:
+    with atomic_write(filename) as f:
+        f.write(json.dumps(checkpoint).encode())
+
+
+def _sheet_key(row: list[Any]) -> list[str]:
+    # title and year identify a written row, as the sheet renders them
+    return [str(value) for value in row[1:3]]
+
+
+def _pending_written(ss: "SheepySpreadsheet", pending: dict[str, Any]) -> bool:
+    """Checks whether the rows of a pending batch are in the worksheet.
+     The batch is appended in a single request, so its rows are either
+      all written next to each other or not at all
+
+    Args:
+        ss (SheepySpreadsheet): SheepySpreadsheet instance
+        pending (dict[str, Any]): pending batch of the checkpoint
+
+    Returns:
+        bool: True if the batch has been written
+    """
+    rows: list[list[str]] = [_sheet_key(row) for row in ss.read_rows()]
+    count: int = len(pending["rows"])
+    return any(
+        rows[i : i + count] == pending["rows"] for i in range(len(rows) - count + 1)
+    )
+
+
+def import_movies(
+    ss: "SheepySpreadsheet",
+    filename: str,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    watched: bool = False,
+    max_workers: int = MAX_WORKERS,
+    restart: bool = False,
+) -> tuple[int, dict[str, str]]:
+    """
+    Imports movies from a csv or tsv file of IMDb IDs or titles and years.
+    The file is read row by row, movies are looked up concurrently
+     and written in batches. Progress is stored in a checkpoint file
+      next to the input after every batch. Running the import again
+       continues after the last recorded batch.
+    Before a batch is written it is recorded as pending. If the import
+     stopped before the batch was recorded as done, the worksheet is read
+      on resume and the batch is only sent again if its rows are missing.
+       Rows can still be added twice if the worksheet was changed
+        in between, e.g. the written rows were edited or deleted
+
+    Args:
+        ss (SheepySpreadsheet): SheepySpreadsheet instance
+        filename (str): path of csv or tsv file
+        batch_size (int, optional): Number of rows written at once
+        watched (bool, optional): Whether to tick watched checkbox
+        max_workers (int, optional): Number of concurrent OMDb requests
+        restart (bool, optional): Whether to ignore an existing checkpoint
+
+    Returns:
+        tuple[int, dict[str, str]]: number of added movies and
+         movies that could not be added with their errors
+    """
+    from sheepy.parser.import_parser import read_import_file
+
+    checkpoint_file: str = f"{filename}{CHECKPOINT_SUFFIX}"
+    sheet: str = f"{ss.spreadsheet_id}:{ss.worksheet_index}"
+    checkpoint: dict[str, Any] = _load_checkpoint(checkpoint_file, sheet, restart)
+    if pending := checkpoint.pop("pending", None):
+        if _pending_written(ss, pending):
+            checkpoint["line"] = pending["line"]
+            checkpoint["added"] += len(pending["rows"])
+        _save_checkpoint(checkpoint_file, checkpoint)
+    if checkpoint["line"]:
+        core_logger.info(f"Resuming {filename} after line {checkpoint['line']}")
+    entries = (
+        (line, entry)
+        for line, entry in read_import_file(filename)
+        if line > checkpoint["line"]
+    )
+    with bulk_requests(), ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while batch := list(itertools.islice(entries, batch_size)):
+            results = _map_in_context(
+                executor, lambda item: _fetch_entry(item[1], watched), batch
+            )
+            insert_data: list[dict[str, str]] = []
+            for (_, entry), result in zip(batch, results, strict=True):
+                if isinstance(result, Exception):
+                    checkpoint["failed"][str(entry)] = str(result)
+                else:
+                    insert_data.append(result)
+            if insert_data:
+                checkpoint["pending"] = {
+                    "line": batch[-1][0],
+                    "rows": [_sheet_key(list(d.values())) for d in insert_data],
+                }
+                _save_checkpoint(checkpoint_file, checkpoint)
+                ss.add_rows_to_sheet(insert_data)
+                del checkpoint["pending"]
+            checkpoint["line"] = batch[-1][0]
+            checkpoint["added"] += len(insert_data)
+            _save_checkpoint(checkpoint_file, checkpoint)
+            core_logger.info(
+                f"Imported {filename} up to line {checkpoint['line']},"
+                f" {checkpoint['added']} movies added"
+            )
+    return checkpoint["added"], checkpoint["failed"]
+
+
 def view_movie_info(imdb_id: str) -> None:
     """
     Displays movie information in a table
@@ -49,16 +261,56 @@ def view_movie_info(imdb_id: str) -> None:
     print(show_info(view_data))
 
 
-def download_csv(ss: SheepySpreadsheet) -> None:
+def find_movies(
+    query: str,
+    year: int | None = None,
+    pages: int = SEARCH_PAGES,
+    max_workers: int = MAX_WORKERS,
+) -> list[dict[str, str]]:
+    """
+    Searches OMDb for movies by title
+
+    Args:
+        query (str): Title or part of title to search for
+        year (int | None, optional): release year of movie. Defaults to None.
+        pages (int, optional): Number of result pages to request
+        max_workers (int, optional): Number of concurrent OMDb requests
+
+    Returns:
+        list[dict[str, str]]: Search results in order of relevance
+    """
+    return search_omdb(query, year, pages, max_workers=max_workers)
+
+
+def download_csv(
+    ss: "SheepySpreadsheet",
+    filename: str = "sheepy.csv",
+    all_worksheets: bool = False,
+    force: bool = False,
+) -> None:
     """Downloads Google Spreadsheet in csv format
 
     Args:
         ss (SheepySpreadsheet): SheepySpreadsheet instance
+        filename (str, optional): path of csv file or "-" for stdout
+        all_worksheets (bool, optional): Whether to export every worksheet
+        force (bool, optional): Whether to export even if the file is up to date
     """
-    ss.download_csv()
+    ss.download_csv(filename, all_worksheets, force)
 
 
-def get_spreadsheet(ss_id: str, ws_idx: str) -> SheepySpreadsheet:
+def reformat_sheet(ss: "SheepySpreadsheet") -> None:
+    """Replaces colors of single rows with alternating colors
+
+    Args:
+        ss (SheepySpreadsheet): SheepySpreadsheet instance
+    """
+    from sheepy.spreadsheet import formatting
+
+    formatting.reformat_sheet(ss)
+
+
+def get_spreadsheet(ss_id: str, ws_idx: str) -> "SheepySpreadsheet":
     """
     Get a Spreadsheet by id
 
@@ -69,10 +321,12 @@ def get_spreadsheet(ss_id: str, ws_idx: str) -> SheepySpreadsheet:
     Returns:
         SheepySpreadsheet: Spreadsheet instance
     """
+    from sheepy.spreadsheet.spreadsheet import SheepySpreadsheet
+
     return SheepySpreadsheet(ss_id, ws_idx)
 
 
-def create_new_sheet(email: str) -> SheepySpreadsheet:
+def create_new_sheet(email: str) -> "SheepySpreadsheet":
     """
     Create a new Spreadsheet
 
@@ -82,41 +336,125 @@ def create_new_sheet(email: str) -> SheepySpreadsheet:
     Returns:
         SheepySpreadsheet: Spreadsheet instance
     """
-    ss: SheepySpreadsheet = SheepySpreadsheet.from_new()
+    from sheepy.spreadsheet.spreadsheet import SheepySpreadsheet
+
+    ss: SheepySpreadsheet = SheepySpreadsheet.from_new(share_with=email)
     ss.logger.info(
         f"Created new sheet\nSpreadsheet ID: {ss.spreadsheet_id}\n"
         f"Worksheet Index: {ss.worksheet_index}"
     )
     create_env_file(ss)
-    ss.share_spreadsheet(email, "user", "writer")
     return ss
 
 
-def get_env_spreadsheet() -> SheepySpreadsheet:
+def get_env_spreadsheet() -> "SheepySpreadsheet":
     """
     Get a Spreadsheet from env-file config
 
     Returns:
         SheepySpreadsheet: Spreadsheet instance
     """
+    from sheepy.spreadsheet.spreadsheet import SheepySpreadsheet
+
     return SheepySpreadsheet.from_env_file()
 
 
-def _view_and_add_from_clipboard(imdb_id: str):
-    ss: SheepySpreadsheet = SheepySpreadsheet.from_env_file()
-    core_logger.info(f"Found IMDb entry from ID: {imdb_id}")
+def _add_from_clipboard(ss: "SheepySpreadsheet", imdb_ids: list[str]) -> list[str]:
+    core_logger.info(f"Found IMDb entries from IDs: {', '.join(imdb_ids)}")
     print("Adding to Spreadsheet...")
-    add_movie_to_sheet(ss=ss, imdb_id=imdb_id)
+    failed = add_movies_to_sheet(ss=ss, imdb_ids=imdb_ids, bulk=True)
+    for imdb_id, error in failed.items():
+        core_logger.error(f"Could not add {imdb_id}: {error}")
     print("Done!")
+    return list(failed)
+
+
+def sync_mirror(ss: "SheepySpreadsheet", force: bool = False) -> "SyncResult":
+    """Syncs local mirror with the worksheet.
+    Rows are only read if the spreadsheet changed since the last sync
+
+    Args:
+        ss (SheepySpreadsheet): SheepySpreadsheet instance
+        force (bool, optional): Whether to read rows even if the spreadsheet
+         has not changed. Defaults to False.
+
+    Returns:
+        SyncResult: counts of changed rows
+    """
+    from sheepy.mirror.mirror import SheetMirror, SyncResult
+    from sheepy.spreadsheet.sheet_state import state_key
+
+    mirror: SheetMirror = SheetMirror()
+    key: str = state_key(ss.spreadsheet_id, ss.worksheet_index)  # type: ignore
+    revision: str = ss.revision or ss.get_revision()
+    if not force and mirror.get_revision(key) == revision:
+        return SyncResult(revision, skipped=True)
+    return mirror.sync(key, revision, ss.read_rows())
+
+
+def search_movies(
+    watched: bool | None = None,
+    genres: list[str] | None = None,
+    directors: list[str] | None = None,
+    ranges: dict[str, tuple[float | None, float | None]] | None = None,
+    titles: list[str] | None = None,
+) -> list[dict[str, str]]:
+    """Searches movies in the local mirror, no requests are sent.
+    Run sync first to mirror the worksheet, which also updates the search indexes
+
+    Args:
+        watched (bool | None, optional): Whether movies have been watched.
+         Defaults to None, which matches both.
+        genres (list[str] | None, optional): terms every genre has to match.
+        directors (list[str] | None, optional): terms every director has to match.
+        ranges (dict[str, tuple[float | None, float | None]] | None, optional):
+         inclusive bounds of year, runtime, imdb_rating and tomatometer.
+        titles (list[str] | None, optional): terms every title has to match.
+
+    Raises:
+        SystemExit: if the worksheet was never synced
+
+    Returns:
+        list[dict[str, str]]: matching movies
+    """
+    from sheepy.mirror.mirror import SheetMirror
+    from sheepy.spreadsheet.sheet_state import state_key
+    from sheepy.util.config import get_env
+
+    key: str = state_key(get_env("SPREADSHEET_ID"), get_env("WORKSHEET_INDEX"))  # type: ignore
+    mirror: SheetMirror = SheetMirror()
+    if mirror.get_revision(key) is None:
+        raise SystemExit("No local copy of the sheet found. Run sheepy sync first.")
+    terms: dict[str, list[str]] = {
+        field: values
+        for field, values in (
+            ("title", titles),
+            ("genre", genres),
+            ("director", directors),
+        )
+        if values
+    }
+    return mirror.search(key, watched, terms, ranges)
 
 
 def watch_clipboard() -> None:
     """
-    Watches Clipboard for valid IMDb Ids
+    Watches Clipboard for valid IMDb Ids, also inside URLs or longer text.
+    Found IDs are added by a worker thread that keeps one spreadsheet connection
     """
+    from sheepy.parser.clipboard_parser import ClipboardWatcher, ClipboardWorker
+    from sheepy.util.string_util import contains_imdb_id, extract_imdb_ids
+
+    ss: "SheepySpreadsheet" = get_env_spreadsheet()
+    worker: ClipboardWorker = ClipboardWorker(
+        functools.partial(_add_from_clipboard, ss)
+    )
     watcher: ClipboardWatcher = ClipboardWatcher(
-        check_for_imdb_id, _view_and_add_from_clipboard, 1.0
+        contains_imdb_id,
+        lambda content: worker.submit_all(extract_imdb_ids(content)),
+        1.0,
     )
+    worker.start()
     watcher.start()
     print("Waiting for clipboard contents...")
     print("Press Ctrl+C in terminal window to exit.")
@@ -127,4 +465,5 @@ def watch_clipboard() -> None:
         except KeyboardInterrupt:
             print("Exiting...")
             watcher.stop()
+            worker.stop()
             break
@@ -0,0 +1,151 @@
+"""Search indexes kept in the mirror database, updated with every sync."""
+
+import re
+import sqlite3
+from typing import Any
+
+from sheepy.util.string_util import parse_number
+
+# fields with values such as "Action, Drama" that are searched by token
+TOKEN_FIELDS = ("title", "genre", "director")
+# fields with values such as "117 min" or "89%" that are searched by range
+NUMERIC_FIELDS = ("year", "runtime", "imdb_rating", "tomatometer")
+
+_TOKEN_SEPARATOR = re.compile(r"\W+")
+
+
+def tokenize(value: str) -> set[str]:
+    """Splits value into lowercase word tokens
+
+    Args:
+        value (str): cell value or search term
+
+    Returns:
+        set[str]: tokens of value
+    """
+    return {token for token in _TOKEN_SEPARATOR.split(value.lower()) if token}
+
+
+def create_index(conn: sqlite3.Connection) -> None:
+    """Creates token table and numeric columns with their indexes
+
+    Args:
+        conn (sqlite3.Connection): connection to mirror database
+    """
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS tokens ("
+        "sheet TEXT NOT NULL, field TEXT NOT NULL, token TEXT NOT NULL,"
+        " row INTEGER NOT NULL, PRIMARY KEY (sheet, field, token, row))"
+        " WITHOUT ROWID"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS numbers ("
+        "sheet TEXT NOT NULL, row INTEGER NOT NULL, "
+        + ", ".join(f"{field} REAL" for field in NUMERIC_FIELDS)
+        + ", PRIMARY KEY (sheet, row))"
+    )
+    for field in NUMERIC_FIELDS:
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS numbers_{field}"
+            f" ON numbers (sheet, {field}, row)"
+        )
+
+
+def index_rows(
+    conn: sqlite3.Connection, sheet: str, movies: list[tuple[int, dict[str, str]]]
+) -> None:
+    """Adds index entries of rows, entries of updated rows have to be removed first
+
+    Args:
+        conn (sqlite3.Connection): connection to mirror database
+        sheet (str): key of mirrored worksheet
+        movies (list[tuple[int, dict[str, str]]]): row numbers and movie dicts
+    """
+    conn.executemany(
+        "INSERT INTO tokens VALUES (?, ?, ?, ?)",
+        [
+            (sheet, field, token, row)
+            for row, movie in movies
+            for field in TOKEN_FIELDS
+            for token in tokenize(movie[field])
+        ],
+    )
+    placeholders: str = ", ".join(["?"] * (len(NUMERIC_FIELDS) + 2))
+    conn.executemany(
+        f"INSERT INTO numbers VALUES ({placeholders})",
+        [
+            (sheet, row, *(parse_number(movie[field]) for field in NUMERIC_FIELDS))
+            for row, movie in movies
+        ],
+    )
+
+
+def unindex_rows(conn: sqlite3.Connection, sheet: str, rows: list[int]) -> None:
+    """Removes index entries of rows
+
+    Args:
+        conn (sqlite3.Connection): connection to mirror database
+        sheet (str): key of mirrored worksheet
+        rows (list[int]): row numbers
+    """
+    for table in ("tokens", "numbers"):
+        conn.executemany(
+            f"DELETE FROM {table} WHERE sheet = ? AND row = ?",
+            [(sheet, row) for row in rows],
+        )
+
+
+def search_query(
+    sheet: str,
+    watched: bool | None = None,
+    terms: dict[str, list[str]] | None = None,
+    ranges: dict[str, tuple[float | None, float | None]] | None = None,
+) -> tuple[str, list[Any]]:
+    """Builds condition selecting rows of movies that match all filters
+
+    Args:
+        sheet (str): key of mirrored worksheet
+        watched (bool | None, optional): Whether movies have been watched.
+         Defaults to None, which matches both.
+        terms (dict[str, list[str]] | None, optional): terms every value
+         of a token field has to match.
+        ranges (dict[str, tuple[float | None, float | None]] | None, optional):
+         inclusive bounds of numeric fields, None for an open bound.
+
+    Raises:
+        ValueError: if a field can not be searched by terms or range
+
+    Returns:
+        tuple[str, list[Any]]: WHERE clause on the movies table and its parameters
+    """
+    conditions: list[str] = ["sheet = ?"]
+    params: list[Any] = [sheet]
+    if watched is not None:
+        conditions.append("upper(watched) " + ("=" if watched else "!=") + " 'TRUE'")
+    for field, field_terms in (terms or {}).items():
+        if field not in TOKEN_FIELDS:
+            raise ValueError(f"{field} can not be searched by terms")
+        for token in {t for term in field_terms for t in tokenize(term)}:
+            conditions.append(
+                "row IN (SELECT row FROM tokens"
+                " WHERE sheet = ? AND field = ? AND token = ?)"
+            )
+            params += [sheet, field, token]
+    bounds: list[str] = []
+    bound_params: list[Any] = [sheet]
+    for field, (low, high) in (ranges or {}).items():
+        if field not in NUMERIC_FIELDS:
+            raise ValueError(f"{field} is not a numeric field")
+        bounds.append(f"{field} IS NOT NULL")
+        for operator, bound in ((">=", low), ("<=", high)):
+            if bound is not None:
+                bounds.append(f"{field} {operator} ?")
+                bound_params.append(bound)
+    if bounds:
+        conditions.append(
+            "row IN (SELECT row FROM numbers WHERE sheet = ? AND "
+            + " AND ".join(bounds)
+            + ")"
+        )
+        params += bound_params
+    return " AND ".join(conditions), params
@@ -0,0 +1,228 @@
+"""Local SQLite mirror of the movie worksheet used by read-only commands."""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sheepy.mirror.index import create_index, index_rows, search_query, unindex_rows
+from sheepy.model.movie import MOVIE_FIELDS
+from sheepy.util.file import get_cache_dir
+from sheepy.util.logger import get_logger
+
+mirror_logger = get_logger(__name__)
+
+MIRROR_FILE = "mirror.sqlite3"
+# mirrors with an older schema are dropped and filled by the next sync,
+# version 3 drops percentages that were read as fractions
+SCHEMA_VERSION = 3
+FIRST_ROW = 2
+FIELDS = MOVIE_FIELDS
+
+
+@dataclass
+class SyncResult:
+    """Counts of rows changed by a sync"""
+
+    revision: str
+    added: int = 0
+    updated: int = 0
+    deleted: int = 0
+    skipped: bool = False
+
+    def __str__(self) -> str:
+        if self.skipped:
+            return f"Mirror is up to date (revision {self.revision})"
+        return (
+            f"Synced revision {self.revision}: {self.added} added,"
+            f" {self.updated} updated, {self.deleted} deleted"
+        )
+
+
+def row_hash(values: list[str]) -> str:
+    """Hashes the content of a row
+
+    Args:
+        values (list[str]): normalized row values
+
+    Returns:
+        str: hash of row content
+    """
+    return hashlib.sha256("\x1f".join(values).encode()).hexdigest()
+
+
+def _normalize(row: list[Any]) -> list[str]:
+    values: list[str] = []
+    for value in list(row)[: len(FIELDS)]:
+        if isinstance(value, bool):
+            values.append("TRUE" if value else "FALSE")
+        else:
+            values.append("" if value is None else str(value))
+    return values + [""] * (len(FIELDS) - len(values))
+
+
+class SheetMirror:
+    """Mirrors worksheet rows in SQLite, one row per movie with a content hash.
+    Syncs only write rows whose hash changed and update the search indexes
+     of those rows, so searches are answered by SQL queries.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """Constructor of SheetMirror
+
+        Args:
+            path (str | None, optional): Path of mirror database. Defaults to None,
+             which uses the sheepy cache directory.
+        """
+        self.path: str = path or os.path.join(get_cache_dir(), MIRROR_FILE)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        with self._conn:
+            version: int = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                for table in ("movies", "syncs", "tokens", "numbers"):
+                    self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS movies ("
+                "sheet TEXT NOT NULL, row INTEGER NOT NULL, hash TEXT NOT NULL, "
+                + ", ".join(f"{field} TEXT NOT NULL" for field in FIELDS)
+                + ", PRIMARY KEY (sheet, row))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS syncs ("
+                "sheet TEXT PRIMARY KEY, revision TEXT NOT NULL,"
+                " synced_at REAL NOT NULL)"
+            )
+            create_index(self._conn)
+
+    def get_revision(self, sheet: str) -> str | None:
+        """Returns spreadsheet revision of the last sync
+
+        Args:
+            sheet (str): key of mirrored worksheet
+
+        Returns:
+            str | None: revision or None if the worksheet was never synced
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT revision FROM syncs WHERE sheet = ?", (sheet,)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def sync(
+        self,
+        sheet: str,
+        revision: str,
+        rows: list[list[Any]],
+        first_row: int = FIRST_ROW,
+    ) -> SyncResult:
+        """Updates mirror with the current worksheet rows.
+        Only rows whose content hash differs are written
+
+        Args:
+            sheet (str): key of mirrored worksheet
+            revision (str): spreadsheet revision the rows were read at
+            rows (list[list[Any]]): row values, starting at first_row
+            first_row (int, optional): row number of first row. Defaults to 2.
+
+        Returns:
+            SyncResult: counts of added, updated and deleted rows
+        """
+        result: SyncResult = SyncResult(revision)
+        with self._lock, self._conn:
+            stored: dict[int, str] = dict(
+                self._conn.execute(
+                    "SELECT row, hash FROM movies WHERE sheet = ?", (sheet,)
+                ).fetchall()
+            )
+            changed: list[tuple[Any, ...]] = []
+            changed_movies: list[tuple[int, dict[str, str]]] = []
+            updated_rows: list[int] = []
+            for row_number, row in enumerate(rows, start=first_row):
+                values: list[str] = _normalize(row)
+                if not any(values):
+                    continue
+                content_hash: str = row_hash(values)
+                stored_hash: str | None = stored.pop(row_number, None)
+                if stored_hash == content_hash:
+                    continue
+                if stored_hash is None:
+                    result.added += 1
+                else:
+                    result.updated += 1
+                    updated_rows.append(row_number)
+                changed.append((sheet, row_number, content_hash, *values))
+                changed_movies.append(
+                    (row_number, dict(zip(FIELDS, values, strict=True)))
+                )
+            placeholders: str = ", ".join(["?"] * (len(FIELDS) + 3))
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO movies VALUES ({placeholders})", changed
+            )
+            self._conn.executemany(
+                "DELETE FROM movies WHERE sheet = ? AND row = ?",
+                [(sheet, row_number) for row_number in stored],
+            )
+            unindex_rows(self._conn, sheet, updated_rows + list(stored))
+            index_rows(self._conn, sheet, changed_movies)
+            result.deleted = len(stored)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO syncs VALUES (?, ?, ?)",
+                (sheet, revision, time.time()),
+            )
+        mirror_logger.info(result)
+        return result
+
+    def movies(self, sheet: str) -> list[dict[str, str]]:
+        """Returns mirrored movies in sheet order
+
+        Args:
+            sheet (str): key of mirrored worksheet
+
+        Returns:
+            list[dict[str, str]]: movie dicts with the keys of Movie.build_dict
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(FIELDS)} FROM movies WHERE sheet = ? ORDER BY row",
+                (sheet,),
+            ).fetchall()
+        return [dict(zip(FIELDS, row, strict=True)) for row in rows]
+
+    def search(
+        self,
+        sheet: str,
+        watched: bool | None = None,
+        terms: dict[str, list[str]] | None = None,
+        ranges: dict[str, tuple[float | None, float | None]] | None = None,
+    ) -> list[dict[str, str]]:
+        """Returns mirrored movies matching all given filters in sheet order
+
+        Args:
+            sheet (str): key of mirrored worksheet
+            watched (bool | None, optional): Whether movies have been watched.
+             Defaults to None, which matches both.
+            terms (dict[str, list[str]] | None, optional): terms every title,
+             genre or director has to match, e.g. {"genre": ["thriller"]}.
+            ranges (dict[str, tuple[float | None, float | None]] | None, optional):
+             inclusive bounds of year, runtime, imdb_rating and tomatometer.
+
+        Raises:
+            ValueError: if a field can not be searched by terms or range
+
+        Returns:
+            list[dict[str, str]]: matching movies
+        """
+        condition, params = search_query(sheet, watched, terms, ranges)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(FIELDS)} FROM movies WHERE {condition}"
+                " ORDER BY row",
+                params,
+            ).fetchall()
+        return [dict(zip(FIELDS, row, strict=True)) for row in rows]
@@ -1,36 +1,85 @@
-import operator
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Self
 
 from sheepy.model.rating import Rating
 from sheepy.util.logger import get_logger
+from sheepy.util.string_util import parse_int
 
+# keys of Movie.build_dict in order of the sheet columns
+MOVIE_FIELDS: tuple[str, ...] = (
+    "watched",
+    "title",
+    "year",
+    "genre",
+    "runtime",
+    "suggested_by",
+    "imdb_rating",
+    "tomatometer",
+    "director",
+    "plot",
+    "poster",
+)
 
-@dataclass
+
+@dataclass(slots=True)
 class Movie:
     """
     Represents movie from OMDb API.
     Only relevant fields are saved.
+    Year and runtime (in minutes) may be passed as strings from OMDb
+     or the sheet, they are parsed once and missing values are None.
+    Years of series such as "2008–2013" or "2019–" are parsed to their first
+     year and keep their text for the sheet.
     """
 
     _logger = get_logger(__name__)
 
     watched: str
     title: str
-    year: str
+    year: int | None
     genre: str
-    runtime: str
+    runtime: int | None
     suggested_by: str
     rating: Rating
     director: str
     plot: str
     poster: str
+    year_range: str | None = field(default=None, init=False, compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if isinstance(self.year, str):
+            text: str = self.year.strip()
+            self.year = parse_int(text)
+            if self.year is not None and text != str(self.year):
+                self.year_range = text
+        if isinstance(self.runtime, str):
+            self.runtime = parse_int(self.runtime)
 
     def __repr__(self) -> str:
-        return f"{self.title} ({self.year})"
+        return f"{self.title} ({self.year_text})"
 
     def __str__(self) -> str:
-        return f"{self.title} ({self.year})"
+        return f"{self.title} ({self.year_text})"
+
+    @property
+    def year_text(self) -> str:
+        """Year as written to the spreadsheet, e.g. "1982", "2008–2013" or "N/A"
+
+        Returns:
+            str: formatted year
+        """
+        if self.year_range is not None:
+            return self.year_range
+        return "N/A" if self.year is None else str(self.year)
+
+    @property
+    def runtime_text(self) -> str:
+        """Runtime as written to the spreadsheet, e.g. "117 min" or "N/A"
+
+        Returns:
+            str: formatted runtime
+        """
+        return "N/A" if self.runtime is None else f"{self.runtime} min"
 
     def __eq__(self, value: Self) -> bool:
         return (
@@ -40,6 +89,27 @@ class Movie:
             and self.director == value.director
         )
 
+    def to_row(self) -> list[str]:
+        """Builds row of values in order of the sheet columns
+
+        Returns:
+            list[str]: Returns values as written to the spreadsheet
+        """
+        rating: Rating = self.rating
+        return [
+            self.watched,
+            self.title,
+            self.year_text,
+            self.genre,
+            self.runtime_text,
+            self.suggested_by,
+            rating.imdb_rating_text,
+            rating.tomatometer_text,
+            self.director,
+            self.plot,
+            self.poster,
+        ]
+
     def build_dict(self) -> dict[str, str]:
         """Build dictionary of class attributes used to display
           or write movie information
@@ -47,13 +117,4 @@ class Movie:
         Returns:
             dict[str, str]: Returns dictionary containing class attributes
         """
-        mov_dict: dict[str, str] = {}
-        rating_getter = operator.attrgetter("rating")(self)
-        attr_list = list(self.__dict__.items())
-        for field in attr_list:
-            if field[0] == "rating":
-                mov_dict["imdb_rating"] = rating_getter.imdb_rating
-                mov_dict["tomatometer"] = rating_getter.tomatometer
-                continue
-            mov_dict[field[0]] = field[1]
-        return mov_dict
+        return dict(zip(MOVIE_FIELDS, self.to_row(), strict=True))
@@ -1,18 +1,29 @@
 from typing import Any, Self
 
+from sheepy.util.string_util import parse_int, parse_number
+
 
 class Rating:
     """
     Represents Rating for a movie
-    Contains IMDb and Rotten Tomatoes Rating
+    Contains IMDb and Rotten Tomatoes Rating.
+    Ratings are parsed once, missing ratings are None
     """
 
-    imdb_rating: str
-    tomatometer: str
+    __slots__ = ("imdb_rating", "tomatometer")
+
+    imdb_rating: float | None
+    tomatometer: int | None
 
-    def __init__(self, imdb_rating: str, tomatometer: str) -> None:
-        self.imdb_rating = imdb_rating
-        self.tomatometer = tomatometer
+    def __init__(
+        self, imdb_rating: float | str | None, tomatometer: int | str | None
+    ) -> None:
+        self.imdb_rating = (
+            parse_number(imdb_rating) if isinstance(imdb_rating, str) else imdb_rating
+        )
+        self.tomatometer = (
+            parse_int(tomatometer) if isinstance(tomatometer, str) else tomatometer
+        )
 
     def __eq__(self, value: Self) -> bool:
         return (self.imdb_rating == value.imdb_rating) and (
@@ -21,11 +32,30 @@ class Rating:
 
     def __repr__(self) -> str:
         return (
-            f"""IMDb Rating: {self.imdb_rating} | Rotten Rating: {self.tomatometer}"""
+            f"IMDb Rating: {self.imdb_rating_text}"
+            f" | Rotten Rating: {self.tomatometer_text}"
         )
 
     def __str__(self) -> str:
-        return f"""IMDb: {self.imdb_rating}\nRotten: {self.tomatometer}"""
+        return f"""IMDb: {self.imdb_rating_text}\nRotten: {self.tomatometer_text}"""
+
+    @property
+    def imdb_rating_text(self) -> str:
+        """IMDb rating as written to the spreadsheet, e.g. "8.1" or "N/A"
+
+        Returns:
+            str: formatted IMDb rating
+        """
+        return "N/A" if self.imdb_rating is None else f"{self.imdb_rating:.1f}"
+
+    @property
+    def tomatometer_text(self) -> str:
+        """Tomatometer as written to the spreadsheet, e.g. "89%" or "N/A"
+
+        Returns:
+            str: formatted Tomatometer
+        """
+        return "N/A" if self.tomatometer is None else f"{self.tomatometer}%"
 
     @classmethod
     def from_json(cls, movie_data: dict[Any, Any]) -> Self:
@@ -1,70 +1,282 @@
 """This module contains the functionality to interact with the OMDb database/API."""
 
+import atexit
+import contextlib
+import contextvars
 import os
+import random
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
 from tabulate import tabulate
 
 from sheepy.model.movie import Movie
 from sheepy.model.rating import Rating
-from sheepy.util.exceptions import MovieRetrievalError
+from sheepy.omdb.cache import OmdbCache
+from sheepy.omdb.quota import OmdbQuota
+from sheepy.util.config import MAX_WORKERS, get_env
+from sheepy.util.exceptions import (
+    MovieRetrievalError,
+    OmdbConnectionError,
+    OmdbHTTPError,
+    OmdbQuotaError,
+    OmdbRequestError,
+)
 from sheepy.util.logger import get_logger
-from sheepy.util.string_util import build_request_url, insert_newlines
+from sheepy.util.string_util import (
+    build_request_url,
+    build_search_url,
+    insert_newlines,
+    parse_int,
+)
 
 omdb_logger = get_logger(__name__)
 
 URL = "http://www.omdbapi.com/?apikey="
-API_KEY = os.environ.get("OMDB_API_KEY", "")
-if API_KEY == "":
-    raise SystemExit(f"Error: API_KEY is not set. {API_KEY}")
-SUGGESTED_BY = os.environ.get("SUGGESTED_BY", "Someone")
+QUOTA_ERROR = "Request limit reached!"
+NOT_FOUND_ERROR = "Movie not found!"
+SUGGESTED_BY = "Someone"
 
+CONNECT_TIMEOUT = float(os.environ.get("OMDB_CONNECT_TIMEOUT", 3.05))
+READ_TIMEOUT = float(os.environ.get("OMDB_READ_TIMEOUT", 5))
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+POOL_SIZE = 10
+# OMDb returns 10 search results per page
+SEARCH_PAGES = 3
+SEARCH_HYDRATE = 5
 
-def _get_movie_data(imdb_id: str) -> dict[str, str]:
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+_cache: OmdbCache | None = None
+_cache_lock = threading.Lock()
+_cache_enabled: bool = True
+_cache_refresh: bool = False
+
+_quota: OmdbQuota | None = None
+_quota_lock = threading.Lock()
+_bulk: contextvars.ContextVar[bool] = contextvars.ContextVar("bulk", default=False)
+
+
+def configure_cache(enabled: bool = True, refresh: bool = False) -> None:
+    """Configures usage of the local OMDb response cache
+
+    Args:
+        enabled (bool, optional): Whether to use the cache. Defaults to True.
+        refresh (bool, optional): Whether to ignore cached entries and
+         overwrite them with fresh responses. Defaults to False.
+    """
+    global _cache_enabled, _cache_refresh
+    _cache_enabled = enabled
+    _cache_refresh = refresh
+
+
+def get_cache() -> OmdbCache | None:
+    """Returns the shared OMDb cache, creating it on first use
+
+    Returns:
+        OmdbCache | None: Cache instance or None if caching is disabled
+    """
+    global _cache
+    if not _cache_enabled:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = OmdbCache()
+            atexit.register(_cache.log_stats)
+    return _cache
+
+
+def get_quota() -> OmdbQuota:
+    """Returns the shared OMDb request quota, creating it on first use
+
+    Returns:
+        OmdbQuota: Quota stored in the sheepy cache directory
+    """
+    global _quota
+    with _quota_lock:
+        if _quota is None:
+            _quota = OmdbQuota()
+    return _quota
+
+
+@contextlib.contextmanager
+def bulk_requests() -> Iterator[None]:
+    """Marks OMDb requests sent inside the block as bulk work.
+    Bulk requests leave part of the daily quota to interactive commands
+     and wait for the daily reset instead of failing once their share is used up.
+    Only requests of the current context are marked, functions submitted
+     to a thread pool have to be run with contextvars.copy_context
+
+    Yields:
+        None: nothing, requests are marked while the block runs
+    """
+    token: contextvars.Token[bool] = _bulk.set(True)
+    try:
+        yield
+    finally:
+        _bulk.reset(token)
+
+
+def _is_quota_response(response: requests.Response | None) -> bool:
+    if response is None or response.status_code != 401:
+        return False
+    try:
+        return response.json().get("Error") == QUOTA_ERROR
+    except ValueError:
+        return False
+
+
+def get_api_key() -> str:
+    """Returns OMDb API key from configuration
+
+    Raises:
+        SystemExit: If OMDB_API_KEY is not set
+
+    Returns:
+        str: OMDb API key
+    """
+    api_key: str | None = get_env("OMDB_API_KEY")
+    if not api_key:
+        raise SystemExit("Error: OMDB_API_KEY is not set.")
+    return api_key
+
+
+def get_suggested_by() -> str:
+    """Returns name used for the suggested by column from configuration
+
+    Returns:
+        str: Value of SUGGESTED_BY or default name
+    """
+    return get_env("SUGGESTED_BY", SUGGESTED_BY)  # type: ignore
+
+
+def get_session() -> requests.Session:
+    """Returns the shared keep-alive HTTP session, creating it on first use
+
+    Returns:
+        requests.Session: Session with a connection pool for the OMDb API
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+    return _session
+
+
+def _request_omdb(request_url: str) -> dict[str, str]:
+    """Sends GET request to the OMDb API.
+    Server errors and connection errors are retried with exponential backoff
+     and jitter.
+    Requests are taken from the shared quota first, bulk requests wait
+     for the daily reset if OMDb or the quota refuse them.
+
+    Args:
+        request_url (str): URL to request
+
+    Returns:
+        dict[str, str]: Decoded JSON response
+
+    Raises:
+        OmdbHTTPError: If the API responds with an error status code.
+        OmdbConnectionError: If no connection could be established.
+        OmdbQuotaError: If the daily quota is used up.
+        OmdbRequestError: If a general request exception occurs.
+    """
+    session: requests.Session = get_session()
+    quota: OmdbQuota = get_quota()
+    for attempt in range(MAX_RETRIES + 1):
+        quota.acquire(_bulk.get())
+        try:
+            response: requests.Response = session.get(
+                request_url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)
+            )
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.HTTPError as he:
+            if _is_quota_response(he.response):
+                quota.exhaust()
+                # the next attempt waits for the reset
+                if _bulk.get() and attempt < MAX_RETRIES:
+                    continue
+                omdb_logger.error("Daily OMDb quota used up")
+                raise OmdbQuotaError("Daily OMDb quota used up") from he
+            if he.response is None or he.response.status_code < 500:
+                omdb_logger.error(f"HTTP Error Code: - {he}")
+                raise OmdbHTTPError(f"HTTP Error Code: - {str(he)}") from he
+            error: OmdbRequestError = OmdbHTTPError(f"HTTP Error Code: - {str(he)}")
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+        ) as ce:
+            error = OmdbConnectionError(f"Connection Error: {str(ce)}")
+        except requests.exceptions.RequestException as re:
+            omdb_logger.error(f"Request Error: {re}")
+            raise OmdbRequestError(f"Request Error: {str(re)}") from re
+        except ValueError as ve:
+            omdb_logger.error(f"Invalid response: {ve}")
+            raise OmdbRequestError(f"Invalid response: {str(ve)}") from ve
+        if attempt == MAX_RETRIES:
+            omdb_logger.error(f"{error} - giving up after {attempt + 1} attempts")
+            raise error
+        delay: float = BACKOFF_FACTOR * 2**attempt
+        delay += random.uniform(0, delay)
+        omdb_logger.warning(f"{error} - retrying in {delay:.2f}s")
+        time.sleep(delay)
+    raise OmdbRequestError("Request to OMDb failed")
+
+
+def _get_movie_data(imdb_id: str, stale_ratings: bool = False) -> dict[str, str]:
     """Get movie data from the Open Movie Database (OMDb) API.
     Uses IMDb-ID for search.
 
     Args:
         imdb_id (str): The IMDb ID of the movie to search for.
+        stale_ratings (bool, optional): Whether cached data with expired
+         ratings may be used. Defaults to False.
 
     Returns:
         dict: A dictionary containing the movie data.
 
     Raises:
-        SystemExit: If an HTTP error occurs.
-        SystemExit: If a general request exception occurs.
-        ValueError: If no response is received from the API.
+        OmdbHTTPError: If an HTTP error occurs.
+        OmdbConnectionError: If no connection could be established.
+        OmdbRequestError: If a general request exception occurs.
+        MovieRetrievalError: If the API does not find a movie.
     """
-    try:
-        request_url: str = build_request_url(
-            base_url=URL, api_key=API_KEY, title_or_id=imdb_id
-        )
-        response: requests.Response = requests.get(request_url, timeout=60)
-        omdb_logger.debug(f"Used request URL: {request_url}")
-        response.raise_for_status()
-        response_json: dict[str, str] = response.json()
-    except requests.exceptions.HTTPError as he:
-        omdb_logger.error(f"HTTP Error Code: - {he}")
-        raise SystemExit(f"HTTP Error Code: - {str(he)}") from he
-    except requests.exceptions.RequestException as re:
-        omdb_logger.error(f"Request Error: {re}")
-        raise SystemExit(f"Request Error: {str(re)}") from re
-    except Exception as e:
-        omdb_logger.error(f"General Error: {e}")
-        raise SystemExit(f"General Error: {str(e)}") from e
+    cache: OmdbCache | None = get_cache()
+    if cache is not None and not _cache_refresh:
+        cached: dict[str, str] | None = cache.get(imdb_id, stale_ratings)
+        if cached is not None:
+            return cached
+    request_url: str = build_request_url(
+        base_url=URL, api_key=get_api_key(), title_or_id=imdb_id
+    )
+    omdb_logger.debug(f"Used request URL: {request_url}")
+    response_json: dict[str, str] = _request_omdb(request_url)
 
     if response_json["Response"] == "False":
         omdb_logger.error(
-            f"{response_json["Error"]} - Invalid IMDb ID: {imdb_id}. Please try again.",
+            f"{response_json['Error']} - Invalid IMDb ID: {imdb_id}. Please try again.",
         )
         omdb_logger.debug(f"Used ID: {imdb_id}")
         raise MovieRetrievalError(f"{response_json['Error']} - Invalid IMDb ID.")
 
     omdb_logger.info(
-        f"Successfully retrieved movie data for {response_json["Title"]}"
-        f"with IMDb-ID {response_json["imdbID"]}."
+        f"Successfully retrieved movie data for {response_json['Title']}"
+        f"with IMDb-ID {response_json['imdbID']}."
     )
+    if cache is not None:
+        cache.put(response_json)
 
     return response_json
 
@@ -81,27 +293,21 @@ def _get_movie_data_by_name_and_year(name: str, year: int) -> dict[str, str]:
         dict: A dictionary containing the movie data.
 
     Raises:
-        SystemExit: If an HTTP error occurs.
-        SystemExit: If a general request exception occurs.
-        ValueError: If no response is received from the API.
+        OmdbHTTPError: If an HTTP error occurs.
+        OmdbConnectionError: If no connection could be established.
+        OmdbRequestError: If a general request exception occurs.
+        MovieRetrievalError: If the API does not find a movie.
     """
-    try:
-        request_url: str = build_request_url(
-            base_url=URL, api_key=API_KEY, title_or_id=name, year=year
-        )
-        response: requests.Response = requests.get(request_url, timeout=60)
-        omdb_logger.debug(f"Used request URL: {request_url}")
-        response.raise_for_status()
-        response_json: dict[str, str] = response.json()
-    except requests.exceptions.HTTPError as he:
-        omdb_logger.error("HTTP Error Code: - %s", str(he))
-        raise SystemExit(f"HTTP Error Code: - {str(he)}") from he
-    except requests.exceptions.RequestException as re:
-        omdb_logger.error("Request Error: %s", str(re))
-        raise SystemExit(f"Request Error: {str(re)}") from re
-    except Exception as e:
-        omdb_logger.error("General Error: %s", str(e))
-        raise SystemExit(f"General Error: {str(e)}") from e
+    cache: OmdbCache | None = get_cache()
+    if cache is not None and not _cache_refresh:
+        cached: dict[str, str] | None = cache.get_by_name_and_year(name, year)
+        if cached is not None:
+            return cached
+    request_url: str = build_request_url(
+        base_url=URL, api_key=get_api_key(), title_or_id=name, year=year
+    )
+    omdb_logger.debug(f"Used request URL: {request_url}")
+    response_json: dict[str, str] = _request_omdb(request_url)
 
     if response_json["Response"] == "False":
         omdb_logger.error(
@@ -115,10 +321,101 @@ def _get_movie_data_by_name_and_year(name: str, year: int) -> dict[str, str]:
         response_json["Title"],
         response_json["imdbID"],
     )
+    if cache is not None:
+        cache.put(response_json, name, year)
 
     return response_json
 
 
+def _search_page(query: str, page: int, year: int | None = None) -> dict[str, Any]:
+    """Get a page of search results from the Open Movie Database (OMDb) API.
+    Pages past the last result are returned without results.
+
+    Args:
+        query (str): Title or part of title to search for
+        page (int): Page of search results, starting at 1
+        year (int | None, optional): release year of movie. Defaults to None.
+
+    Returns:
+        dict[str, Any]: A dictionary containing the search results.
+
+    Raises:
+        OmdbHTTPError: If an HTTP error occurs.
+        OmdbConnectionError: If no connection could be established.
+        OmdbRequestError: If a general request exception occurs.
+        MovieRetrievalError: If the API rejects the search, e.g. too many results.
+    """
+    cache: OmdbCache | None = get_cache()
+    if cache is not None and not _cache_refresh:
+        cached: dict[str, Any] | None = cache.get_search(query, page, year)
+        if cached is not None:
+            return cached
+    request_url: str = build_search_url(
+        base_url=URL, api_key=get_api_key(), query=query, page=page, year=year
+    )
+    omdb_logger.debug(f"Used request URL: {request_url}")
+    response_json: dict[str, Any] = _request_omdb(request_url)
+
+    if response_json["Response"] == "False":
+        if response_json.get("Error") != NOT_FOUND_ERROR:
+            omdb_logger.error(f"{response_json['Error']} - Invalid search: {query}")
+            raise MovieRetrievalError(f"{response_json['Error']} - Invalid search.")
+        response_json = {"Search": [], "totalResults": "0", "Response": "True"}
+    if cache is not None:
+        cache.put_search(query, page, response_json, year)
+
+    return response_json
+
+
+def search_omdb(
+    query: str,
+    year: int | None = None,
+    pages: int = SEARCH_PAGES,
+    hydrate: int = SEARCH_HYDRATE,
+    max_workers: int = MAX_WORKERS,
+) -> list[dict[str, str]]:
+    """Searches movies by title.
+    All result pages are requested at once and full records of the first
+     results are fetched as soon as their page arrives
+
+    Args:
+        query (str): Title or part of title to search for
+        year (int | None, optional): release year of movie. Defaults to None.
+        pages (int, optional): Number of result pages to request.
+        hydrate (int, optional): Number of results to fetch full records for.
+        max_workers (int, optional): Number of concurrent OMDb requests
+
+    Returns:
+        list[dict[str, str]]: Search results in order of relevance, full records
+         for the first results and OMDb search entries for the others
+
+    Raises:
+        MovieRetrievalError: If a page of search results could not be retrieved.
+    """
+    results: dict[str, dict[str, str]] = {}
+    records: dict[str, Future[dict[str, str]]] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        page_futures: list[Future[dict[str, Any]]] = [
+            executor.submit(_search_page, query, page, year)
+            for page in range(1, pages + 1)
+        ]
+        for page_future in page_futures:
+            for result in page_future.result()["Search"]:
+                imdb_id: str = result["imdbID"]
+                if imdb_id in results:
+                    continue
+                results[imdb_id] = result
+                if len(records) < hydrate:
+                    # results are only listed, their ratings may be outdated
+                    records[imdb_id] = executor.submit(_get_movie_data, imdb_id, True)
+        for imdb_id, record in records.items():
+            try:
+                results[imdb_id] = record.result()
+            except MovieRetrievalError as mre:
+                omdb_logger.warning(f"Could not retrieve {imdb_id}: {mre}")
+    return list(results.values())
+
+
 def show_info(movie_data: dict[str, Any]) -> str:
     """Show the movie information in the CLI.
 
@@ -145,7 +442,7 @@ def _extract_movie_data(
     movie_data: dict[str, str],
     watched: bool,
     add: bool,
-    suggested_by: str = SUGGESTED_BY,
+    suggested_by: str | None = None,
 ) -> Movie:
     """Extract only the necessary data from the movie_data dictionary.
 
@@ -160,10 +457,10 @@ def _extract_movie_data(
     movie: Movie = Movie(
         watched="TRUE" if watched else "FALSE",
         title=movie_data.get("Title", ""),
-        year=movie_data.get("Year", ""),
+        year=movie_data.get("Year", ""),  # type: ignore
         genre=movie_data.get("Genre", ""),
-        runtime=movie_data.get("Runtime", ""),
-        suggested_by=suggested_by,
+        runtime=parse_int(movie_data.get("Runtime", "")),
+        suggested_by=suggested_by or get_suggested_by(),
         director=movie_data.get("Director", ""),
         plot=(
             movie_data.get("Plot", "")
@@ -171,7 +468,7 @@ def _extract_movie_data(
             else insert_newlines(movie_data.get("Plot", ""), 30)
         ),
         poster=(
-            f"=IMAGE(\"{movie_data.get('Poster')}\")"
+            f'=IMAGE("{movie_data.get("Poster")}")'
             if add
             else insert_newlines(movie_data.get("Poster", ""), 30)
         ),
@@ -184,7 +481,7 @@ def process_movie_request_imdb_id(
     imdb_id: str,
     watched: bool = False,
     add: bool = True,
-    suggested_by: str = SUGGESTED_BY,
+    suggested_by: str | None = None,
 ) -> dict[str, str]:
     """
     Processes movie request from OMDb API and creates dict with movie data
@@ -214,7 +511,7 @@ def process_movie_request_name_year(
     year: int,
     watched: bool = False,
     add: bool = True,
-    suggested_by: str = SUGGESTED_BY,
+    suggested_by: str | None = None,
 ) -> dict[str, str]:
     """
     Processes movie request from OMDb API and creates dict with movie data
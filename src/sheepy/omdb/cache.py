@@ -0,0 +1,292 @@
+"""Persistent on-disk cache for OMDb API responses backed by SQLite."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from sheepy.util.file import get_cache_dir
+from sheepy.util.logger import get_logger
+
+cache_logger = get_logger(__name__)
+
+# Ratings change over time, so they expire quickly.
+# Static fields such as title, genre and plot and the mapping of a title
+# and year to an IMDb ID can be kept much longer.
+RATING_TTL = float(os.environ.get("OMDB_CACHE_RATING_TTL", 24 * 60 * 60))
+STATIC_TTL = float(os.environ.get("OMDB_CACHE_STATIC_TTL", 30 * 24 * 60 * 60))
+MAX_ENTRIES = int(os.environ.get("OMDB_CACHE_MAX_ENTRIES", 5000))
+MAX_BYTES = int(os.environ.get("OMDB_CACHE_MAX_BYTES", 20 * 1024 * 1024))
+CACHE_FILE = "omdb.sqlite3"
+# caches with an older schema are dropped
+SCHEMA_VERSION = 2
+RATING_FIELDS = ("imdbRating", "imdbVotes", "Metascore", "Ratings")
+
+
+class OmdbCache:
+    """Caches OMDb responses keyed by IMDb ID and by (title, year).
+    Static fields and ratings of a response expire separately,
+     search result pages are kept as long as ratings.
+    Least recently used responses and search pages are evicted once
+     their entry count or total payload size exceeds the configured limits.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        rating_ttl: float = RATING_TTL,
+        static_ttl: float = STATIC_TTL,
+        max_entries: int = MAX_ENTRIES,
+        max_bytes: int = MAX_BYTES,
+    ) -> None:
+        """Constructor of OmdbCache
+
+        Args:
+            path (str | None, optional): Path of cache database. Defaults to None,
+             which uses the sheepy cache directory.
+            rating_ttl (float, optional): Seconds until ratings and search
+             pages expire.
+            static_ttl (float, optional): Seconds until static fields
+             and title lookups expire.
+            max_entries (int, optional): Maximum number of cached responses
+             and search pages.
+            max_bytes (int, optional): Maximum total size of cached responses
+             and search pages.
+        """
+        self.path: str = path or os.path.join(get_cache_dir(), CACHE_FILE)
+        self.rating_ttl = rating_ttl
+        self.static_ttl = static_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        with self._conn:
+            version: int = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                for table in ("responses", "titles", "searches"):
+                    self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            # payload holds the static fields, ratings the rating fields
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "imdb_id TEXT PRIMARY KEY, payload TEXT NOT NULL,"
+                " ratings TEXT NOT NULL, size INTEGER NOT NULL,"
+                " fetched_at REAL NOT NULL, rated_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS titles ("
+                "title TEXT NOT NULL, year TEXT NOT NULL, imdb_id TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL, PRIMARY KEY (title, year))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS searches ("
+                "query TEXT NOT NULL, year TEXT NOT NULL, page INTEGER NOT NULL,"
+                " payload TEXT NOT NULL, size INTEGER NOT NULL,"
+                " fetched_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+                " PRIMARY KEY (query, year, page))"
+            )
+
+    def get(self, imdb_id: str, stale_ratings: bool = False) -> dict[str, str] | None:
+        """Returns cached response for IMDb ID
+
+        Args:
+            imdb_id (str): IMDb ID of movie
+            stale_ratings (bool, optional): Whether to return a response whose
+             ratings expired, as long as its static fields have not.
+             Defaults to False.
+
+        Returns:
+            dict[str, str] | None: Cached response or None if missing or expired
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, ratings, fetched_at, rated_at FROM responses"
+                " WHERE imdb_id = ?",
+                (imdb_id.lower(),),
+            ).fetchone()
+            if (
+                row is None
+                or now - row[2] > self.static_ttl
+                or (not stale_ratings and now - row[3] > self.rating_ttl)
+            ):
+                return self._miss(imdb_id)
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE imdb_id = ?",
+                    (now, imdb_id.lower()),
+                )
+            return self._hit(imdb_id, {**json.loads(row[0]), **json.loads(row[1])})
+
+    def get_by_name_and_year(self, name: str, year: int) -> dict[str, str] | None:
+        """Returns cached response for movie name and release year
+
+        Args:
+            name (str): Name of movie
+            year (int): release year of movie
+
+        Returns:
+            dict[str, str] | None: Cached response or None if missing or expired
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT imdb_id, fetched_at FROM titles WHERE title = ? AND year = ?",
+                (name.lower(), str(year)),
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.static_ttl:
+            with self._lock:
+                return self._miss(f"{name} ({year})")
+        return self.get(row[0])
+
+    def get_search(
+        self, query: str, page: int, year: int | None = None
+    ) -> dict[str, Any] | None:
+        """Returns cached page of search results
+
+        Args:
+            query (str): Searched title
+            page (int): Page of search results
+            year (int | None, optional): Searched release year. Defaults to None.
+
+        Returns:
+            dict[str, Any] | None: Cached page or None if missing or expired
+        """
+        key: tuple[str, str, int] = (query.lower(), str(year or ""), page)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, fetched_at FROM searches"
+                " WHERE query = ? AND year = ? AND page = ?",
+                key,
+            ).fetchone()
+            if row is None or now - row[1] > self.rating_ttl:
+                return self._miss(f"search {query} ({page})")
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE searches SET accessed_at = ?"
+                    " WHERE query = ? AND year = ? AND page = ?",
+                    (now, *key),
+                )
+            return self._hit(f"search {query} ({page})", json.loads(row[0]))
+
+    def put_search(
+        self,
+        query: str,
+        page: int,
+        response: dict[str, Any],
+        year: int | None = None,
+    ) -> None:
+        """Stores a page of search results
+
+        Args:
+            query (str): Searched title
+            page (int): Page of search results
+            response (dict[str, Any]): OMDb search response
+            year (int | None, optional): Searched release year. Defaults to None.
+        """
+        payload: str = json.dumps(response)
+        now = time.time()
+        with self._lock, self._conn:
+            # expired pages are never read again
+            self._conn.execute(
+                "DELETE FROM searches WHERE fetched_at < ?", (now - self.rating_ttl,)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO searches VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (query.lower(), str(year or ""), page, payload, len(payload), now, now),
+            )
+            self._evict()
+
+    def put(
+        self,
+        response: dict[str, str],
+        name: str | None = None,
+        year: int | None = None,
+    ) -> None:
+        """Stores a successful OMDb response
+
+        Args:
+            response (dict[str, str]): OMDb response
+            name (str | None, optional): Name used for lookup. Defaults to None.
+            year (int | None, optional): Year used for lookup. Defaults to None.
+        """
+        imdb_id: str = response["imdbID"].lower()
+        payload: str = json.dumps(
+            {k: v for k, v in response.items() if k not in RATING_FIELDS}
+        )
+        ratings: str = json.dumps(
+            {k: v for k, v in response.items() if k in RATING_FIELDS}
+        )
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (imdb_id, payload, ratings, len(payload) + len(ratings), now, now, now),
+            )
+            if name is not None and year is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO titles VALUES (?, ?, ?, ?)",
+                    (name.lower(), str(year), imdb_id, now),
+                )
+            self._evict()
+
+    def clear(self) -> None:
+        """Removes all cached entries"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.execute("DELETE FROM titles")
+            self._conn.execute("DELETE FROM searches")
+
+    def log_stats(self) -> None:
+        """Logs hit and miss counters"""
+        cache_logger.info("OMDb cache: %d hits, %d misses", self.hits, self.misses)
+
+    def _hit(self, key: str, response: dict[str, Any]) -> dict[str, Any]:
+        self.hits += 1
+        cache_logger.debug(
+            "Cache hit for %s (hits=%d, misses=%d)", key, self.hits, self.misses
+        )
+        return response
+
+    def _miss(self, key: str) -> None:
+        self.misses += 1
+        cache_logger.debug(
+            "Cache miss for %s (hits=%d, misses=%d)", key, self.hits, self.misses
+        )
+        return None
+
+    def _evict(self) -> None:
+        count, size = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ("
+            "SELECT size FROM responses UNION ALL SELECT size FROM searches)"
+        ).fetchone()
+        if count <= self.max_entries and size <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT 'responses', rowid, imdb_id, size, accessed_at FROM responses"
+            " UNION ALL SELECT 'searches', rowid, NULL, size, accessed_at"
+            " FROM searches ORDER BY accessed_at ASC"
+        ).fetchall()
+        evict: dict[str, list[tuple[int]]] = {"responses": [], "searches": []}
+        evicted_ids: list[tuple[str]] = []
+        for table, rowid, imdb_id, entry_size, _ in rows:
+            if count <= self.max_entries and size <= self.max_bytes:
+                break
+            evict[table].append((rowid,))
+            if imdb_id is not None:
+                evicted_ids.append((imdb_id,))
+            count -= 1
+            size -= entry_size
+        for table, rowids in evict.items():
+            self._conn.executemany(f"DELETE FROM {table} WHERE rowid = ?", rowids)
+        self._conn.executemany("DELETE FROM titles WHERE imdb_id = ?", evicted_ids)
+        cache_logger.debug(
+            "Evicted %d responses and %d search pages from OMDb cache",
+            len(evict["responses"]),
+            len(evict["searches"]),
+        )
@@ -0,0 +1,165 @@
+"""Client-side OMDb request quota shared between sheepy processes."""
+
+import contextlib
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+
+from sheepy.util.exceptions import OmdbQuotaError
+from sheepy.util.file import get_cache_dir
+from sheepy.util.logger import get_logger
+
+quota_logger = get_logger(__name__)
+
+# The free OMDb tier allows 1,000 requests per day
+DAILY_LIMIT = int(os.environ.get("OMDB_DAILY_LIMIT", 1000))
+# Requests per second, also the burst size
+RATE_LIMIT = float(os.environ.get("OMDB_RATE_LIMIT", 5))
+# Part of the daily quota only interactive requests may use
+INTERACTIVE_RESERVE = int(os.environ.get("OMDB_INTERACTIVE_RESERVE", 100))
+QUOTA_FILE = "omdb_quota.sqlite3"
+
+
+def next_reset(now: float) -> float:
+    """Returns time of next daily quota reset (midnight UTC)
+
+    Args:
+        now (float): current time as unix timestamp
+
+    Returns:
+        float: unix timestamp of next reset
+    """
+    today = datetime.datetime.fromtimestamp(now, datetime.UTC).date()
+    tomorrow = datetime.datetime.combine(
+        today + datetime.timedelta(days=1), datetime.time(), datetime.UTC
+    )
+    return tomorrow.timestamp()
+
+
+class OmdbQuota:
+    """Token buckets limiting OMDb requests per day and per second.
+    Bucket levels are stored in SQLite, so all sheepy processes share them.
+     Bulk requests leave a reserve of the daily quota to interactive requests
+      and wait for the daily reset once they used up their share.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        daily_limit: int = DAILY_LIMIT,
+        rate_limit: float = RATE_LIMIT,
+        interactive_reserve: int = INTERACTIVE_RESERVE,
+    ) -> None:
+        """Constructor of OmdbQuota
+
+        Args:
+            path (str | None, optional): Path of quota database. Defaults to None,
+             which uses the sheepy cache directory.
+            daily_limit (int, optional): Maximum number of requests per day.
+            rate_limit (float, optional): Maximum number of requests per second.
+            interactive_reserve (int, optional): Number of daily requests
+             bulk requests may not use.
+        """
+        self.path: str = path or os.path.join(get_cache_dir(), QUOTA_FILE)
+        self.daily_limit = daily_limit
+        self.rate_limit = rate_limit
+        self.interactive_reserve = interactive_reserve
+        self._lock = threading.Lock()
+        # transactions are started explicitly to lock the database
+        self._conn = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            "name TEXT PRIMARY KEY, level REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def acquire(self, bulk: bool = False) -> None:
+        """Takes one request from the quota, waiting until one is available.
+
+        Args:
+            bulk (bool, optional): Whether the request belongs to a bulk job.
+             Defaults to False.
+
+        Raises:
+            OmdbQuotaError: if an interactive request exceeds the daily quota
+        """
+        while True:
+            now: float = time.time()
+            wait, daily = self._try_acquire(now, bulk)
+            if wait <= 0:
+                return
+            reset: str = time.strftime("%Y-%m-%d %H:%M", time.localtime(now + wait))
+            if daily and not bulk:
+                raise OmdbQuotaError(
+                    f"Daily OMDb quota of {self.daily_limit} requests used up,"
+                    f" it resets at {reset}"
+                )
+            if daily:
+                quota_logger.warning(f"Daily OMDb quota used up, waiting until {reset}")
+            time.sleep(wait)
+
+    def exhaust(self) -> None:
+        """Marks the daily quota as used up, e.g. after OMDb refused a request"""
+        now: float = time.time()
+        with self._transaction():
+            self._store("daily", self.daily_limit, now)
+
+    def remaining(self) -> int:
+        """Returns number of requests left today
+
+        Returns:
+            int: remaining daily requests
+        """
+        now: float = time.time()
+        with self._transaction():
+            used, _ = self._load("daily", 0, now)
+        return self.daily_limit - int(used)
+
+    def _try_acquire(self, now: float, bulk: bool) -> tuple[float, bool]:
+        # returns seconds to wait and whether the daily quota is the reason,
+        # no wait means a request was taken
+        with self._transaction():
+            used, _ = self._load("daily", 0, now)
+            limit: int = self.daily_limit - (self.interactive_reserve if bulk else 0)
+            if used >= limit:
+                return next_reset(now) - now, True
+            tokens, updated_at = self._load("second", self.rate_limit, now)
+            tokens = min(self.rate_limit, tokens + (now - updated_at) * self.rate_limit)
+            if tokens < 1:
+                return (1 - tokens) / self.rate_limit, False
+            self._store("daily", used + 1, now)
+            self._store("second", tokens - 1, now)
+        return 0, False
+
+    def _load(self, name: str, default: float, now: float) -> tuple[float, float]:
+        row = self._conn.execute(
+            "SELECT level, updated_at FROM buckets WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            return default, now
+        level, updated_at = row
+        # daily bucket is emptied at the reset following its last update
+        if name == "daily" and now >= next_reset(updated_at):
+            return 0, now
+        return level, updated_at
+
+    def _store(self, name: str, level: float, now: float) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)", (name, level, now)
+        )
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[None]:
+        # an immediate transaction locks the database for other processes
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
@@ -1,23 +1,13 @@
-import re
+import queue
 import threading
 import time
 from typing import Callable
 
 import pyperclip
 
+from sheepy.util.logger import get_logger
 
-def check_for_imdb_id(clipboard_content: str) -> bool:
-    """Checks whether or not arg is a valid imdb id
-
-    Args:
-        clipboard_content (str): Current clipboard content
-
-    Returns:
-        bool: Returns true if given string is a valid id
-    """
-    imdb_id_pattern: re.Pattern = re.compile(r"tt\d{7,8}$", re.IGNORECASE)
-    match: re.Match[str] | None = imdb_id_pattern.match(clipboard_content)
-    return False if match is None else True
+parser_logger = get_logger(__name__)
 
 
 class ClipboardWatcher(threading.Thread):
@@ -53,3 +43,89 @@ class ClipboardWatcher(threading.Thread):
 
     def stop(self) -> None:
         self._stopping = True
+
+
+class ClipboardWorker(threading.Thread):
+    """Processes values found by ClipboardWatcher off the polling thread.
+     Values are collected in a bounded queue, values copied in quick succession
+      are passed to the callback as one batch and values already processed
+       in this session are skipped
+
+    Args:
+        threading: Inherits from Thread to override run method
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[list[str]], list[str]],
+        batch_delay: float = 2.0,
+        max_size: int = 1000,
+    ) -> None:
+        """Constructor of ClipboardWorker
+
+        Args:
+            callback (Callable[[list[str]], list[str]]): processes a batch of values
+             and returns values that failed and may be retried
+            batch_delay (float, optional): seconds to wait for further values
+             before processing a batch. Defaults to 2.0.
+            max_size (int, optional): maximum number of queued values.
+             Defaults to 1000.
+        """
+        super(ClipboardWorker, self).__init__()
+        self._callback = callback
+        self._batch_delay = batch_delay
+        self._queue: queue.Queue[str] = queue.Queue(maxsize=max_size)
+        self._seen: set[str] = set()
+        self._stopping = False
+
+    def submit(self, value: str) -> None:
+        """Queues value for processing
+
+        Args:
+            value (str): value found in clipboard
+        """
+        try:
+            self._queue.put(value, timeout=1.0)
+        except queue.Full:
+            parser_logger.warning(f"Queue is full, dropping {value}")
+
+    def submit_all(self, values: list[str]) -> None:
+        """Queues all values for processing
+
+        Args:
+            values (list[str]): values found in clipboard
+        """
+        for value in values:
+            self.submit(value)
+
+    def run(self) -> None:
+        while not self._stopping:
+            try:
+                batch: list[str] = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            deadline: float = time.monotonic() + self._batch_delay
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._process(batch)
+
+    def _process(self, batch: list[str]) -> None:
+        new_values: dict[str, str] = {}
+        for value in batch:
+            if value.lower() not in self._seen:
+                new_values.setdefault(value.lower(), value)
+        if not new_values:
+            return
+        self._seen.update(new_values)
+        try:
+            failed: list[str] = self._callback(list(new_values.values()))
+        except Exception as e:
+            parser_logger.error(f"Error processing {list(new_values.values())}: {e}")
+            failed = list(new_values.values())
+        self._seen.difference_update(value.lower() for value in failed)
+
+    def stop(self) -> None:
+        self._stopping = True
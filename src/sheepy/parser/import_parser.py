@@ -0,0 +1,80 @@
+"""Reads movies to import from csv/tsv files, such as IMDb or Letterboxd exports."""
+
+import csv
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from sheepy.util.logger import get_logger
+from sheepy.util.string_util import extract_imdb_ids, parse_int
+
+import_logger = get_logger(__name__)
+
+TITLE_COLUMNS = ("title", "name", "original title")
+YEAR_COLUMNS = ("year", "release year")
+
+
+@dataclass
+class ImportEntry:
+    """Movie to import, identified by IMDb ID or by title and year"""
+
+    imdb_id: str | None = None
+    title: str | None = None
+    year: int | None = None
+
+    def __str__(self) -> str:
+        return self.imdb_id or f"{self.title} ({self.year})"
+
+
+def _find_column(header: list[str], names: tuple[str, ...]) -> int | None:
+    for i, cell in enumerate(header):
+        if cell.lower() in names:
+            return i
+    return None
+
+
+def read_import_file(filename: str) -> Iterator[tuple[int, ImportEntry]]:
+    """Streams movies to import from a csv or tsv file row by row.
+    Rows may contain an IMDb ID in any column or a title and a year.
+     Columns are taken from a header row if present, otherwise title
+      and year are expected in the first two columns.
+       Rows that can not be read are logged and skipped
+
+    Args:
+        filename (str): path of csv file, tab separated if it ends with .tsv
+
+    Yields:
+        tuple[int, ImportEntry]: line number and movie of every readable row
+    """
+    delimiter: str = "\t" if filename.lower().endswith(".tsv") else ","
+    title_column: int | None = 0
+    year_column: int | None = 1
+    with open(filename, "r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        for row in reader:
+            cells: list[str] = [cell.strip() for cell in row]
+            if not any(cells) or cells[0].startswith("#"):
+                continue
+            if reader.line_num == 1 and not extract_imdb_ids(delimiter.join(cells)):
+                header_title = _find_column(cells, TITLE_COLUMNS)
+                if header_title is not None:
+                    title_column = header_title
+                    year_column = _find_column(cells, YEAR_COLUMNS)
+                    continue
+            imdb_ids: list[str] = extract_imdb_ids(delimiter.join(cells))
+            if imdb_ids:
+                yield reader.line_num, ImportEntry(imdb_id=imdb_ids[0])
+                continue
+            title: str = "" if title_column is None else _get(cells, title_column)
+            year: int | None = (
+                None if year_column is None else parse_int(_get(cells, year_column))
+            )
+            if not title or year is None:
+                import_logger.warning(
+                    f"Skipping line {reader.line_num} of {filename}: {row}"
+                )
+                continue
+            yield reader.line_num, ImportEntry(title=title, year=year)
+
+
+def _get(cells: list[str], index: int) -> str:
+    return cells[index] if index < len(cells) else ""
@@ -0,0 +1,53 @@
+"""Token and headers that authenticate CLI requests to the sheepy server."""
+
+import os
+import secrets
+
+from sheepy.util.file import atomic_write, get_cache_dir
+
+TOKEN_FILE = "server.token"
+TOKEN_HEADER = "X-Sheepy-Token"
+# sheet configured for the CLI, the server only changes the sheet it serves
+SPREADSHEET_HEADER = "X-Sheepy-Spreadsheet"
+WORKSHEET_HEADER = "X-Sheepy-Worksheet"
+
+
+def _token_path() -> str:
+    return os.path.join(get_cache_dir(), TOKEN_FILE)
+
+
+def create_token() -> str:
+    """Creates a new random token and stores it in the cache directory.
+     The file is only readable by the current user
+
+    Returns:
+        str: created token
+    """
+    token: str = secrets.token_urlsafe(32)
+    # atomic_write creates its temporary file with mode 0600
+    with atomic_write(_token_path()) as f:
+        f.write(token.encode())
+    return token
+
+
+def read_token() -> str | None:
+    """Reads token of the running server
+
+    Returns:
+        str | None: stored token or None if no server has stored one
+    """
+    try:
+        with open(_token_path(), "r") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def delete_token(token: str) -> None:
+    """Deletes stored token, unless another server has replaced it
+
+    Args:
+        token (str): token of the stopping server
+    """
+    if read_token() == token:
+        os.remove(_token_path())
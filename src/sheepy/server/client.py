@@ -0,0 +1,194 @@
+"""Thin client that forwards CLI commands to a running sheepy server."""
+
+import http.client
+import json
+import urllib.error
+import urllib.request
+from typing import Any, BinaryIO
+from urllib.parse import urlencode
+
+from sheepy.server.auth import (
+    SPREADSHEET_HEADER,
+    TOKEN_HEADER,
+    WORKSHEET_HEADER,
+    read_token,
+)
+from sheepy.util.config import SERVER_HOST, get_env, get_server_port
+from sheepy.util.exceptions import MovieRetrievalError, ServerError
+from sheepy.util.logger import get_logger
+
+client_logger = get_logger(__name__)
+
+REQUEST_TIMEOUT = 600
+CHUNK_SIZE = 64 * 1024
+
+
+def _open(
+    method: str,
+    path: str,
+    payload: dict[str, Any] | None = None,
+    port: int | None = None,
+) -> http.client.HTTPResponse | None:
+    """Sends request to the sheepy server.
+    The configured sheet is sent along, a server serving another sheet
+     refuses the request and the command runs locally
+
+    Args:
+        method (str): HTTP method
+        path (str): path including query string
+        payload (dict[str, Any] | None, optional): JSON body. Defaults to None.
+        port (int | None, optional): port of server. Defaults to None.
+
+    Raises:
+        MovieRetrievalError: if the server could not find the movie
+        ServerError: if the server failed or closed the connection
+
+    Returns:
+        http.client.HTTPResponse | None: response or None if no server
+         is running or it serves another sheet
+    """
+    token: str | None = read_token()
+    if token is None:
+        return None
+    request = urllib.request.Request(
+        f"http://{SERVER_HOST}:{get_server_port() if port is None else port}{path}",
+        data=None if payload is None else json.dumps(payload).encode(),
+        headers={
+            "Content-Type": "application/json",
+            TOKEN_HEADER: token,
+            SPREADSHEET_HEADER: get_env("SPREADSHEET_ID") or "",
+            WORKSHEET_HEADER: get_env("WORKSHEET_INDEX") or "",
+        },
+        method=method,
+    )
+    try:
+        return urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT)
+    except urllib.error.HTTPError as he:
+        error: str = _error_message(he)
+        if he.code == 409:
+            client_logger.info(f"Running locally, {error}")
+            return None
+        if he.code == 404:
+            raise MovieRetrievalError(error) from he
+        raise ServerError(f"sheepy server failed: {error}") from he
+    except urllib.error.URLError:
+        return None
+    except (http.client.HTTPException, OSError) as e:
+        raise ServerError(f"sheepy server failed: {e!r}") from e
+
+
+def _error_message(error: urllib.error.HTTPError) -> str:
+    try:
+        return json.loads(error.read()).get("error", str(error))
+    except (ValueError, http.client.HTTPException, OSError):
+        return str(error)
+
+
+def _request(
+    method: str,
+    path: str,
+    payload: dict[str, Any] | None = None,
+    port: int | None = None,
+) -> bytes | None:
+    """Sends request to the sheepy server and reads the response body
+
+    Args:
+        method (str): HTTP method
+        path (str): path including query string
+        payload (dict[str, Any] | None, optional): JSON body. Defaults to None.
+        port (int | None, optional): port of server. Defaults to None.
+
+    Raises:
+        MovieRetrievalError: if the server could not find the movie
+        ServerError: if the server failed or closed the connection
+
+    Returns:
+        bytes | None: response body or None if no server is running
+         or it serves another sheet
+    """
+    response = _open(method, path, payload, port)
+    if response is None:
+        return None
+    with response:
+        try:
+            return response.read()
+        except (http.client.HTTPException, OSError) as e:
+            raise ServerError(f"sheepy server failed: {e!r}") from e
+
+
+def forward_add(
+    imdb_ids: list[str],
+    watched: bool,
+    max_workers: int,
+    port: int | None = None,
+    bulk: bool = False,
+) -> dict[str, str] | None:
+    """Forwards add command to the sheepy server
+
+    Args:
+        imdb_ids (list[str]): IMDB IDs of movies
+        watched (bool): Whether to tick watched checkbox
+        max_workers (int): Number of concurrent OMDb requests
+        port (int | None, optional): port of server. Defaults to None.
+        bulk (bool, optional): Whether to send OMDb requests as bulk work.
+         Defaults to False.
+
+    Returns:
+        dict[str, str] | None: IMDB IDs that could not be added and their errors
+         or None if no server is running or it serves another sheet
+    """
+    body = _request(
+        "POST",
+        "/add",
+        {
+            "imdb_ids": imdb_ids,
+            "watched": watched,
+            "max_workers": max_workers,
+            "bulk": bulk,
+        },
+        port,
+    )
+    return None if body is None else json.loads(body)["failed"]
+
+
+def forward_view(imdb_id: str, port: int | None = None) -> str | None:
+    """Forwards view command to the sheepy server
+
+    Args:
+        imdb_id (str): IMDB ID of movie
+        port (int | None, optional): port of server. Defaults to None.
+
+    Returns:
+        str | None: movie information table or None if no server is running
+    """
+    body = _request("GET", "/view?" + urlencode({"imdb_id": imdb_id}), port=port)
+    return None if body is None else json.loads(body)["info"]
+
+
+def forward_download(out: BinaryIO, port: int | None = None) -> bool:
+    """Forwards download command to the sheepy server,
+     the csv is streamed to out in chunks
+
+    Args:
+        out (BinaryIO): file to write csv to
+        port (int | None, optional): port of server. Defaults to None.
+
+    Raises:
+        ServerError: if the server failed or closed the connection
+
+    Returns:
+        bool: Whether the csv was written, False if no server is running
+         or it serves another sheet
+    """
+    response = _open("POST", "/dl", {}, port)
+    if response is None:
+        return False
+    with response:
+        while True:
+            try:
+                chunk: bytes = response.read(CHUNK_SIZE)
+            except (http.client.HTTPException, OSError) as e:
+                raise ServerError(f"sheepy server failed: {e!r}") from e
+            if not chunk:
+                return True
+            out.write(chunk)
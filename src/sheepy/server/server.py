@@ -0,0 +1,202 @@
+"""Long-running sheepy server that keeps spreadsheet and OMDb connections warm."""
+
+import hmac
+import itertools
+import json
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import ParseResult, parse_qs, urlparse
+
+from sheepy.core import add_movies_to_sheet
+from sheepy.omdb.api import process_movie_request_imdb_id, show_info
+from sheepy.server.auth import (
+    SPREADSHEET_HEADER,
+    TOKEN_HEADER,
+    WORKSHEET_HEADER,
+    create_token,
+    delete_token,
+)
+from sheepy.spreadsheet.spreadsheet import SheepySpreadsheet
+from sheepy.util.config import MAX_WORKERS, SERVER_HOST, get_server_port
+from sheepy.util.exceptions import MovieRetrievalError
+from sheepy.util.logger import get_logger
+
+server_logger = get_logger(__name__)
+
+ALLOWED_HOSTS = {SERVER_HOST, "localhost"}
+# paths that read or write the served sheet
+SHEET_PATHS = {"/add", "/dl"}
+
+
+class SheepyServer(ThreadingHTTPServer):
+    """HTTP server on localhost holding one authenticated spreadsheet handle.
+    Requests have to carry the token stored in the cache directory,
+     requests for another sheet are refused with 409 Conflict
+
+    Args:
+        ThreadingHTTPServer: Handles every request in its own thread
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, ss: SheepySpreadsheet, host: str = SERVER_HOST, port: int | None = None
+    ) -> None:
+        super(SheepyServer, self).__init__(
+            (host, get_server_port() if port is None else port), SheepyRequestHandler
+        )
+        self.ss = ss
+        self.sheet_lock = threading.Lock()
+        self.token: str = create_token()
+
+    def server_close(self) -> None:
+        super(SheepyServer, self).server_close()
+        delete_token(self.token)
+
+
+class SheepyRequestHandler(BaseHTTPRequestHandler):
+    """Handles add, view and download requests forwarded by the CLI"""
+
+    server: SheepyServer
+    # chunked responses need HTTP/1.1
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self._handle(self._get)
+
+    def do_POST(self) -> None:
+        self._handle(self._post)
+
+    def _get(self, url: ParseResult) -> None:
+        if url.path == "/ping":
+            self._send_json(200, {"status": "ok"})
+        elif url.path == "/view":
+            imdb_id: str = parse_qs(url.query).get("imdb_id", [""])[0]
+            try:
+                view_data = process_movie_request_imdb_id(imdb_id, False, False)
+            except MovieRetrievalError as mre:
+                self._send_json(404, {"error": str(mre)})
+                return
+            self._send_json(200, {"info": show_info(view_data)})
+        else:
+            self._send_json(404, {"error": f"Unknown path {url.path}"})
+
+    def _post(self, url: ParseResult) -> None:
+        if url.path == "/add":
+            payload: dict[str, Any] = self._read_json()
+            with self.server.sheet_lock:
+                failed = add_movies_to_sheet(
+                    ss=self.server.ss,
+                    imdb_ids=payload.get("imdb_ids", []),
+                    watched=payload.get("watched", False),
+                    max_workers=payload.get("max_workers", MAX_WORKERS),
+                    bulk=payload.get("bulk", False),
+                )
+            self._send_json(
+                200, {"failed": {imdb_id: str(e) for imdb_id, e in failed.items()}}
+            )
+        elif url.path == "/dl":
+            with self.server.sheet_lock:
+                chunks: Iterator[bytes] = self.server.ss.iter_csv()
+                # export errors are raised before the response is started
+                first: bytes = next(chunks, b"")
+            # the export request is sent, streaming it does not need the sheet
+            self._send_chunked(itertools.chain([first], chunks), "text/csv")
+        else:
+            self._send_json(404, {"error": f"Unknown path {url.path}"})
+
+    def _handle(self, handler: Callable[[ParseResult], None]) -> None:
+        self._responded: bool = False
+        # the body is read in any case to keep the connection usable
+        self._body: bytes = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        error: str | None = self._reject_reason()
+        if error is not None:
+            server_logger.warning(f"Rejected {self.command} {self.path}: {error}")
+            self.close_connection = True
+            self._send_json(403, {"error": error})
+            return
+        url: ParseResult = urlparse(self.path)
+        if url.path in SHEET_PATHS and (error := self._sheet_mismatch()):
+            server_logger.info(f"Refused {self.command} {self.path}: {error}")
+            self._send_json(409, {"error": error})
+            return
+        try:
+            handler(url)
+        except Exception as e:
+            server_logger.exception(f"{self.command} {self.path} failed")
+            self.close_connection = True
+            if not self._responded:
+                self._send_json(500, {"error": str(e)})
+
+    def _reject_reason(self) -> str | None:
+        host: str = self.headers.get("Host", "").rsplit(":", 1)[0]
+        if host not in ALLOWED_HOSTS:
+            return f"Host {host} not allowed"
+        # browsers send Origin with cross-origin requests, the CLI never does
+        if "Origin" in self.headers:
+            return "Cross-origin requests not allowed"
+        if not hmac.compare_digest(
+            self.headers.get(TOKEN_HEADER, ""), self.server.token
+        ):
+            return "Invalid token"
+        return None
+
+    def _sheet_mismatch(self) -> str | None:
+        ss: SheepySpreadsheet = self.server.ss
+        served: tuple[str, str] = (ss.spreadsheet_id or "", ss.worksheet_index or "")
+        requested: tuple[str, str] = (
+            self.headers.get(SPREADSHEET_HEADER, ""),
+            self.headers.get(WORKSHEET_HEADER, ""),
+        )
+        if requested == served:
+            return None
+        return f"Server serves worksheet {served[1]} of spreadsheet {served[0]}"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        server_logger.debug(format, *args)
+
+    def _read_json(self) -> dict[str, Any]:
+        return json.loads(self._body or b"{}")
+
+    def _send_json(self, status: int, body: dict[str, Any]) -> None:
+        self._send(status, json.dumps(body).encode(), "application/json")
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self._responded = True
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunked(self, chunks: Iterable[bytes], content_type: str) -> None:
+        self._responded = True
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks:
+            if chunk:
+                self.wfile.write(b"%X\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def serve(port: int | None = None) -> None:
+    """Runs the sheepy server until interrupted
+
+    Args:
+        port (int | None, optional): port to listen on. Defaults to None,
+         which uses SHEEPY_SERVER_PORT or the default port.
+    """
+    ss: SheepySpreadsheet = SheepySpreadsheet.from_env_file()
+    server: SheepyServer = SheepyServer(ss, port=port)
+    print(f"Serving on http://{SERVER_HOST}:{server.server_address[1]}")
+    print("Press Ctrl+C in terminal window to exit.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Exiting...")
+    finally:
+        server.server_close()
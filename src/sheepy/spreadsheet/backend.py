@@ -0,0 +1,60 @@
+"""Selects the backend spreadsheets are read from and written to."""
+
+import os
+
+import gspread
+
+from sheepy.util.logger import get_logger
+
+backend_logger = get_logger(__name__)
+
+BACKENDS = ("google", "memory")
+
+_memory_backend = None
+
+
+def get_memory_backend():
+    """Returns in-memory backend shared by all spreadsheets of this process.
+    Latency and rate limit errors are configured by
+     SHEEPY_MEMORY_LATENCY and SHEEPY_MEMORY_RATE_LIMIT
+
+    Returns:
+        InMemorySheets: shared in-memory backend
+    """
+    global _memory_backend
+    if _memory_backend is None:
+        from sheepy.spreadsheet.memory import (
+            MEMORY_LATENCY,
+            MEMORY_RATE_LIMIT,
+            InMemorySheets,
+        )
+
+        _memory_backend = InMemorySheets(
+            latency=MEMORY_LATENCY, rate_limit=MEMORY_RATE_LIMIT, auto_create=True
+        )
+    return _memory_backend
+
+
+def open_client(backend: str | None = None) -> gspread.Client:
+    """Creates gspread client for the configured backend
+
+    Args:
+        backend (str | None, optional): "google" or "memory". Defaults to None,
+         which reads SHEEPY_BACKEND and falls back to "google".
+
+    Raises:
+        ValueError: if backend is unknown
+        FileNotFoundError: if Google credentials are missing
+
+    Returns:
+        gspread.Client: client of backend
+    """
+    backend = backend or os.environ.get("SHEEPY_BACKEND", "google")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend}, use one of {BACKENDS}")
+    if backend == "memory":
+        from sheepy.spreadsheet.memory import memory_client
+
+        backend_logger.info("Using in-memory spreadsheet backend")
+        return memory_client(get_memory_backend())
+    return gspread.service_account()  # type: ignore
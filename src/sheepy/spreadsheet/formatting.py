@@ -1,15 +1,14 @@
+import math
 from typing import TYPE_CHECKING, Any
 
 import gspread
-from gspread.utils import ValueInputOption
+from gspread.utils import ValueInputOption, a1_range_to_grid_range
 from gspread_formatting import (
     BooleanCondition,
     CellFormat,
     DataValidationRule,
-    SpreadsheetBatchUpdater,
     TextFormat,
-    format_cell_range,
-    set_data_validation_for_cell_range,
+    batch_update_requests,
     set_frozen,
 )
 
@@ -18,6 +17,8 @@ from .sheet_config import (
     COLUMNS,
     SHEET_BACKGROUND_COLOR_EVEN,
     SHEET_BACKGROUND_COLOR_ODD,
+    SHEET_BANDED_RANGE,
+    SHEET_FORMAT_CHUNK_ROWS,
     SHEET_HEADER_RANGE,
     SHEET_PLOT_COL,
     SHEET_ROW_HEIGHT,
@@ -32,18 +33,27 @@ if TYPE_CHECKING:
 # TODO: Custom Image width/height
 
 
-def setup_sheet_formatting(ss: "SheepySpreadsheet") -> None:
+def setup_requests(ss: "SheepySpreadsheet") -> list[dict[str, Any]]:
     """
-    Setup sheet formatting
-    Calling other functions to set up individual parts
+    Builds batch update requests that write headers and set up text colors,
+    banding, checkboxes, row heights, header format and column widths
 
     Args:
         ss (SheepySpreadsheet): Spreadsheet object
+
+    Returns:
+        list[dict[str, Any]]: requests for a single spreadsheets.batchUpdate call
     """
-    check_headers(ss)
-    setup_sheet_text_and_color(ss)
-    header_format(ss)
-    setup_columns(ss)
+    if ss.worksheet is None:
+        raise ValueError("Worksheet of SheepySpreadsheet object is not set.")
+    return (
+        insert_rows_requests(ss, 1, [list(COLUMNS)])
+        + text_and_color_requests(ss)
+        + [banding_request(ss)]
+        + data_rows_requests(ss, 2, ss.worksheet.row_count)
+        + header_format_requests(ss)
+        + column_requests(ss)
+    )
 
 
 def setup_headers(ss: "SheepySpreadsheet") -> None:
@@ -83,127 +93,317 @@ def check_headers(ss: "SheepySpreadsheet") -> None:
         setup_headers(ss)
 
 
-# noinspection PyTestUnpassedFixture
-def setup_sheet_text_and_color(ss: "SheepySpreadsheet") -> None:
+def text_and_color_requests(ss: "SheepySpreadsheet") -> list[dict[str, Any]]:
     """
-    Sets up Sheet Background Color and Text Color
+    Builds batch update requests that set up text color and alignment
 
     Args:
         ss (SheepySpreadsheet): Spreadsheet object
+
+    Returns:
+        list[dict[str, Any]]: requests for a single spreadsheets.batchUpdate call
     """
     fmt_center: CellFormat = CellFormat(
-        backgroundColor=SHEET_BACKGROUND_COLOR_EVEN,
         textFormat=TextFormat(foregroundColor=SHEET_TEXT_COLOR),
         horizontalAlignment="CENTER",
         verticalAlignment="MIDDLE",
     )
     fmt_left_align: CellFormat = CellFormat(
-        backgroundColor=SHEET_BACKGROUND_COLOR_EVEN,
         textFormat=TextFormat(foregroundColor=SHEET_TEXT_COLOR),
         horizontalAlignment="LEFT",
         verticalAlignment="MIDDLE",
     )
-    batch: SpreadsheetBatchUpdater = SpreadsheetBatchUpdater(ss.spreadsheet)
+    requests: list[dict[str, Any]] = []
     # convert ascii numbers to column names
     for i in range(65, 77):
         if chr(i) in ["B", "D", "J"]:
-            batch.format_cell_range(ss.worksheet, chr(i), fmt_left_align)  # type: ignore
+            requests += batch_update_requests.format_cell_range(
+                ss.worksheet, chr(i), fmt_left_align
+            )
         else:
-            batch.format_cell_range(ss.worksheet, chr(i), fmt_center)  # type: ignore
-    batch.execute()
+            requests += batch_update_requests.format_cell_range(
+                ss.worksheet, chr(i), fmt_center
+            )
+    return requests
 
 
-def color_odd_rows(ss: "SheepySpreadsheet", row: int, nth: int) -> None:
-    """Changes color of every nth row to value specified
-     in sheet_config.py (SHEET_BACKGROUND_COLOR_ODD)
+def banding_request(ss: "SheepySpreadsheet") -> dict[str, Any]:
+    """
+    Builds batch update request that colors rows alternately.
+    Banding follows rows when they are sorted or deleted
+     and covers rows inserted later without further requests
 
     Args:
         ss (SheepySpreadsheet): Spreadsheet object
-        row (int): number of current row
-        nth (int): number of every nth row to be colored
-    """
-    if row % nth == 0:
-        gray_row: CellFormat = CellFormat(backgroundColor=SHEET_BACKGROUND_COLOR_ODD)
-        format_cell_range(ss.worksheet, f"A{row}:L{row}", gray_row)
-
 
-def header_format(ss: "SheepySpreadsheet") -> None:
+    Returns:
+        dict[str, Any]: addBanding request
     """
-    Sets up Header Row (Row 1)
+    if ss.worksheet is None:
+        raise ValueError("Worksheet of SheepySpreadsheet object is not set.")
+    return {
+        "addBanding": {
+            "bandedRange": {
+                "range": a1_range_to_grid_range(SHEET_BANDED_RANGE, ss.worksheet.id),
+                "rowProperties": {
+                    "headerColor": SHEET_BACKGROUND_COLOR_EVEN.to_props(),
+                    "firstBandColor": SHEET_BACKGROUND_COLOR_ODD.to_props(),
+                    "secondBandColor": SHEET_BACKGROUND_COLOR_EVEN.to_props(),
+                },
+            }
+        }
+    }
+
+
+def reformat_sheet(ss: "SheepySpreadsheet") -> None:
+    """
+    Migrates row colors of a sheet to banding.
+    Removes existing banding of the movie columns and background colors of single rows,
+     then adds banding, all with a single batch update request.
+    Banded ranges outside of SHEET_BANDED_RANGE are kept
 
     Args:
         ss (SheepySpreadsheet): Spreadsheet object
     """
-    fmt: CellFormat = CellFormat(
-        textFormat=TextFormat(bold=True),
-        horizontalAlignment="CENTER",
+    if ss.worksheet is None or ss.spreadsheet is None:
+        raise ValueError("Worksheet of SheepySpreadsheet object is not set.")
+    metadata: dict[str, Any] = ss.spreadsheet.fetch_sheet_metadata(
+        {"fields": "sheets(properties.sheetId,bandedRanges(bandedRangeId,range))"}
     )
-    format_cell_range(ss.worksheet, SHEET_HEADER_RANGE, fmt)
-    _freeze_header_row(ss)
+    grid_range: dict[str, Any] = a1_range_to_grid_range(
+        SHEET_BANDED_RANGE, ss.worksheet.id
+    )
+    requests: list[dict[str, Any]] = [
+        {"deleteBanding": {"bandedRangeId": banded_range["bandedRangeId"]}}
+        for sheet in metadata.get("sheets", [])
+        if sheet["properties"]["sheetId"] == ss.worksheet.id
+        for banded_range in sheet.get("bandedRanges", [])
+        if _grid_ranges_overlap(banded_range["range"], grid_range)
+    ]
+    ss.logger.info("Removing %d banded ranges", len(requests))
+    requests.append(
+        {
+            "repeatCell": {
+                "range": grid_range,
+                "cell": {"userEnteredFormat": {}},
+                "fields": "userEnteredFormat.backgroundColor",
+            }
+        }
+    )
+    requests.append(banding_request(ss))
+    ss.spreadsheet.batch_update({"requests": requests})
+
 
+def _grid_ranges_overlap(first: dict[str, Any], second: dict[str, Any]) -> bool:
+    # missing indexes of a GridRange are unbounded
+    for dimension in ("Row", "Column"):
+        if first.get(f"start{dimension}Index", 0) >= second.get(
+            f"end{dimension}Index", math.inf
+        ) or second.get(f"start{dimension}Index", 0) >= first.get(
+            f"end{dimension}Index", math.inf
+        ):
+            return False
+    return True
 
-def setup_checkboxes(
-    ss: "SheepySpreadsheet",
-    cell: str,
-) -> None:
+
+def insert_rows_requests(
+    ss: "SheepySpreadsheet", first_row: int, values: list[list[str]]
+) -> list[dict[str, Any]]:
     """
-    Sets up Checkboxes for watched value
+    Builds batch update request that writes values of a block of inserted rows.
+    Checkboxes and row height are set up for the data rows in advance,
+     see data_rows_requests
 
     Args:
         ss (SheepySpreadsheet): Spreadsheet object
-        cell (str): Cell to put Checkbox
+        first_row (int): number of first inserted row
+        values (list[list[str]]): row values to insert
+
+    Returns:
+        list[dict[str, Any]]: requests for a single spreadsheets.batchUpdate call
+    """
+    if ss.worksheet is None:
+        raise ValueError("Worksheet of SheepySpreadsheet object is not set.")
+    ws: gspread.Worksheet = ss.worksheet  # type: ignore
+    return [
+        {
+            "updateCells": {
+                "start": {
+                    "sheetId": ws.id,
+                    "rowIndex": first_row - 1,
+                    "columnIndex": 0,
+                },
+                "rows": [{"values": [_to_cell_data(v) for v in row]} for row in values],
+                "fields": "userEnteredValue,userEnteredFormat.numberFormat",
+            }
+        }
+    ]
+
+
+def data_rows_requests(
+    ss: "SheepySpreadsheet", first_row: int, last_row: int
+) -> list[dict[str, Any]]:
     """
+    Builds batch update requests that set up checkboxes
+    and row height for a block of data rows
+
+    Args:
+        ss (SheepySpreadsheet): Spreadsheet object
+        first_row (int): number of first row
+        last_row (int): number of last row
+
+    Returns:
+        list[dict[str, Any]]: requests for a single spreadsheets.batchUpdate call
+    """
+    if ss.worksheet is None:
+        raise ValueError("Worksheet of SheepySpreadsheet object is not set.")
+    ws: gspread.Worksheet = ss.worksheet  # type: ignore
     validation: DataValidationRule = DataValidationRule(
         BooleanCondition("BOOLEAN", ["True", "False"]), showCustomUi=True
     )
-    set_data_validation_for_cell_range(ss.worksheet, cell, validation)
+    requests: list[dict[str, Any]] = []
+    requests += batch_update_requests.set_data_validation_for_cell_range(
+        ws, f"A{first_row}:A{last_row}", validation
+    )
+    requests += batch_update_requests.set_row_height(
+        ws, f"{first_row}:{last_row}", SHEET_ROW_HEIGHT
+    )
+    return requests
 
 
-def _freeze_header_row(ss: "SheepySpreadsheet", row: int = 1) -> None:
+def extend_data_rows_requests(
+    ss: "SheepySpreadsheet", formatted_rows: int, last_row: int
+) -> tuple[list[dict[str, Any]], int]:
     """
-    Freezes header row
-    (stays fixed to top when scrolling)
+    Builds batch update requests that set up the data rows after formatted_rows
+    up to a chunk of SHEET_FORMAT_CHUNK_ROWS rows after last_row.
+    Rows are added to the worksheet if it is too small
 
     Args:
         ss (SheepySpreadsheet): Spreadsheet object
-        row (int, optional): Row number to freeze. Defaults to 1
+        formatted_rows (int): number of last row that is already set up
+        last_row (int): number of last row that has to be set up
+
+    Returns:
+        tuple[list[dict[str, Any]], int]: requests and number of last row
+         that is set up afterwards
     """
-    set_frozen(ss.worksheet, rows=row)
+    if ss.worksheet is None:
+        raise ValueError("Worksheet of SheepySpreadsheet object is not set.")
+    if last_row <= formatted_rows:
+        return [], formatted_rows
+    end_row: int = last_row + SHEET_FORMAT_CHUNK_ROWS
+    # writing values already grew the grid to at least last_row rows
+    grid_rows: int = max(ss.worksheet.row_count, last_row)
+    requests: list[dict[str, Any]] = []
+    if end_row > grid_rows:
+        requests.append(
+            {
+                "appendDimension": {
+                    "sheetId": ss.worksheet.id,
+                    "dimension": "ROWS",
+                    "length": end_row - grid_rows,
+                }
+            }
+        )
+    requests += data_rows_requests(ss, max(formatted_rows + 1, 2), end_row)
+    return requests, end_row
+
+
+def _to_extended_value(value: str) -> dict[str, Any]:
+    """
+    Converts a cell value to an ExtendedValue,
+    interpreting it like a value entered by the user.
+    Percentages like "89%" are stored as fractions, see _to_cell_data
 
+    Args:
+        value (str): cell value
 
-def set_insert_row_height(ss: "SheepySpreadsheet", row: int) -> None:
+    Returns:
+        dict[str, Any]: ExtendedValue object of the Sheets API
+    """
+    if value.startswith("="):
+        return {"formulaValue": value}
+    if value.upper() in ("TRUE", "FALSE"):
+        return {"boolValue": value.upper() == "TRUE"}
+    percent: bool = value.endswith("%")
+    try:
+        number: float = float(value[:-1] if percent else value)
+    except ValueError:
+        return {"stringValue": value}
+    if not math.isfinite(number):
+        return {"stringValue": value}
+    return {"numberValue": number / 100 if percent else number}
+
+
+def _to_cell_data(value: str) -> dict[str, Any]:
     """
-    Sets row height for given row
+    Converts a cell value to CellData, percentages get a percent number format
+    like values entered by the user
+
+    Args:
+        value (str): cell value
+
+    Returns:
+        dict[str, Any]: CellData object of the Sheets API
+    """
+    cell: dict[str, Any] = {"userEnteredValue": _to_extended_value(value)}
+    if value.endswith("%") and "numberValue" in cell["userEnteredValue"]:
+        pattern: str = "0%" if float(value[:-1]).is_integer() else "0.00%"
+        cell["userEnteredFormat"] = {
+            "numberFormat": {"type": "PERCENT", "pattern": pattern}
+        }
+    return cell
+
+
+def header_format_requests(ss: "SheepySpreadsheet") -> list[dict[str, Any]]:
+    """
+    Builds batch update requests that format and freeze the header row
 
     Args:
         ss (SheepySpreadsheet): Spreadsheet object
-        row (int, optional): Row number
+
+    Returns:
+        list[dict[str, Any]]: requests for a single spreadsheets.batchUpdate call
     """
-    if ss.worksheet is None:
-        raise ValueError("Worksheet of SheepySpreadsheet object is not set.")
-    batch: SpreadsheetBatchUpdater = SpreadsheetBatchUpdater(ss.spreadsheet)
-    ws: gspread.Worksheet = ss.worksheet  # type: ignore
-    # Set height of row
-    batch.set_row_height(ws, f"{row}", SHEET_ROW_HEIGHT)  # type: ignore
-    batch.execute()
+    fmt: CellFormat = CellFormat(
+        textFormat=TextFormat(bold=True),
+        horizontalAlignment="CENTER",
+    )
+    return batch_update_requests.format_cell_range(
+        ss.worksheet, SHEET_HEADER_RANGE, fmt
+    ) + batch_update_requests.set_frozen(ss.worksheet, rows=1)
 
 
-def setup_columns(ss: "SheepySpreadsheet") -> None:
+def _freeze_header_row(ss: "SheepySpreadsheet", row: int = 1) -> None:
     """
-    Sets column widths for columns used for values
+    Freezes header row
+    (stays fixed to top when scrolling)
 
     Args:
         ss (SheepySpreadsheet): Spreadsheet object
+        row (int, optional): Row number to freeze. Defaults to 1
+    """
+    set_frozen(ss.worksheet, rows=row)
+
+
+def column_requests(ss: "SheepySpreadsheet") -> list[dict[str, Any]]:
+    """
+    Builds batch update requests that set column widths
+    and wrap text of the plot column
+
+    Args:
+        ss (SheepySpreadsheet): Spreadsheet object
+
+    Returns:
+        list[dict[str, Any]]: requests for a single spreadsheets.batchUpdate call
     """
     if ss.worksheet is None:
         raise ValueError("Worksheet of SheepySpreadsheet object is not set.")
-    batch: SpreadsheetBatchUpdater = SpreadsheetBatchUpdater(ss.spreadsheet)
     cf: CellFormat = CellFormat(wrapStrategy="WRAP", verticalAlignment="MIDDLE")
     ws: gspread.Worksheet = ss.worksheet  # type: ignore
 
-    for format_tuple in COLUMN_WIDTHS:
-        # col, width = format_tuple
-        batch.set_column_width(ws, *format_tuple)  # type: ignore
-
-    batch.format_cell_range(ws, SHEET_PLOT_COL, cf)  # type: ignore
-    batch.execute()
+    requests: list[dict[str, Any]] = batch_update_requests.set_column_widths(
+        ws, COLUMN_WIDTHS
+    )
+    return requests + batch_update_requests.format_cell_range(ws, SHEET_PLOT_COL, cf)
@@ -0,0 +1,800 @@
+"""In-memory stand-in for the Google Sheets and Drive APIs.
+
+InMemorySheets is a requests transport adapter, so gspread, gspread_formatting
+ and the csv export run unchanged against spreadsheets held in memory.
+ Cells keep typed values like Sheets does, so USER_ENTERED input is parsed
+  and values are rendered by the requested value render option.
+ Requests are counted per operation, latency and rate limit errors (429)
+  can be injected to load-test sheepy without Google credentials.
+"""
+
+import csv
+import io
+import itertools
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlparse
+
+import gspread
+import requests
+from gspread.utils import a1_range_to_grid_range
+from requests.adapters import BaseAdapter
+
+from sheepy.util.logger import get_logger
+
+memory_logger = get_logger(__name__)
+
+MEMORY_LATENCY = float(os.environ.get("SHEEPY_MEMORY_LATENCY", 0))
+MEMORY_RATE_LIMIT = float(os.environ.get("SHEEPY_MEMORY_RATE_LIMIT", 0))
+DEFAULT_ROWS = 1000
+DEFAULT_COLS = 26
+
+_SHEETS_PATH = re.compile(r"^/v4/spreadsheets/([^/:]+)(.*)$")
+_VALUES_PATH = re.compile(r"^/values/([^:]+)(?::(append|clear))?$")
+_DRIVE_PATH = re.compile(
+    r"^/drive/v3/files(?:/([^/]+))?(?:/(export|permissions))?(?:/(.+))?$"
+)
+_EXPORT_PATH = re.compile(r"^/spreadsheets/d/([^/]+)/export$")
+
+
+@dataclass
+class MemorySheet:
+    """Worksheet holding its values as list of rows"""
+
+    properties: dict[str, Any]
+    # cell values are strings, numbers, booleans or formulas starting with "="
+    rows: list[list[Any]] = field(default_factory=list)
+    # number format types such as "PERCENT" by row and column index
+    number_formats: dict[tuple[int, int], str] = field(default_factory=dict)
+    # batch update requests that only change formatting or validation
+    formats: list[dict[str, Any]] = field(default_factory=list)
+    banded_ranges: list[dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class MemorySpreadsheet:
+    """Spreadsheet with its worksheets and Drive metadata"""
+
+    id: str
+    title: str
+    sheets: list[MemorySheet] = field(default_factory=list)
+    version: int = 1
+    permissions: list[dict[str, Any]] = field(default_factory=list)
+
+
+class _ReplyError(Exception):
+    # ends handling of a request with an error status
+    def __init__(self, status: int, message: str, reason: str) -> None:
+        super(_ReplyError, self).__init__(message)
+        self.status = status
+        self.reason = reason
+
+
+class InMemorySheets(BaseAdapter):
+    """Transport adapter answering Sheets, Drive and export requests from memory"""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        rate_limit: float = 0.0,
+        auto_create: bool = False,
+        seed: int | None = None,
+    ) -> None:
+        """Constructor of InMemorySheets
+
+        Args:
+            latency (float, optional): Seconds every response is delayed.
+             Defaults to 0.0.
+            rate_limit (float, optional): Fraction of requests answered with
+             429 Too Many Requests. Defaults to 0.0.
+            auto_create (bool, optional): Whether unknown spreadsheets are created
+             with a single worksheet when requested. Defaults to False.
+            seed (int | None, optional): Seed of injected rate limit errors.
+             Defaults to None.
+        """
+        super(InMemorySheets, self).__init__()
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.auto_create = auto_create
+        self.spreadsheets: dict[str, MemorySpreadsheet] = {}
+        self.calls: Counter[str] = Counter()
+        self.updates: Counter[str] = Counter()
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+    @property
+    def total_calls(self) -> int:
+        """Number of requests received, including rate limited ones"""
+        return sum(self.calls.values())
+
+    def reset_calls(self) -> None:
+        """Resets request counters"""
+        with self._lock:
+            self.calls.clear()
+            self.updates.clear()
+
+    def create_spreadsheet(
+        self,
+        spreadsheet_id: str | None = None,
+        title: str = "Sheepy_Spreadsheet",
+        worksheet: str = "Sheet1",
+    ) -> MemorySpreadsheet:
+        """Creates spreadsheet with a single empty worksheet
+
+        Args:
+            spreadsheet_id (str | None, optional): ID of spreadsheet.
+             Defaults to None, which generates one.
+            title (str, optional): Title of spreadsheet.
+            worksheet (str, optional): Title of worksheet.
+
+        Returns:
+            MemorySpreadsheet: created spreadsheet
+        """
+        with self._lock:
+            spreadsheet_id = spreadsheet_id or f"memory{next(self._ids)}"
+            spreadsheet = MemorySpreadsheet(spreadsheet_id, title)
+            self._add_sheet(spreadsheet, {"title": worksheet})
+            self.spreadsheets[spreadsheet_id] = spreadsheet
+            return spreadsheet
+
+    def add_rows(
+        self, spreadsheet_id: str, rows: list[list[Any]], sheet_index: int = 0
+    ) -> None:
+        """Appends rows to a worksheet without counting a request,
+         e.g. to fill a sheet before a load test.
+        Values are parsed like values entered by a user
+
+        Args:
+            spreadsheet_id (str): ID of spreadsheet
+            rows (list[list[Any]]): row values to append
+            sheet_index (int, optional): Index of worksheet. Defaults to 0.
+        """
+        with self._lock:
+            sheet: MemorySheet = self.spreadsheets[spreadsheet_id].sheets[sheet_index]
+            self._write(sheet, len(sheet.rows), 0, *_parse_values(rows, "USER_ENTERED"))
+
+    def send(  # type: ignore
+        self, request: requests.PreparedRequest, **kwargs: Any
+    ) -> requests.Response:
+        """Answers a request from memory
+
+        Args:
+            request (requests.PreparedRequest): request sent by a session
+
+        Returns:
+            requests.Response: response of the emulated API
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(request.url)
+        body: Any = json.loads(request.body) if request.body else {}
+        params: dict[str, list[str]] = parse_qs(url.query)
+        try:
+            with self._lock:
+                if self.rate_limit and self._random.random() < self.rate_limit:
+                    self.calls["rate_limited"] += 1
+                    raise _ReplyError(429, "Quota exceeded", "RESOURCE_EXHAUSTED")
+                status, content = self._route(
+                    str(request.method), url.hostname or "", url.path, params, body
+                )
+        except _ReplyError as reply:
+            status = reply.status
+            content = {
+                "error": {
+                    "code": reply.status,
+                    "message": str(reply),
+                    "status": reply.reason,
+                }
+            }
+        return self._response(request, status, content)
+
+    def close(self) -> None:
+        pass
+
+    def _route(
+        self,
+        method: str,
+        host: str,
+        path: str,
+        params: dict[str, list[str]],
+        body: Any,
+    ) -> tuple[int, Any]:
+        if host == "sheets.googleapis.com" and (match := _SHEETS_PATH.match(path)):
+            spreadsheet = self._spreadsheet(match.group(1))
+            return 200, self._sheets(method, spreadsheet, match.group(2), params, body)
+        if host == "www.googleapis.com" and (match := _DRIVE_PATH.match(path)):
+            return 200, self._drive(method, *match.groups(), params, body)
+        if host == "docs.google.com" and (match := _EXPORT_PATH.match(path)):
+            self.calls["export"] += 1
+            spreadsheet = self._spreadsheet(match.group(1))
+            return 200, self._csv(self._sheet_by_id(spreadsheet, params.get("gid")))
+        raise _ReplyError(404, f"Unknown endpoint {method} {host}{path}", "NOT_FOUND")
+
+    def _sheets(
+        self,
+        method: str,
+        spreadsheet: MemorySpreadsheet,
+        rest: str,
+        params: dict[str, list[str]],
+        body: Any,
+    ) -> Any:
+        if rest == "" and method == "GET":
+            self.calls["spreadsheets.get"] += 1
+            return self._metadata(spreadsheet)
+        if rest == ":batchUpdate" and method == "POST":
+            self.calls["batchUpdate"] += 1
+            replies = [
+                self._update(spreadsheet, r) for r in _flatten(body.get("requests", []))
+            ]
+            spreadsheet.version += 1
+            response: dict[str, Any] = {
+                "spreadsheetId": spreadsheet.id,
+                "replies": replies,
+            }
+            if body.get("includeSpreadsheetInResponse"):
+                response["updatedSpreadsheet"] = self._metadata(spreadsheet)
+            return response
+        if rest.startswith("/values"):
+            return self._values(method, spreadsheet, rest, params, body)
+        raise _ReplyError(404, f"Unknown endpoint {method} {rest}", "NOT_FOUND")
+
+    def _values(
+        self,
+        method: str,
+        spreadsheet: MemorySpreadsheet,
+        rest: str,
+        params: dict[str, list[str]],
+        body: Any,
+    ) -> Any:
+        if rest == "/values:batchGet" and method == "GET":
+            self.calls["values.batchGet"] += 1
+            return {
+                "spreadsheetId": spreadsheet.id,
+                "valueRanges": [
+                    self._get(spreadsheet, r, params) for r in params.get("ranges", [])
+                ],
+            }
+        if rest == "/values:batchUpdate" and method == "POST":
+            self.calls["values.batchUpdate"] += 1
+            spreadsheet.version += 1
+            for value_range in body.get("data", []):
+                self._put(
+                    spreadsheet,
+                    value_range["range"],
+                    value_range,
+                    body.get("valueInputOption", "RAW"),
+                )
+            return {"spreadsheetId": spreadsheet.id}
+        match = _VALUES_PATH.match(rest)
+        if match is None:
+            raise _ReplyError(404, f"Unknown endpoint {method} {rest}", "NOT_FOUND")
+        range_name: str = unquote(match.group(1))
+        operation: str = {
+            (None, "GET"): "get",
+            (None, "PUT"): "update",
+            ("append", "POST"): "append",
+            ("clear", "POST"): "clear",
+        }.get((match.group(2), method), "")
+        if not operation:
+            raise _ReplyError(404, f"Unknown endpoint {method} {rest}", "NOT_FOUND")
+        self.calls[f"values.{operation}"] += 1
+        if operation == "get":
+            return self._get(spreadsheet, range_name, params)
+        spreadsheet.version += 1
+        input_option: str = params.get("valueInputOption", ["RAW"])[0]
+        if operation == "update":
+            return self._put(spreadsheet, range_name, body, input_option)
+        if operation == "append":
+            return self._append(spreadsheet, range_name, body, input_option)
+        sheet, grid = self._range(spreadsheet, range_name)
+        first_col: int = grid.get("startColumnIndex", 0)
+        for row in sheet.rows[grid.get("startRowIndex", 0) : grid.get("endRowIndex")]:
+            end_col: int = min(grid.get("endColumnIndex", len(row)), len(row))
+            row[first_col:end_col] = [""] * max(end_col - first_col, 0)
+        return {"spreadsheetId": spreadsheet.id, "clearedRange": range_name}
+
+    def _drive(
+        self,
+        method: str,
+        file_id: str | None,
+        resource: str | None,
+        permission_id: str | None,
+        params: dict[str, list[str]],
+        body: Any,
+    ) -> Any:
+        if file_id is None and method == "POST":
+            self.calls["drive.create"] += 1
+            spreadsheet = self.create_spreadsheet(title=body.get("name", "Untitled"))
+            return {"id": spreadsheet.id, "name": spreadsheet.title}
+        if file_id is None:
+            raise _ReplyError(404, "Unknown Drive endpoint", "NOT_FOUND")
+        spreadsheet = self._spreadsheet(file_id)
+        if resource is None and method == "GET":
+            self.calls["drive.get"] += 1
+            return {
+                "id": spreadsheet.id,
+                "name": spreadsheet.title,
+                "version": str(spreadsheet.version),
+                "createdTime": "2024-01-01T00:00:00.000Z",
+                "modifiedTime": "2024-01-01T00:00:00.000Z",
+            }
+        if resource == "export":
+            self.calls["drive.export"] += 1
+            return self._csv(spreadsheet.sheets[0])
+        if resource == "permissions":
+            self.calls["drive.permissions"] += 1
+            return self._permissions(method, spreadsheet, permission_id, body)
+        raise _ReplyError(404, "Unknown Drive endpoint", "NOT_FOUND")
+
+    def _permissions(
+        self,
+        method: str,
+        spreadsheet: MemorySpreadsheet,
+        permission_id: str | None,
+        body: Any,
+    ) -> Any:
+        if permission_id is None and method == "GET":
+            return {"permissions": spreadsheet.permissions}
+        if permission_id is None and method == "POST":
+            permission: dict[str, Any] = {"id": str(next(self._ids)), **body}
+            spreadsheet.permissions.append(permission)
+            return permission
+        for permission in spreadsheet.permissions:
+            if permission["id"] == permission_id:
+                permission.update(body)
+                return permission
+        raise _ReplyError(404, f"Permission not found: {permission_id}", "NOT_FOUND")
+
+    def _spreadsheet(self, spreadsheet_id: str) -> MemorySpreadsheet:
+        spreadsheet = self.spreadsheets.get(spreadsheet_id)
+        if spreadsheet is None and self.auto_create:
+            memory_logger.info("Creating in-memory spreadsheet %s", spreadsheet_id)
+            spreadsheet = self.create_spreadsheet(spreadsheet_id, worksheet="Sheepy")
+        if spreadsheet is None:
+            raise _ReplyError(
+                404, f"Requested entity was not found: {spreadsheet_id}", "NOT_FOUND"
+            )
+        return spreadsheet
+
+    @staticmethod
+    def _metadata(spreadsheet: MemorySpreadsheet) -> dict[str, Any]:
+        return {
+            "spreadsheetId": spreadsheet.id,
+            "properties": {"title": spreadsheet.title, "locale": "en_US"},
+            "sheets": [
+                (
+                    {
+                        "properties": sheet.properties,
+                        "bandedRanges": sheet.banded_ranges,
+                    }
+                    if sheet.banded_ranges
+                    else {"properties": sheet.properties}
+                )
+                for sheet in spreadsheet.sheets
+            ],
+        }
+
+    def _add_sheet(
+        self, spreadsheet: MemorySpreadsheet, properties: dict[str, Any]
+    ) -> dict[str, Any]:
+        grid: dict[str, Any] = properties.get("gridProperties", {})
+        sheet_properties: dict[str, Any] = {
+            "sheetId": properties.get(
+                "sheetId", next(self._ids) if spreadsheet.sheets else 0
+            ),
+            "title": properties.get("title", f"Sheet{len(spreadsheet.sheets) + 1}"),
+            "index": properties.get("index", len(spreadsheet.sheets)),
+            "sheetType": "GRID",
+            "gridProperties": {
+                "rowCount": grid.get("rowCount", DEFAULT_ROWS),
+                "columnCount": grid.get("columnCount", DEFAULT_COLS),
+            },
+        }
+        spreadsheet.sheets.insert(
+            sheet_properties["index"], MemorySheet(sheet_properties)
+        )
+        for index, sheet in enumerate(spreadsheet.sheets):
+            sheet.properties["index"] = index
+        return sheet_properties
+
+    @staticmethod
+    def _sheet_by_id(spreadsheet: MemorySpreadsheet, gid: Any) -> MemorySheet:
+        sheet_id: int = int(gid[0] if isinstance(gid, list) else gid or 0)
+        for sheet in spreadsheet.sheets:
+            if sheet.properties["sheetId"] == sheet_id:
+                return sheet
+        if gid is None:
+            return spreadsheet.sheets[0]
+        raise _ReplyError(400, f"No grid with id: {sheet_id}", "INVALID_ARGUMENT")
+
+    @staticmethod
+    def _range(
+        spreadsheet: MemorySpreadsheet, range_name: str
+    ) -> tuple[MemorySheet, dict[str, int]]:
+        title, _, cells = range_name.rpartition("!")
+        if not title:
+            # a range without "!" may name a whole worksheet
+            title, cells = (
+                (cells, "")
+                if any(s.properties["title"] == cells for s in spreadsheet.sheets)
+                else (spreadsheet.sheets[0].properties["title"], cells)
+            )
+        if title.startswith("'") and title.endswith("'"):
+            title = title[1:-1].replace("''", "'")
+        for sheet in spreadsheet.sheets:
+            if sheet.properties["title"] == title:
+                return sheet, a1_range_to_grid_range(cells) if cells else {}
+        raise _ReplyError(
+            400, f"Unable to parse range: {range_name}", "INVALID_ARGUMENT"
+        )
+
+    def _get(
+        self,
+        spreadsheet: MemorySpreadsheet,
+        range_name: str,
+        params: dict[str, list[str]],
+    ) -> dict[str, Any]:
+        sheet, grid = self._range(spreadsheet, range_name)
+        first_col: int = grid.get("startColumnIndex", 0)
+        end_col: int | None = grid.get("endColumnIndex")
+        first_row: int = grid.get("startRowIndex", 0)
+        render_option: str = params.get("valueRenderOption", ["FORMATTED_VALUE"])[0]
+        rows: list[list[Any]] = [
+            _trim(
+                [
+                    _render(value, sheet.number_formats.get((i, j)), render_option)
+                    for j, value in enumerate(row[first_col:end_col], start=first_col)
+                ]
+            )
+            for i, row in enumerate(
+                sheet.rows[first_row : grid.get("endRowIndex")], start=first_row
+            )
+        ]
+        while rows and not rows[-1]:
+            rows.pop()
+        dimension: str = params.get("majorDimension", ["ROWS"])[0]
+        if dimension == "COLUMNS":
+            width: int = max((len(row) for row in rows), default=0)
+            rows = [
+                _trim([row[i] if i < len(row) else "" for row in rows])
+                for i in range(width)
+            ]
+        response: dict[str, Any] = {"range": range_name, "majorDimension": dimension}
+        if rows:
+            response["values"] = rows
+        return response
+
+    def _put(
+        self,
+        spreadsheet: MemorySpreadsheet,
+        range_name: str,
+        body: Any,
+        input_option: str,
+    ) -> dict[str, Any]:
+        sheet, grid = self._range(spreadsheet, range_name)
+        values: list[list[Any]] = body.get("values", [])
+        if body.get("majorDimension") == "COLUMNS":
+            values = [list(row) for row in itertools.zip_longest(*values, fillvalue="")]
+        self._write(
+            sheet,
+            grid.get("startRowIndex", 0),
+            grid.get("startColumnIndex", 0),
+            *_parse_values(values, input_option),
+        )
+        return {
+            "spreadsheetId": spreadsheet.id,
+            "updatedRange": range_name,
+            "updatedRows": len(values),
+        }
+
+    def _append(
+        self,
+        spreadsheet: MemorySpreadsheet,
+        range_name: str,
+        body: Any,
+        input_option: str,
+    ) -> dict[str, Any]:
+        sheet, grid = self._range(spreadsheet, range_name)
+        first_col: int = grid.get("startColumnIndex", 0)
+        end_col: int | None = grid.get("endColumnIndex")
+        # values are written after the last row with data in the range
+        first_row: int = len(sheet.rows)
+        while first_row > 0 and not _trim(sheet.rows[first_row - 1][first_col:end_col]):
+            first_row -= 1
+        values: list[list[Any]] = body.get("values", [])
+        self._write(sheet, first_row, first_col, *_parse_values(values, input_option))
+        width: int = max((len(row) for row in values), default=1)
+        updated_range: str = (
+            f"'{sheet.properties['title']}'!"
+            f"{gspread.utils.rowcol_to_a1(first_row + 1, first_col + 1)}:"
+            f"{gspread.utils.rowcol_to_a1(first_row + len(values), first_col + width)}"
+        )
+        return {
+            "spreadsheetId": spreadsheet.id,
+            "tableRange": range_name,
+            "updates": {"updatedRange": updated_range, "updatedRows": len(values)},
+        }
+
+    def _update(
+        self, spreadsheet: MemorySpreadsheet, request: dict[str, Any]
+    ) -> dict[str, Any]:
+        kind, payload = next(iter(request.items()))
+        self.updates[kind] += 1
+        if kind == "addSheet":
+            return {
+                "addSheet": {
+                    "properties": self._add_sheet(spreadsheet, payload["properties"])
+                }
+            }
+        if kind == "updateCells":
+            sheet, row, col = self._grid_start(spreadsheet, payload)
+            fields: str = payload.get("fields", "")
+            if fields == "*" or "userEnteredValue" in fields:
+                cells: list[list[dict[str, Any]]] = [
+                    r.get("values", []) for r in payload.get("rows", [])
+                ]
+                formats: list[list[str | None]] | None = None
+                if fields == "*" or "userEnteredFormat" in fields:
+                    # formats left out by the request are cleared
+                    formats = [
+                        [
+                            c.get("userEnteredFormat", {})
+                            .get("numberFormat", {})
+                            .get("type", "")
+                            for c in r
+                        ]
+                        for r in cells
+                    ]
+                values: list[list[Any]] = [
+                    [_from_extended(c.get("userEnteredValue")) for c in r]
+                    for r in cells
+                ]
+                self._write(sheet, row, col, values, formats)
+            return {}
+        if kind == "appendDimension" and payload.get("dimension") == "ROWS":
+            sheet = self._sheet_by_id(spreadsheet, payload["sheetId"])
+            sheet.properties["gridProperties"]["rowCount"] += payload["length"]
+            return {}
+        if kind in ("addBanding", "deleteBanding"):
+            return self._banding(spreadsheet, kind, payload)
+        if kind == "updateSheetProperties":
+            sheet = self._sheet_by_id(spreadsheet, payload["properties"]["sheetId"])
+            _merge(sheet.properties, payload["properties"])
+            return {}
+        # formatting, validation and dimension sizes only change how values look
+        sheet = self._sheet_by_id(spreadsheet, _sheet_id(payload))
+        sheet.formats.append(request)
+        return {}
+
+    def _banding(
+        self, spreadsheet: MemorySpreadsheet, kind: str, payload: dict[str, Any]
+    ) -> dict[str, Any]:
+        if kind == "addBanding":
+            banded_range: dict[str, Any] = {
+                "bandedRangeId": next(self._ids),
+                **payload["bandedRange"],
+            }
+            grid: dict[str, Any] = banded_range["range"]
+            sheet = self._sheet_by_id(spreadsheet, grid.get("sheetId", 0))
+            if any(_overlaps(grid, b["range"]) for b in sheet.banded_ranges):
+                raise _ReplyError(
+                    400,
+                    "You cannot add alternating colors to a range"
+                    " that already has alternating colors.",
+                    "INVALID_ARGUMENT",
+                )
+            sheet.banded_ranges.append(banded_range)
+            return {"addBanding": {"bandedRange": banded_range}}
+        for sheet in spreadsheet.sheets:
+            for banded_range in sheet.banded_ranges:
+                if banded_range["bandedRangeId"] == payload["bandedRangeId"]:
+                    sheet.banded_ranges.remove(banded_range)
+                    return {}
+        raise _ReplyError(
+            400, f"No banded range with id {payload['bandedRangeId']}", "NOT_FOUND"
+        )
+
+    def _grid_start(
+        self, spreadsheet: MemorySpreadsheet, payload: dict[str, Any]
+    ) -> tuple[MemorySheet, int, int]:
+        if "start" in payload:
+            start: dict[str, Any] = payload["start"]
+            sheet = self._sheet_by_id(spreadsheet, start.get("sheetId", 0))
+            return sheet, start.get("rowIndex", 0), start.get("columnIndex", 0)
+        grid: dict[str, Any] = payload["range"]
+        sheet = self._sheet_by_id(spreadsheet, grid.get("sheetId", 0))
+        return sheet, grid.get("startRowIndex", 0), grid.get("startColumnIndex", 0)
+
+    @staticmethod
+    def _write(
+        sheet: MemorySheet,
+        first_row: int,
+        first_col: int,
+        values: list[list[Any]],
+        formats: list[list[str | None]] | None = None,
+    ) -> None:
+        # cells keep their number format if it is None, "" clears it
+        end_row: int = first_row + len(values)
+        if end_row > len(sheet.rows):
+            sheet.rows.extend([] for _ in range(end_row - len(sheet.rows)))
+        for row, row_values in zip(sheet.rows[first_row:end_row], values, strict=True):
+            end_col: int = first_col + len(row_values)
+            if end_col > len(row):
+                row.extend([""] * (end_col - len(row)))
+            row[first_col:end_col] = row_values
+        for i, row_formats in enumerate(formats or [], start=first_row):
+            for j, number_format in enumerate(row_formats, start=first_col):
+                if number_format:
+                    sheet.number_formats[(i, j)] = number_format
+                elif number_format is not None:
+                    sheet.number_formats.pop((i, j), None)
+        grid: dict[str, Any] = sheet.properties["gridProperties"]
+        grid["rowCount"] = max(grid["rowCount"], end_row)
+
+    @staticmethod
+    def _csv(sheet: MemorySheet) -> bytes:
+        out = io.StringIO()
+        csv.writer(out, lineterminator="\r\n").writerows(
+            [
+                _render(value, sheet.number_formats.get((i, j)), "FORMATTED_VALUE")
+                for j, value in enumerate(row)
+            ]
+            for i, row in enumerate(sheet.rows)
+        )
+        return out.getvalue().encode()
+
+    @staticmethod
+    def _response(
+        request: requests.PreparedRequest, status: int, content: Any
+    ) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.request = request
+        response.url = str(request.url)
+        response.encoding = "utf-8"
+        if isinstance(content, bytes):
+            response.headers["Content-Type"] = "text/csv"
+        else:
+            response.headers["Content-Type"] = "application/json; charset=UTF-8"
+            content = json.dumps(content).encode()
+        response.headers["Content-Length"] = str(len(content))
+        # read like a socket, so streamed responses work as well
+        response.raw = io.BytesIO(content)
+        return response
+
+
+def _trim(row: list[Any]) -> list[Any]:
+    # the Sheets API leaves out trailing empty cells
+    end: int = len(row)
+    while end > 0 and row[end - 1] in ("", None):
+        end -= 1
+    return row[:end]
+
+
+def _flatten(requests: list[Any]) -> list[dict[str, Any]]:
+    # SpreadsheetBatchUpdater sends a list of requests per call
+    flat: list[dict[str, Any]] = []
+    for request in requests:
+        flat += _flatten(request) if isinstance(request, list) else [request]
+    return flat
+
+
+def _number(number: float) -> int | float:
+    return int(number) if number.is_integer() else number
+
+
+def _from_extended(value: dict[str, Any] | None) -> Any:
+    if not value:
+        return ""
+    if "boolValue" in value:
+        return value["boolValue"]
+    if "numberValue" in value:
+        return _number(float(value["numberValue"]))
+    return value.get("formulaValue", value.get("stringValue", ""))
+
+
+def _parse_value(value: Any) -> tuple[Any, str | None]:
+    # parses input like Sheets parses values written with USER_ENTERED
+    if not isinstance(value, str) or value.startswith("="):
+        return value, None
+    if value.upper() in ("TRUE", "FALSE"):
+        return value.upper() == "TRUE", None
+    percent: bool = value.endswith("%")
+    try:
+        number: float = float(value[:-1] if percent else value)
+    except ValueError:
+        return value, None
+    if not math.isfinite(number):
+        return value, None
+    if percent:
+        return _number(number / 100), "PERCENT"
+    return _number(number), None
+
+
+def _parse_values(
+    values: list[list[Any]], input_option: str
+) -> tuple[list[list[Any]], list[list[str | None]] | None]:
+    # RAW values are stored as they are sent
+    if input_option != "USER_ENTERED":
+        return values, None
+    parsed: list[list[tuple[Any, str | None]]] = [
+        [_parse_value(value) for value in row] for row in values
+    ]
+    return (
+        [[value for value, _ in row] for row in parsed],
+        [[number_format for _, number_format in row] for row in parsed],
+    )
+
+
+def _render(value: Any, number_format: str | None, render_option: str) -> Any:
+    # formulas are not evaluated, their formatted value is empty
+    if render_option == "FORMULA":
+        return value
+    if isinstance(value, str):
+        return "" if value.startswith("=") else value
+    if render_option == "UNFORMATTED_VALUE":
+        return value
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if number_format == "PERCENT":
+        return f"{_number(round(value * 100, 10))}%"
+    return str(value)
+
+
+def _overlaps(first: dict[str, Any], second: dict[str, Any]) -> bool:
+    # missing indexes of a GridRange are unbounded
+    for dimension in ("Row", "Column"):
+        if first.get(f"start{dimension}Index", 0) >= second.get(
+            f"end{dimension}Index", float("inf")
+        ) or second.get(f"start{dimension}Index", 0) >= first.get(
+            f"end{dimension}Index", float("inf")
+        ):
+            return False
+    return True
+
+
+def _sheet_id(payload: Any) -> int:
+    # finds sheetId anywhere in a request, e.g. in range or properties
+    if isinstance(payload, dict):
+        if "sheetId" in payload:
+            return payload["sheetId"]
+        for value in payload.values():
+            if (sheet_id := _sheet_id(value)) is not None:
+                return sheet_id
+    if isinstance(payload, list):
+        for value in payload:
+            if (sheet_id := _sheet_id(value)) is not None:
+                return sheet_id
+    return None  # type: ignore
+
+
+def _merge(target: dict[str, Any], source: dict[str, Any]) -> None:
+    for key, value in source.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = value
+
+
+def memory_client(backend: InMemorySheets | None = None) -> gspread.Client:
+    """Creates gspread client that sends all requests to an in-memory backend
+
+    Args:
+        backend (InMemorySheets | None, optional): Backend holding spreadsheets.
+         Defaults to None, which creates an empty backend.
+
+    Returns:
+        gspread.Client: client without Google credentials
+    """
+    session = requests.Session()
+    session.mount("https://", backend or InMemorySheets())
+    return gspread.Client(None, session=session)  # type: ignore
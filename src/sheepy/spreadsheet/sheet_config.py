@@ -16,15 +16,26 @@ COLUMNS = [
     "Movie Poster",
 ]
 
+SPREADSHEET_TITLE = "Sheepy_Spreadsheet"
+# worksheet added to new spreadsheets, next to the default worksheet (sheetId 0)
+NEW_WORKSHEET_PROPERTIES = {
+    "sheetId": 1,
+    "title": "Sheepy",
+    "gridProperties": {"rowCount": 1000, "columnCount": 20},
+}
+
 SHEET_COLUMNS_RANGE = "A:K"
 SHEET_HEADER_RANGE = "A1:K1"
 
-SHEET_NTH_ROW = 2
+# rows of these columns are colored alternately, header row included
+SHEET_BANDED_RANGE = "A:L"
 SHEET_BACKGROUND_COLOR_EVEN = Color.fromHex("#000000")
 SHEET_BACKGROUND_COLOR_ODD = Color.fromHex("#2d2d2d")
 SHEET_TEXT_COLOR = Color.fromHex("#FFFFFF")
 
 SHEET_ROW_HEIGHT = 150
+# checkboxes and row height are set up for this many rows ahead of the data
+SHEET_FORMAT_CHUNK_ROWS = 1000
 COLUMN_WIDTHS = [
     ("A", 70),
     ("B", 300),
@@ -39,3 +50,5 @@ COLUMN_WIDTHS = [
     ("K", 150),
 ]
 SHEET_PLOT_COL = "J"
+# the poster is an IMAGE formula, the other columns are read as displayed
+SHEET_POSTER_COL = "K"
@@ -0,0 +1,132 @@
+"""Local state of opened spreadsheets, used to skip metadata and header requests.
+Updates of the state file are locked, so concurrent processes keep each other's entries.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any
+
+from sheepy.spreadsheet.sheet_config import COLUMNS
+from sheepy.util.file import atomic_write, file_lock, get_cache_dir
+
+STATE_FILE = "sheet_state.json"
+EXPORT_STATE_SUFFIX = ".sheepy.json"
+
+
+def _state_path() -> str:
+    return os.path.join(get_cache_dir(), STATE_FILE)
+
+
+def _read_states() -> dict[str, Any]:
+    try:
+        with open(_state_path(), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_states(states: dict[str, Any]) -> None:
+    with atomic_write(_state_path()) as f:
+        f.write(json.dumps(states).encode())
+
+
+def state_key(spreadsheet_id: str, worksheet_index: str) -> str:
+    """Builds key of stored state for a worksheet
+
+    Args:
+        spreadsheet_id (str): ID of Spreadsheet
+        worksheet_index (str): Worksheet Index
+
+    Returns:
+        str: key of stored state
+    """
+    return f"{spreadsheet_id}:{worksheet_index}"
+
+
+def columns_hash() -> str:
+    """Hashes column definition so that stored header checks
+     are invalidated when COLUMNS changes
+
+    Returns:
+        str: hash of COLUMNS
+    """
+    return hashlib.sha256(json.dumps(COLUMNS).encode()).hexdigest()
+
+
+def load_sheet_state(key: str) -> dict[str, Any] | None:
+    """Loads stored state of a worksheet
+
+    Args:
+        key (str): key of stored state
+
+    Returns:
+        dict[str, Any] | None: stored state or None if there is none
+    """
+    return _read_states().get(key)
+
+
+def save_sheet_state(key: str, state: dict[str, Any]) -> None:
+    """Stores state of a worksheet
+
+    Args:
+        key (str): key of stored state
+        state (dict[str, Any]): state to store
+    """
+    with file_lock(_state_path()):
+        states: dict[str, Any] = _read_states()
+        states[key] = state
+        _write_states(states)
+
+
+def update_sheet_state(key: str, **fields: Any) -> None:
+    """Updates fields of the stored state of a worksheet, if there is one
+
+    Args:
+        key (str): key of stored state
+        **fields (Any): fields to update
+    """
+    with file_lock(_state_path()):
+        states: dict[str, Any] = _read_states()
+        if key in states:
+            states[key].update(fields)
+            _write_states(states)
+
+
+def delete_sheet_state(key: str) -> None:
+    """Deletes stored state of a worksheet
+
+    Args:
+        key (str): key of stored state
+    """
+    with file_lock(_state_path()):
+        states: dict[str, Any] = _read_states()
+        if states.pop(key, None) is not None:
+            _write_states(states)
+
+
+def load_export_state(filename: str) -> dict[str, Any] | None:
+    """Loads state stored next to an exported file
+
+    Args:
+        filename (str): path of exported file
+
+    Returns:
+        dict[str, Any] | None: stored state or None if there is none
+    """
+    try:
+        with open(f"{filename}{EXPORT_STATE_SUFFIX}", "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_export_state(filename: str, state: dict[str, Any]) -> None:
+    """Stores state next to an exported file
+
+    Args:
+        filename (str): path of exported file
+        state (dict[str, Any]): state to store
+    """
+    with atomic_write(f"{filename}{EXPORT_STATE_SUFFIX}") as f:
+        f.write(json.dumps(state).encode())
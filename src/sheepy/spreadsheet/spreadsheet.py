@@ -1,36 +1,72 @@
 """Spreadsheet Module"""
 
+import itertools
 import os
+import sys
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Self
 
 import gspread
-from gspread.utils import ExportFormat, ValueInputOption, rowcol_to_a1
+from gspread.urls import DRIVE_FILES_API_V3_URL, SPREADSHEET_DRIVE_URL
+from gspread.utils import (
+    ExportFormat,
+    InsertDataOption,
+    MimeType,
+    ValueInputOption,
+    ValueRenderOption,
+    a1_range_to_grid_range,
+)
 from requests import Response
 
 from sheepy.omdb.api import show_info
-from sheepy.spreadsheet.sheet_config import SHEET_NTH_ROW
+from sheepy.spreadsheet.backend import open_client
+from sheepy.spreadsheet.sheet_config import (
+    NEW_WORKSHEET_PROPERTIES,
+    SHEET_COLUMNS_RANGE,
+    SHEET_POSTER_COL,
+    SPREADSHEET_TITLE,
+)
+from sheepy.spreadsheet.sheet_state import (
+    columns_hash,
+    delete_sheet_state,
+    load_export_state,
+    load_sheet_state,
+    save_export_state,
+    save_sheet_state,
+    state_key,
+    update_sheet_state,
+)
+from sheepy.util.config import MAX_WORKERS, get_env
+from sheepy.util.file import atomic_write
 from sheepy.util.logger import get_logger
 
 from .formatting import (
     check_headers,
-    color_odd_rows,
-    set_insert_row_height,
-    setup_checkboxes,
-    setup_sheet_formatting,
+    extend_data_rows_requests,
+    insert_rows_requests,
+    setup_requests,
 )
 
+CSV_CHUNK_SIZE = 64 * 1024
+
 
 class SheepySpreadsheet:
     """Sheepy Spreadsheet offers functionality to insert data into Google Spreadsheet"""
 
     def __init__(
-        self, spreadsheet_id: str | None = None, worksheet_index: str | None = None
+        self,
+        spreadsheet_id: str | None = None,
+        worksheet_index: str | None = None,
+        client: gspread.Client | None = None,
     ) -> None:
         """Constructor of Spreadsheet
 
         Args:
             spreadsheet_id (str | None, optional): ID of Spreadsheet. Defaults to None.
             worksheet_index (str | None, optional): Worksheet Index. Defaults to None.
+            client (gspread.Client | None, optional): gspread client.
+             Defaults to None, which opens a client of the configured backend.
 
         Raises:
             AttributeError: if neither spreadsheet_id or worksheet_index was provided
@@ -39,7 +75,7 @@ class SheepySpreadsheet:
             SystemExit: if worksheet was not found
         """
         try:
-            self.client = gspread.service_account()  # type: ignore
+            self.client = client or open_client()
         except FileNotFoundError as fnfe:
             raise SystemExit(
                 f"Unable to create service account. Check credentials file. {str(fnfe)}"
@@ -49,6 +85,9 @@ class SheepySpreadsheet:
         self.worksheet: gspread.worksheet.Worksheet | None = None
         self.spreadsheet_id: str | None = None
         self.worksheet_index: str | None = None
+        self.revision: str | None = None
+        # last row with checkboxes and row height, None if unknown
+        self.formatted_rows: int | None = None
 
         self.logger = get_logger(__name__)
 
@@ -58,9 +97,7 @@ class SheepySpreadsheet:
             try:
                 self.spreadsheet_id = spreadsheet_id
                 self.worksheet_index = worksheet_index
-                self.spreadsheet = self.client.open_by_key(spreadsheet_id)
-                self.worksheet = self.select_worksheet(int(worksheet_index))
-                check_headers(self)
+                self.open_worksheet(spreadsheet_id, worksheet_index)
             except gspread.exceptions.SpreadsheetNotFound as snf:
                 raise SystemExit(f"Could not find spreadsheet. {str(snf)}") from snf
             except gspread.exceptions.WorksheetNotFound as wnf:
@@ -76,9 +113,13 @@ class SheepySpreadsheet:
         return f"ID: {self.spreadsheet_id}, Index: {self.worksheet_index}"
 
     @classmethod
-    def from_env_file(cls) -> Self:
+    def from_env_file(cls, client: gspread.Client | None = None) -> Self:
         """Instantiate SheepySpreadsheet from environment variable config
 
+        Args:
+            client (gspread.Client | None, optional): gspread client.
+             Defaults to None, which opens a client of the configured backend.
+
         Raises:
             AttributeError: Raises Exception if environment variables are not set
             SystemExit: Raises Exception if spreadsheet could not be found
@@ -87,10 +128,10 @@ class SheepySpreadsheet:
         Returns:
             Self: Returns new spreadsheet instance
         """
-        sh = cls()
+        sh = cls(client=client)
         try:
-            sh.spreadsheet_id = os.environ.get("SPREADSHEET_ID")
-            sh.worksheet_index = os.environ.get("WORKSHEET_INDEX")
+            sh.spreadsheet_id = get_env("SPREADSHEET_ID")
+            sh.worksheet_index = get_env("WORKSHEET_INDEX")
             if sh.worksheet_index is None or sh.spreadsheet_id is None:
                 sh.logger.debug(sh.spreadsheet_id)
                 sh.logger.debug(sh.worksheet_index)
@@ -98,31 +139,159 @@ class SheepySpreadsheet:
                     f"One or more necessary values are None:"
                     f" {sh.spreadsheet_id=} | {sh.worksheet_index=}"
                 )
-            sh.spreadsheet = sh.client.open_by_key(sh.spreadsheet_id)
-            sh.worksheet = sh.select_worksheet(int(sh.worksheet_index))
+            sh.open_worksheet(sh.spreadsheet_id, sh.worksheet_index)
         except gspread.exceptions.SpreadsheetNotFound as snf:
             raise SystemExit(f"Could not find spreadsheet. {str(snf)}") from snf
         except gspread.exceptions.WorksheetNotFound as wnf:
             raise SystemExit("Can not select worksheet.") from wnf
         sh.set_instance_variables()
-        check_headers(sh)
         return sh
 
     @classmethod
-    def from_new(cls) -> Self:
-        """Creates a new Spreadsheet from scratch
+    def from_new(
+        cls, client: gspread.Client | None = None, share_with: str | None = None
+    ) -> Self:
+        """Creates a new Spreadsheet from scratch.
+        The worksheet is added with headers and formatting in a single batch
+         update request, sharing runs concurrently with it
+
+        Args:
+            client (gspread.Client | None, optional): gspread client.
+             Defaults to None, which opens a client of the configured backend.
+            share_with (str | None, optional): E-Mail of account to share
+             spreadsheet with as writer. Defaults to None.
 
         Returns:
             Self: Returns new spreadsheet instance
         """
-        sh = cls()
-        sh.spreadsheet = sh.client.create("Sheepy_Spreadsheet")
-        sh.worksheet = sh.spreadsheet.add_worksheet("Sheepy", rows=1000, cols=20)
+        sh = cls(client=client)
+        response: Response = sh.client.http_client.request(
+            "post",
+            DRIVE_FILES_API_V3_URL,
+            json={"name": SPREADSHEET_TITLE, "mimeType": MimeType.google_sheets},
+            params={"supportsAllDrives": True},
+        )
+        spreadsheet_id: str = response.json()["id"]
+        # requests refer to the worksheet by the sheetId it is added with
+        sh._restore_metadata(
+            {
+                "spreadsheet": {"id": spreadsheet_id, "title": SPREADSHEET_TITLE},
+                "worksheet": NEW_WORKSHEET_PROPERTIES,
+            }
+        )
+        body: dict[str, Any] = {
+            "requests": [{"addSheet": {"properties": NEW_WORKSHEET_PROPERTIES}}]
+            + setup_requests(sh),
+            "includeSpreadsheetInResponse": True,
+        }
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            shared = (
+                executor.submit(sh.share_spreadsheet, share_with, "user", "writer")
+                if share_with is not None
+                else None
+            )
+            updated: dict[str, Any] = sh.spreadsheet.batch_update(body)[  # type: ignore
+                "updatedSpreadsheet"
+            ]
+            if shared is not None:
+                shared.result()
+        sh._restore_metadata(
+            {
+                "spreadsheet": {"id": spreadsheet_id, **updated["properties"]},
+                "worksheet": next(
+                    sheet["properties"]
+                    for sheet in updated["sheets"]
+                    if sheet["properties"]["sheetId"]
+                    == NEW_WORKSHEET_PROPERTIES["sheetId"]
+                ),
+            }
+        )
         sh.set_instance_variables()
-        setup_sheet_formatting(sh)
-        check_headers(sh)
+        sh.formatted_rows = sh.worksheet.row_count  # type: ignore
         return sh
 
+    def open_worksheet(self, spreadsheet_id: str, worksheet_index: str) -> None:
+        """Opens spreadsheet and worksheet and makes sure headers are set up.
+        Metadata stored by a previous run is reused instead of being requested,
+         headers are only checked if the spreadsheet revision or the column
+          definition changed since they were last verified.
+
+        Args:
+            spreadsheet_id (str): ID of Spreadsheet
+            worksheet_index (str): Worksheet Index
+        """
+        key: str = state_key(spreadsheet_id, worksheet_index)
+        state: dict[str, Any] | None = load_sheet_state(key)
+        revision: str | None = None
+        if state is not None:
+            self._restore_metadata(state)
+            try:
+                revision = self.get_revision()
+            except gspread.exceptions.APIError as ae:
+                self.logger.debug("Stored sheet metadata is invalid. %s", ae)
+                delete_sheet_state(key)
+                state = None
+        if state is None:
+            self.spreadsheet = self.client.open_by_key(spreadsheet_id)
+            self.worksheet = self.select_worksheet(int(worksheet_index))
+            revision = self.get_revision()
+        self.revision = revision
+        self.formatted_rows = None if state is None else state.get("formatted_rows")
+        headers_verified: dict[str, str | None] = {
+            "columns": columns_hash(),
+            "revision": revision,
+        }
+        # Writes of sheepy change the revision too. Sheets responses do not report
+        # the new revision and requesting it after every write costs as much as
+        # checking the headers again on the next open, so that is intended.
+        if state is not None and state.get("headers_verified") == headers_verified:
+            self.logger.debug("Headers verified at revision %s", revision)
+            return
+        check_headers(self)
+        # gspread offers no public accessor for all properties of an object
+        save_sheet_state(
+            key,
+            {
+                "spreadsheet": self.spreadsheet._properties,  # type: ignore
+                "worksheet": self.worksheet._properties,  # type: ignore
+                "headers_verified": headers_verified,
+                "formatted_rows": self.formatted_rows,
+            },
+        )
+
+    def _restore_metadata(self, state: dict[str, Any]) -> None:
+        # Spreadsheet.__init__ always requests metadata, so restore the stored
+        # properties on an instance created without calling it
+        spreadsheet = gspread.Spreadsheet.__new__(gspread.Spreadsheet)
+        spreadsheet.client = self.client.http_client
+        spreadsheet._properties = dict(state["spreadsheet"])
+        self.spreadsheet = spreadsheet
+        self.worksheet = gspread.Worksheet(
+            spreadsheet,
+            dict(state["worksheet"]),
+            spreadsheet.id,
+            self.client.http_client,
+        )
+
+    def get_revision(self) -> str:
+        """Gets current revision of spreadsheet from Drive metadata.
+        The revision changes with every edit of the spreadsheet
+
+        Raises:
+            AttributeError: raises error if spreadsheet is not set
+
+        Returns:
+            str: Returns revision of spreadsheet
+        """
+        if self.spreadsheet is None:
+            raise AttributeError("speadsheet value is empty")
+        response: Response = self.client.http_client.request(
+            "get",
+            f"{DRIVE_FILES_API_V3_URL}/{self.spreadsheet.id}",
+            params={"supportsAllDrives": True, "fields": "version"},
+        )
+        return response.json()["version"]
+
     def set_instance_variables(self) -> None:
         """Sets variables that can not be set when instantiating
 
@@ -168,17 +337,138 @@ class SheepySpreadsheet:
                 + "Accept in Google Spreadsheet Web Interface"
             )
 
-    def download_csv(self) -> None:
-        """Downloads spreadsheet as CSV
+    def export_csv(self) -> bytes:
+        """Exports spreadsheet as CSV
 
         Raises:
             AttributeError: raises error if spreadsheet is not set
+
+        Returns:
+            bytes: Returns spreadsheet in csv format
         """
         if self.spreadsheet is None:
             raise AttributeError("speadsheet value is empty")
-        export_file = self.spreadsheet.export(format=ExportFormat.CSV)
-        with open("sheepy.csv", "wb") as f:
-            f.write(export_file)
+        return self.spreadsheet.export(format=ExportFormat.CSV)
+
+    def iter_csv(self) -> Iterator[bytes]:
+        """Streams worksheet as CSV, the export is requested on first iteration
+
+        Raises:
+            AttributeError: raises error if worksheet is not set
+
+        Yields:
+            bytes: Chunks of the worksheet in csv format
+        """
+        if self.worksheet is None:
+            raise AttributeError("worksheet value is empty")
+        yield from self._iter_worksheet_csv(self.worksheet)
+
+    def download_csv(
+        self,
+        filename: str = "sheepy.csv",
+        all_worksheets: bool = False,
+        force: bool = False,
+    ) -> list[str]:
+        """Downloads worksheet as CSV.
+        The export is streamed to disk in chunks and written atomically.
+         The spreadsheet revision is stored next to each file, exports are
+          skipped if the file is still at the current revision.
+
+        Args:
+            filename (str, optional): path of csv file or "-" for stdout.
+             Defaults to "sheepy.csv".
+            all_worksheets (bool, optional): Whether to export every worksheet in
+             parallel to one file each, named after the worksheet.
+             Defaults to False.
+            force (bool, optional): Whether to export even if the file is
+             up to date. Defaults to False.
+
+        Raises:
+            AttributeError: raises error if spreadsheet is not set
+            ValueError: raises error if all worksheets should be written to stdout
+
+        Returns:
+            list[str]: Returns paths of written files
+        """
+        if self.spreadsheet is None or self.worksheet is None:
+            raise AttributeError("speadsheet value is empty")
+        if filename == "-":
+            if all_worksheets:
+                raise ValueError("Can not write all worksheets to stdout")
+            self._download_worksheet_csv(self.worksheet, filename)
+            return [filename]
+        # revision requested when opening is current for a freshly opened sheet
+        revision: str = self.revision or self.get_revision()
+        if not all_worksheets:
+            worksheets = [self.worksheet]
+            filenames: list[str] = [filename]
+        else:
+            stem, ext = os.path.splitext(filename)
+            worksheets = self.spreadsheet.worksheets()
+            filenames = [f"{stem}_{ws.title}{ext or '.csv'}" for ws in worksheets]
+        outdated: list[tuple[gspread.worksheet.Worksheet, str]] = []
+        for ws, name in zip(worksheets, filenames, strict=True):
+            if force or not self._is_up_to_date(ws, name, revision):
+                outdated.append((ws, name))
+            else:
+                self.logger.info(f"{name} is up to date, skipping export")
+        if not outdated:
+            return []
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            list(
+                executor.map(
+                    lambda job: self._download_worksheet_csv(*job, revision), outdated
+                )
+            )
+        return [name for _, name in outdated]
+
+    @staticmethod
+    def _is_up_to_date(
+        worksheet: gspread.worksheet.Worksheet, filename: str, revision: str
+    ) -> bool:
+        return os.path.isfile(filename) and load_export_state(filename) == {
+            "spreadsheet_id": worksheet.spreadsheet_id,
+            "gid": worksheet.id,
+            "revision": revision,
+        }
+
+    def _download_worksheet_csv(
+        self,
+        worksheet: gspread.worksheet.Worksheet,
+        filename: str,
+        revision: str | None = None,
+    ) -> None:
+        chunks: Iterator[bytes] = self._iter_worksheet_csv(worksheet)
+        if filename == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+        with atomic_write(filename) as f:
+            for chunk in chunks:
+                f.write(chunk)
+        if revision is not None:
+            save_export_state(
+                filename,
+                {
+                    "spreadsheet_id": worksheet.spreadsheet_id,
+                    "gid": worksheet.id,
+                    "revision": revision,
+                },
+            )
+        self.logger.info(f"Downloaded worksheet {worksheet.title} to {filename}")
+
+    def _iter_worksheet_csv(
+        self, worksheet: gspread.worksheet.Worksheet
+    ) -> Iterator[bytes]:
+        response: Response = self.client.http_client.session.get(
+            f"{SPREADSHEET_DRIVE_URL % worksheet.spreadsheet_id}/export",
+            params={"format": "csv", "gid": worksheet.id},
+            stream=True,
+        )
+        with response:
+            response.raise_for_status()
+            yield from response.iter_content(chunk_size=CSV_CHUNK_SIZE)
 
     def share_spreadsheet(self, email: str, account_type: str, role: str) -> None:
         """Shares Spreadsheet with another account.
@@ -223,11 +513,8 @@ class SheepySpreadsheet:
             raise SystemExit(
                 f"Can not select worksheet with index {index}. {str(wnf)}"
             ) from wnf
-        finally:
-            if worksheet is None:
-                raise AttributeError(
-                    "Could not find any worksheets with given arguments"
-                )
+        if worksheet is None:
+            raise AttributeError("Could not find any worksheets with given arguments")
         return worksheet
 
     def read_row(self, row_number: int) -> list[Any]:
@@ -247,6 +534,41 @@ class SheepySpreadsheet:
             raise AttributeError("Worksheet of SheepySpreadsheet object is not set.")
         return self.worksheet.row_values(row_number)
 
+    def read_rows(self, first_row: int = 2) -> list[list[Any]]:
+        """Reads values of all rows starting at first_row.
+        Values are read as displayed in the sheet, e.g. "89%" instead of 0.89,
+         only poster images are read as formulas to keep their url.
+          Both are read with one request each
+
+        Args:
+            first_row (int, optional): Row Number of first row. Defaults to 2.
+
+        Raises:
+            AttributeError: Raises Error if worksheet is not set
+
+        Returns:
+            list[list[Any]]: Returns list of row values
+        """
+        if self.worksheet is None:
+            raise AttributeError("Worksheet of SheepySpreadsheet object is not set.")
+        first_col, _ = SHEET_COLUMNS_RANGE.split(":")
+        last_value_col: str = chr(ord(SHEET_POSTER_COL) - 1)
+        values: list[list[Any]] = self.worksheet.get(
+            f"{first_col}{first_row}:{last_value_col}",
+            value_render_option=ValueRenderOption.formatted,
+        )
+        posters: list[list[Any]] = self.worksheet.get(
+            f"{SHEET_POSTER_COL}{first_row}:{SHEET_POSTER_COL}",
+            value_render_option=ValueRenderOption.formula,
+        )
+        width: int = ord(SHEET_POSTER_COL) - ord(first_col)
+        rows: list[list[Any]] = []
+        for row, poster in itertools.zip_longest(values, posters, fillvalue=[]):
+            rows.append(
+                list(row) + [""] * (width - len(row)) + list(poster) if poster else row
+            )
+        return rows
+
     def find_free_row(self) -> int:
         """Finds first row not populated with data
 
@@ -271,20 +593,89 @@ class SheepySpreadsheet:
         Raises:
             AttributeError: if worksheet is not set
         """
-        if self.worksheet is None:
+        self.add_rows_to_sheet([movie_dict])
+        info = show_info(movie_dict)
+        self.logger.info(f"Added Movie Info: \n{info}")
+
+    def add_rows_to_sheet(self, movie_dicts: list[dict], append: bool = True) -> None:
+        """Adds multiple rows of values to worksheet.
+        Appending does not read the sheet and is safe with several writers,
+         otherwise values are written after the first free row
+          with a single batch update request.
+        Checkboxes and row height are set up in chunks ahead of the data,
+         so usually only values are written
+
+        Args:
+            movie_dicts (list[dict]): list of movie dictionaries with movie info
+            append (bool, optional): Whether to use the append API. Defaults to True
+
+        Raises:
+            AttributeError: if worksheet is not set
+        """
+        if self.worksheet is None or self.spreadsheet is None:
             raise AttributeError("Select a worksheet first")
-        insert_row: int = self.find_free_row()
-        a1_notation: str = rowcol_to_a1(insert_row, 1)
-        values: list[list[str]] = [list(movie_dict.values())]
-        self.logger.debug("A1-Notation %s", a1_notation)
+        if not movie_dicts:
+            return
+        values: list[list[str]] = [list(d.values()) for d in movie_dicts]
         self.logger.debug("%s", values)
-        setup_checkboxes(ss=self, cell=f"A{insert_row}")
-        set_insert_row_height(ss=self, row=insert_row)
-        color_odd_rows(ss=self, row=insert_row, nth=SHEET_NTH_ROW)
-        self.worksheet.update(
-            range_name=a1_notation,
-            values=values,
+        requests: list[dict[str, Any]] = []
+        if append:
+            first_row: int = self.append_rows(values)
+        else:
+            first_row = self.find_free_row()
+            requests = insert_rows_requests(ss=self, first_row=first_row, values=values)
+        last_row: int = first_row + len(values) - 1
+        self.logger.debug("First insert row %s", first_row)
+        # rows before the first inserted one were set up when they were added
+        formatted_rows: int = (
+            self.formatted_rows if self.formatted_rows is not None else first_row - 1
+        )
+        extension, formatted_rows = extend_data_rows_requests(
+            self, formatted_rows, last_row
+        )
+        if requests or extension:
+            self.spreadsheet.batch_update({"requests": requests + extension})
+        if extension:
+            self._save_formatted_rows(formatted_rows)
+        self.logger.info(
+            "Added %d movies in rows %d to %d", len(movie_dicts), first_row, last_row
+        )
+
+    def _save_formatted_rows(self, formatted_rows: int) -> None:
+        self.logger.debug("Data rows set up until row %d", formatted_rows)
+        self.formatted_rows = formatted_rows
+        grid: dict[str, Any] = self.worksheet._properties["gridProperties"]  # type: ignore
+        grid["rowCount"] = max(grid["rowCount"], formatted_rows)
+        if self.spreadsheet_id is None or self.worksheet_index is None:
+            return
+        update_sheet_state(
+            state_key(self.spreadsheet_id, self.worksheet_index),
+            formatted_rows=formatted_rows,
+            worksheet=self.worksheet._properties,  # type: ignore
+        )
+
+    def append_rows(self, values: list[list[str]]) -> int:
+        """Appends rows after the last row of the table.
+        Empty rows after the table are overwritten, so rows that
+         were set up in advance keep their checkboxes and height
+
+        Args:
+            values (list[list[str]]): row values to append
+
+        Raises:
+            AttributeError: if worksheet is not set
+
+        Returns:
+            int: Returns number of first row that was written
+        """
+        if self.worksheet is None:
+            raise AttributeError("Select a worksheet first")
+        response = self.worksheet.append_rows(
+            values,
             value_input_option=ValueInputOption.user_entered,
+            insert_data_option=InsertDataOption.overwrite,
+            table_range=SHEET_COLUMNS_RANGE,
         )
-        info = show_info(movie_dict)
-        self.logger.info(f"Added Movie Info: \n{info}")
+        updated_range: str = response["updates"]["updatedRange"]
+        grid_range = a1_range_to_grid_range(updated_range.rsplit("!", 1)[-1])
+        return grid_range["startRowIndex"] + 1
@@ -0,0 +1,42 @@
+"""Configuration read lazily from environment variables and the .env file"""
+
+import functools
+import os
+
+MAX_WORKERS = 8
+IMPORT_BATCH_SIZE = 50
+
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8574
+
+
+@functools.cache
+def load_config() -> None:
+    """Loads .env file into the environment once"""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+def get_env(key: str, default: str | None = None) -> str | None:
+    """Returns configuration value, loading the .env file on first use
+
+    Args:
+        key (str): name of environment variable
+        default (str | None, optional): value if variable is not set.
+         Defaults to None.
+
+    Returns:
+        str | None: value of environment variable
+    """
+    load_config()
+    return os.environ.get(key, default)
+
+
+def get_server_port() -> int:
+    """Returns port of sheepy server
+
+    Returns:
+        int: port from SHEEPY_SERVER_PORT or default port
+    """
+    return int(get_env("SHEEPY_SERVER_PORT", str(SERVER_PORT)))  # type: ignore
@@ -4,3 +4,23 @@ class RatingRetrievalError(Exception):
 
 class MovieRetrievalError(Exception):
     pass
+
+
+class OmdbRequestError(MovieRetrievalError):
+    pass
+
+
+class OmdbConnectionError(OmdbRequestError):
+    pass
+
+
+class OmdbHTTPError(OmdbRequestError):
+    pass
+
+
+class OmdbQuotaError(OmdbRequestError):
+    pass
+
+
+class ServerError(Exception):
+    pass
@@ -1,10 +1,29 @@
+import contextlib
 import os
+import sys
+import tempfile
+from collections.abc import Iterator
 from logging import Logger
+from typing import BinaryIO
 
 from sheepy.util.logger import get_logger
 
 logger: Logger = get_logger(__name__)
 
+CACHE_DIR = os.environ.get(
+    "SHEEPY_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "sheepy")
+)
+
+
+def get_cache_dir() -> str:
+    """Returns directory for sheepy's local state, creating it if necessary
+
+    Returns:
+        str: path of cache directory
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return CACHE_DIR
+
 
 def delete_csv(filename: str = "sheepy.csv") -> None:
     """Deletes downloaded CSV-file from the filesystem"""
@@ -29,6 +48,79 @@ def rename_file(new_name: str, orig_file: str = "sheepy.csv") -> None:
         logger.debug(fnfe)
 
 
+@contextlib.contextmanager
+def atomic_write(filename: str) -> Iterator[BinaryIO]:
+    """Opens temporary file for writing that replaces filename when closed.
+     Readers never see a partially written file and the original file
+      is kept if writing fails
+
+    Args:
+        filename (str): path of file to write
+
+    Yields:
+        BinaryIO: temporary file opened in binary mode
+    """
+    directory: str = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_name = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(filename)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            yield tmp_file
+        os.replace(tmp_name, filename)
+    except BaseException:
+        os.remove(tmp_name)
+        raise
+
+
+@contextlib.contextmanager
+def file_lock(filename: str) -> Iterator[None]:
+    """Holds an exclusive lock on filename.lock while the block runs.
+     Waits until other processes and threads release the lock
+
+    Args:
+        filename (str): path of file to lock
+
+    Yields:
+        None: nothing, the lock is held while the block runs
+    """
+    with open(f"{filename}.lock", "a+b") as lock_file:
+        if sys.platform == "win32":
+            import msvcrt
+
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            # released when the file is closed
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+
+def read_imdb_ids(filename: str) -> list[str]:
+    """Reads IMDb IDs from a file, one ID per line.
+     Empty lines and lines starting with '#' are skipped
+
+    Args:
+        filename (str): path of file containing IMDb IDs
+
+    Returns:
+        list[str]: list of IMDb IDs
+    """
+    with open(filename, "r") as f:
+        return [
+            line.strip()
+            for line in f
+            if line.strip() and not line.strip().startswith("#")
+        ]
+
+
 def create_env_file(ss):
     ss.logger.info(
         "Make Sure to fill out remaining fields in .env file."
@@ -3,10 +3,13 @@
 import logging
 import os
 import sys
+from typing import TextIO
+
+from sheepy.util.config import get_env
 
 LOG_FORMAT = "[%(asctime)s] {%(filename)s:%(lineno)d} %(levelname)s - %(message)s"
 
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_LEVEL = "INFO"
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -20,13 +23,15 @@ def create_log_dir(dir_name: str, log_file_name: str) -> None:
             open(os.path.join(dir_name, log_file_name), "w").close()
 
 
-def setup_logging(dir_name: str = "logs", log_file_name: str = "file.log") -> None:
+def setup_logging(
+    dir_name: str = "logs", log_file_name: str = "file.log", stream: TextIO = sys.stdout
+) -> None:
+    create_log_dir(dir_name=dir_name, log_file_name=log_file_name)
     logging.basicConfig(
-        level=LOG_LEVEL,
+        level=get_env("LOG_LEVEL", LOG_LEVEL),
         format=LOG_FORMAT,
         handlers=[
             logging.FileHandler(filename=os.path.join(dir_name, log_file_name)),
-            logging.StreamHandler(stream=sys.stdout),
+            logging.StreamHandler(stream=stream),
         ],
     )
-    create_log_dir(dir_name=dir_name, log_file_name=log_file_name)
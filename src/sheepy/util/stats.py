@@ -0,0 +1,247 @@
+"""Records outbound HTTP calls of a command and summarizes them at exit."""
+
+import atexit
+import json
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, TextIO
+from urllib.parse import unquote, urlparse
+
+from sheepy.util.logger import get_logger
+
+stats_logger = get_logger(__name__)
+
+# host prefixes of outbound calls and the category they are counted in
+CATEGORIES = [
+    ("www.omdbapi.com", "omdb"),
+    ("oauth2.googleapis.com", "auth"),
+    ("sheets.googleapis.com", "sheets"),
+    ("www.googleapis.com", "drive"),
+    ("docs.google.com", "export"),
+]
+SLOWEST_CALLS = 5
+
+
+@dataclass
+class CallRecord:
+    """Outbound HTTP call"""
+
+    category: str
+    endpoint: str
+    caller: str
+    status: int | None
+    duration: float
+    sent: int
+    received: int
+
+
+def _category(host: str) -> str:
+    for prefix, category in CATEGORIES:
+        if host.startswith(prefix):
+            return category
+    return "other"
+
+
+def _caller() -> str:
+    # first sheepy function up the stack, e.g. formatting.check_headers
+    frame = sys._getframe(2)
+    while frame is not None:
+        module: str = frame.f_globals.get("__name__", "")
+        if module.startswith("sheepy.") and module != __name__:
+            return f"{module.removeprefix('sheepy.')}.{frame.f_code.co_name}"
+        frame = frame.f_back  # type: ignore
+    return "unknown"
+
+
+class StatsRecorder:
+    """Collects CallRecords of all requests sent through requests.Session"""
+
+    def __init__(self) -> None:
+        self.calls: list[CallRecord] = []
+        self._lock = threading.Lock()
+
+    def install(self) -> None:
+        """Wraps requests.Session.send, so that every request is recorded"""
+        import requests
+
+        original_send = requests.Session.send
+        recorder: StatsRecorder = self
+
+        def send(
+            session: requests.Session, request: requests.PreparedRequest, **kwargs: Any
+        ) -> requests.Response:
+            caller: str = _caller()
+            start: float = time.perf_counter()
+            response: requests.Response | None = None
+            try:
+                response = original_send(session, request, **kwargs)
+                return response
+            finally:
+                recorder.record(
+                    request, response, time.perf_counter() - start, caller, **kwargs
+                )
+
+        requests.Session.send = send  # type: ignore
+
+    def record(
+        self,
+        request: Any,
+        response: Any,
+        duration: float,
+        caller: str,
+        stream: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        """Records a finished request
+
+        Args:
+            request (requests.PreparedRequest): sent request
+            response (requests.Response | None): response or None if it failed
+            duration (float): seconds until the response headers arrived
+            caller (str): sheepy function that sent the request
+            stream (bool, optional): Whether the body is read later.
+             Defaults to False.
+        """
+        url = urlparse(request.url)
+        received: int = 0
+        if response is not None:
+            received = (
+                int(response.headers.get("Content-Length", 0))
+                if stream
+                else len(response.content)
+            )
+        body = request.body or b""
+        with self._lock:
+            self.calls.append(
+                CallRecord(
+                    category=_category(url.hostname or ""),
+                    # query strings are left out, they may contain the api key
+                    endpoint=f"{request.method} {url.hostname}{unquote(url.path)}",
+                    caller=caller,
+                    status=None if response is None else response.status_code,
+                    duration=duration,
+                    sent=len(body),
+                    received=received,
+                )
+            )
+
+    def summary(self) -> dict[str, Any]:
+        """Summarizes recorded calls
+
+        Returns:
+            dict[str, Any]: calls per category, slowest calls,
+             OMDb cache hits and all recorded calls
+        """
+        with self._lock:
+            calls: list[CallRecord] = list(self.calls)
+        categories: dict[str, dict[str, Any]] = {}
+        for call in calls:
+            category = categories.setdefault(
+                call.category,
+                {"count": 0, "total": 0.0, "slowest": 0.0, "sent": 0, "received": 0},
+            )
+            category["count"] += 1
+            category["total"] += call.duration
+            category["slowest"] = max(category["slowest"], call.duration)
+            category["sent"] += call.sent
+            category["received"] += call.received
+        return {
+            "categories": categories,
+            "slowest": [
+                asdict(c)
+                for c in sorted(calls, key=lambda c: c.duration, reverse=True)[
+                    :SLOWEST_CALLS
+                ]
+            ],
+            "cache": _cache_stats(),
+            "calls": [asdict(c) for c in calls],
+        }
+
+    def print_summary(
+        self, output_format: str = "text", out: TextIO = sys.stderr
+    ) -> None:
+        """Prints summary of recorded calls
+
+        Args:
+            output_format (str, optional): "text" for tables or "json".
+             Defaults to "text".
+            out (TextIO, optional): stream to print to. Defaults to sys.stderr.
+        """
+        summary: dict[str, Any] = self.summary()
+        stats_logger.debug(json.dumps(summary["categories"]))
+        if output_format == "json":
+            print(json.dumps(summary), file=out)
+            return
+        from tabulate import tabulate
+
+        print("\nAPI calls", file=out)
+        print(
+            tabulate(
+                [
+                    [
+                        name,
+                        c["count"],
+                        f"{c['total'] * 1000:.0f}",
+                        f"{c['slowest'] * 1000:.0f}",
+                        c["sent"],
+                        c["received"],
+                    ]
+                    for name, c in summary["categories"].items()
+                ],
+                headers=[
+                    "Category",
+                    "Calls",
+                    "Total [ms]",
+                    "Slowest [ms]",
+                    "Sent [B]",
+                    "Received [B]",
+                ],
+            ),
+            file=out,
+        )
+        if summary["slowest"]:
+            print("\nSlowest calls", file=out)
+            print(
+                tabulate(
+                    [
+                        [f"{c['duration'] * 1000:.0f}", c["caller"], c["endpoint"]]
+                        for c in summary["slowest"]
+                    ],
+                    headers=["[ms]", "Caller", "Endpoint"],
+                ),
+                file=out,
+            )
+        cache: dict[str, int] | None = summary["cache"]
+        if cache is not None:
+            print(
+                f"\nOMDb cache: {cache['hits']} hits, {cache['misses']} misses",
+                file=out,
+            )
+
+
+def _cache_stats() -> dict[str, int] | None:
+    # the OMDb module is only loaded by commands that use it
+    api = sys.modules.get("sheepy.omdb.api")
+    cache = None if api is None else getattr(api, "_cache", None)
+    return None if cache is None else {"hits": cache.hits, "misses": cache.misses}
+
+
+def enable_stats(
+    output_format: str = "text", out: TextIO = sys.stderr
+) -> StatsRecorder:
+    """Records all outbound calls of this process and prints a summary at exit
+
+    Args:
+        output_format (str, optional): "text" for tables or "json".
+         Defaults to "text".
+        out (TextIO, optional): stream to print to. Defaults to sys.stderr.
+
+    Returns:
+        StatsRecorder: recorder of calls
+    """
+    recorder: StatsRecorder = StatsRecorder()
+    recorder.install()
+    atexit.register(recorder.print_summary, output_format, out)
+    return recorder
@@ -1,5 +1,58 @@
 """Utilities to manipulate strings"""
 
+import re
+from urllib.parse import quote_plus
+
+_NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+IMDB_ID_PATTERN: re.Pattern = re.compile(r"tt\d{7,8}$", re.IGNORECASE)
+# matches IDs anywhere in text, e.g. in https://www.imdb.com/title/tt0083658/
+IMDB_ID_SCAN_PATTERN: re.Pattern = re.compile(
+    r"(?<![a-z0-9])tt\d{7,8}(?!\d)", re.IGNORECASE
+)
+
+
+def check_for_imdb_id(clipboard_content: str) -> bool:
+    """Checks whether or not arg is a valid imdb id
+
+    Args:
+        clipboard_content (str): Current clipboard content
+
+    Returns:
+        bool: Returns true if given string is a valid id
+    """
+    match: re.Match[str] | None = IMDB_ID_PATTERN.match(clipboard_content)
+    return False if match is None else True
+
+
+def contains_imdb_id(clipboard_content: str) -> bool:
+    """Checks whether or not arg contains at least one imdb id
+
+    Args:
+        clipboard_content (str): Current clipboard content
+
+    Returns:
+        bool: Returns true if given string contains an id
+    """
+    return IMDB_ID_SCAN_PATTERN.search(clipboard_content) is not None
+
+
+def extract_imdb_ids(clipboard_content: str) -> list[str]:
+    """Extracts all unique imdb ids from arbitrary text, including IMDb URLs
+
+    Args:
+        clipboard_content (str): Current clipboard content
+
+    Returns:
+        list[str]: Returns ids in order of first occurrence
+    """
+    return list(
+        dict.fromkeys(
+            imdb_id.lower()
+            for imdb_id in IMDB_ID_SCAN_PATTERN.findall(clipboard_content)
+        )
+    )
+
 
 # TODO: Detect words and dont add newlines in the middle of them
 def insert_newlines(string: str, nth: int = 64) -> str:
@@ -38,3 +91,50 @@ def build_request_url(
     if year is not None:
         return base_url + api_key + "&t=" + title_or_id + "&y=" + str(year)
     return base_url + api_key + "&i=" + title_or_id
+
+
+def build_search_url(
+    base_url: str, api_key: str, query: str, page: int, year: int | None = None
+) -> str:
+    """builds search request url for omdb api
+
+    Args:
+        base_url (str): base url for request (https://xyz.com)
+        api_key (str): key for api access
+        query (str): title or part of title to search for
+        page (int): page of search results, starting at 1
+        year (int | None, optional): year in which movie was released. Defaults to None.
+
+    Returns:
+        str: returns build url for api request
+    """
+    url: str = base_url + api_key + "&s=" + quote_plus(query) + "&page=" + str(page)
+    if year is not None:
+        url += "&y=" + str(year)
+    return url
+
+
+def parse_number(value: str) -> float | None:
+    """Parses first number of a value from OMDb or the sheet
+
+    Args:
+        value (str): value like "117 min", "89%", "8.1" or "N/A"
+
+    Returns:
+        float | None: parsed number or None if value contains no number
+    """
+    match = _NUMBER_PATTERN.search(value)
+    return None if match is None else float(match.group())
+
+
+def parse_int(value: str) -> int | None:
+    """Parses first number of a value from OMDb or the sheet as int
+
+    Args:
+        value (str): value like "117 min", "1982" or "N/A"
+
+    Returns:
+        int | None: parsed number or None if value contains no number
+    """
+    number: float | None = parse_number(value)
+    return None if number is None else int(number)
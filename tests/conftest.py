@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(mocker, tmp_path):
+    """Keeps caches and the OMDb quota of tests out of the user's cache directory"""
+    mocker.patch("sheepy.util.file.CACHE_DIR", str(tmp_path))
+    mocker.patch("sheepy.omdb.api._quota", None)
+    return tmp_path
@@ -0,0 +1,39 @@
+from benchmarks.load import run_load
+from benchmarks.movie import run_movie_benchmark
+from benchmarks.run import Result, compare, run_benchmarks
+
+
+class TestBenchmarks:
+    def test_run_benchmarks(self):
+        results = {r.scenario: r for r in run_benchmarks(latency=0, repeat=2)}
+        assert results["view"].omdb_calls == 1
+        assert results["view (cached)"].omdb_calls < 1
+        assert results["find"].omdb_calls == 3 + 5
+        assert results["bulk add (50)"].omdb_calls == 50
+        assert results["bulk add (50)"].google_calls == 1
+        assert results["dl"].google_calls == 1
+        assert results["search"].google_calls == 0
+        assert all(r.p50 <= r.p95 for r in results.values())
+
+    def test_compare(self):
+        baseline = [{"scenario": "add", "p50": 0.1, "omdb_calls": 1, "google_calls": 2}]
+        ok = Result("add", 1, 0.1, 0.11, 0.2, 1, 2)
+        slow = Result("add", 1, 0.1, 0.2, 0.2, 1, 3)
+        assert compare([ok], baseline, 0.2) == []
+        assert len(compare([slow], baseline, 0.2)) == 2
+
+    def test_run_load(self):
+        results = {r.scenario: r for r in run_load(rows=1000, repeat=2)}
+        assert results["add"].operations["values.append"] == 1
+        assert results["bulk add (50)"].calls == 1
+        assert results["dl"].operations == {"export": 1}
+        assert all(r.failed == 0 for r in results.values())
+
+    def test_run_load_rate_limited(self):
+        results = run_load(rows=10, repeat=5, rate_limit=0.5)
+        assert any(r.failed for r in results)
+
+    def test_run_movie_benchmark(self):
+        results = run_movie_benchmark(count=100)
+        assert [r.movie for r in results] == ["dict (before)", "slots"]
+        assert all(r.count == 100 and r.memory > 0 for r in results)
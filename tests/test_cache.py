@@ -0,0 +1,82 @@
+import pytest
+
+from sheepy.omdb.cache import OmdbCache
+
+
+@pytest.fixture
+def response() -> dict[str, str]:
+    return {
+        "Title": "Blade Runner",
+        "Year": "1982",
+        "imdbID": "tt0083658",
+        "imdbRating": "8.1",
+        "Response": "True",
+    }
+
+
+@pytest.fixture
+def cache(tmp_path) -> OmdbCache:
+    return OmdbCache(path=str(tmp_path / "omdb.sqlite3"))
+
+
+class TestOmdbCache:
+    def test_get_miss(self, cache):
+        assert cache.get("tt0083658") is None
+        assert (cache.hits, cache.misses) == (0, 1)
+
+    def test_put_get(self, cache, response):
+        cache.put(response)
+        assert cache.get("tt0083658") == response
+        assert cache.get("TT0083658") == response
+        assert (cache.hits, cache.misses) == (2, 0)
+
+    def test_get_by_name_and_year(self, cache, response):
+        cache.put(response, "Blade Runner", 1982)
+        assert cache.get_by_name_and_year("blade runner", 1982) == response
+        assert cache.get_by_name_and_year("Blade Runner", 2049) is None
+
+    def test_search(self, cache, response):
+        page = {"Search": [response], "totalResults": "1", "Response": "True"}
+        cache.put_search("Blade Runner", 1, page)
+        assert cache.get_search("blade runner", 1) == page
+        assert cache.get_search("Blade Runner", 2) is None
+        assert cache.get_search("Blade Runner", 1, 1982) is None
+
+    def test_rating_ttl_expired(self, tmp_path, response):
+        cache = OmdbCache(path=str(tmp_path / "omdb.sqlite3"), rating_ttl=-1)
+        cache.put(response, "Blade Runner", 1982)
+        assert cache.get("tt0083658") is None
+        assert cache.get_by_name_and_year("Blade Runner", 1982) is None
+        # static fields are kept longer than ratings
+        assert cache.get("tt0083658", stale_ratings=True) == response
+
+    def test_static_ttl_expired(self, tmp_path, response):
+        cache = OmdbCache(path=str(tmp_path / "omdb.sqlite3"), static_ttl=-1)
+        cache.put(response)
+        assert cache.get("tt0083658", stale_ratings=True) is None
+
+    def test_evict_least_recently_used(self, tmp_path, response):
+        cache = OmdbCache(path=str(tmp_path / "omdb.sqlite3"), max_entries=2)
+        for imdb_id in ["tt0000001", "tt0000002"]:
+            cache.put({**response, "imdbID": imdb_id})
+        cache.get("tt0000001")
+        cache.put({**response, "imdbID": "tt0000003"})
+        assert cache.get("tt0000002") is None
+        assert cache.get("tt0000001") is not None
+        assert cache.get("tt0000003") is not None
+
+    def test_evict_by_size(self, tmp_path, response):
+        cache = OmdbCache(path=str(tmp_path / "omdb.sqlite3"), max_bytes=1)
+        cache.put(response)
+        assert cache.get("tt0083658") is None
+
+    def test_evict_search_pages(self, tmp_path, response):
+        cache = OmdbCache(path=str(tmp_path / "omdb.sqlite3"), max_entries=2)
+        page = {"Search": [response], "totalResults": "1", "Response": "True"}
+        cache.put(response)
+        cache.put_search("Blade Runner", 1, page)
+        cache.get("tt0083658")
+        cache.put_search("Blade Runner", 2, page)
+        assert cache.get_search("Blade Runner", 1) is None
+        assert cache.get_search("Blade Runner", 2) == page
+        assert cache.get("tt0083658") == response
@@ -0,0 +1,143 @@
+import pytest
+
+from sheepy import core
+from sheepy.omdb import api
+from sheepy.util.exceptions import MovieRetrievalError
+
+
+@pytest.fixture
+def movie_dicts() -> dict[str, dict[str, str]]:
+    return {
+        "tt0083658": {"watched": "FALSE", "title": "Blade Runner"},
+        "tt1856101": {"watched": "FALSE", "title": "Blade Runner 2049"},
+    }
+
+
+class TestCore:
+    def test_add_movies_to_sheet(self, mocker, movie_dicts):
+        def fake_request(imdb_id, watched, add):
+            if imdb_id not in movie_dicts:
+                raise MovieRetrievalError("Incorrect IMDb ID.")
+            return movie_dicts[imdb_id]
+
+        mocker.patch(
+            "sheepy.core.process_movie_request_imdb_id", side_effect=fake_request
+        )
+        ss = mocker.Mock()
+
+        failed = core.add_movies_to_sheet(
+            ss, ["tt0083658", "tt0000000", "tt1856101", "tt0083658"]
+        )
+
+        assert list(failed) == ["tt0000000"]
+        ss.add_rows_to_sheet.assert_called_once_with(
+            [movie_dicts["tt0083658"], movie_dicts["tt1856101"]]
+        )
+
+    @pytest.mark.parametrize("bulk", [True, False])
+    def test_add_movies_to_sheet_bulk(self, mocker, movie_dicts, bulk):
+        marked: list[bool] = []
+
+        def fake_request(imdb_id, watched, add):
+            marked.append(api._bulk.get())
+            return movie_dicts[imdb_id]
+
+        mocker.patch(
+            "sheepy.core.process_movie_request_imdb_id", side_effect=fake_request
+        )
+
+        core.add_movies_to_sheet(mocker.Mock(), list(movie_dicts), bulk=bulk)
+
+        assert marked == [bulk] * len(movie_dicts)
+        assert not api._bulk.get()
+
+    def test_sync_mirror_skips_unchanged(self, mocker, tmp_path):
+        mocker.patch("sheepy.util.file.CACHE_DIR", str(tmp_path))
+        ss = mocker.Mock(spreadsheet_id="abc", worksheet_index="0", revision="1")
+        ss.read_rows.return_value = [["FALSE", "Blade Runner"]]
+        assert core.sync_mirror(ss).added == 1
+        assert core.sync_mirror(ss).skipped
+        ss.read_rows.assert_called_once()
+        assert not core.sync_mirror(ss, force=True).skipped
+
+    def test_search_movies_requires_sync(self, mocker, tmp_path):
+        mocker.patch("sheepy.util.file.CACHE_DIR", str(tmp_path))
+        mocker.patch("sheepy.util.config.get_env", return_value="abc")
+        with pytest.raises(SystemExit):
+            core.search_movies(genres=["drama"])
+
+    @pytest.fixture
+    def import_setup(self, mocker, tmp_path):
+        def fake_request(imdb_id, watched, add):
+            if imdb_id == "tt0000000":
+                raise MovieRetrievalError("Incorrect IMDb ID.")
+            return {"watched": "FALSE", "title": imdb_id, "year": "2000"}
+
+        mocker.patch(
+            "sheepy.core.process_movie_request_imdb_id", side_effect=fake_request
+        )
+        mocker.patch(
+            "sheepy.core.process_movie_request_name_year",
+            side_effect=lambda name, year, watched, add: {
+                "watched": "FALSE",
+                "title": name,
+                "year": year,
+            },
+        )
+        import_file = tmp_path / "movies.csv"
+        import_file.write_text(
+            "tt0083658\ntt0000000\nAlien,1979\ntt1856101\nSe7en,1995\n"
+        )
+        ss = mocker.Mock(spreadsheet_id="abc", worksheet_index="0")
+        sheet_rows: list[list] = [["TRUE", "Heat", 1995]]
+        ss.read_rows.side_effect = lambda: list(sheet_rows)
+        return ss, str(import_file), sheet_rows
+
+    def test_import_movies_resumes(self, import_setup):
+        ss, import_file, _ = import_setup
+        ss.add_rows_to_sheet.side_effect = [None, RuntimeError("quota"), None, None]
+
+        with pytest.raises(RuntimeError):
+            core.import_movies(ss, import_file, batch_size=2)
+        added, failed = core.import_movies(ss, import_file, batch_size=2)
+
+        written = [
+            [m["title"] for m in c.args[0]] for c in ss.add_rows_to_sheet.call_args_list
+        ]
+        assert written == [
+            ["tt0083658"],
+            ["Alien", "tt1856101"],
+            ["Alien", "tt1856101"],
+            ["Se7en"],
+        ]
+        assert added == 4
+        assert list(failed) == ["tt0000000"]
+        assert core.import_movies(ss, import_file) == (4, failed)
+        assert ss.add_rows_to_sheet.call_count == 4
+
+    def test_import_movies_skips_written_pending_batch(self, import_setup):
+        ss, import_file, sheet_rows = import_setup
+
+        def write_rows(movie_dicts):
+            # rows reach the sheet, but the response is lost
+            sheet_rows.extend(
+                [d["watched"], d["title"], int(d["year"])] for d in movie_dicts
+            )
+            if movie_dicts[0]["title"] == "Alien":
+                raise ConnectionError("response lost")
+
+        ss.add_rows_to_sheet.side_effect = write_rows
+
+        with pytest.raises(ConnectionError):
+            core.import_movies(ss, import_file, batch_size=2)
+        added, failed = core.import_movies(ss, import_file, batch_size=2)
+
+        assert [row[1] for row in sheet_rows] == [
+            "Heat",
+            "tt0083658",
+            "Alien",
+            "tt1856101",
+            "Se7en",
+        ]
+        assert added == 4
+        assert list(failed) == ["tt0000000"]
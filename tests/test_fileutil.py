@@ -1,4 +1,8 @@
 import os
+import threading
+import time
+
+import pytest
 
 from sheepy.util import file
 
@@ -15,3 +19,44 @@ class TestFileUtil:
         file.delete_csv("temp_file.csv")
         mock_remove.assert_called_once_with(filename)
         assert not os.path.isfile(filename)
+
+    def test_read_imdb_ids(self, tmp_path):
+        id_file = tmp_path / "ids.txt"
+        id_file.write_text("tt0083658\n\n# comment\n  tt1234567  \n")
+        assert file.read_imdb_ids(str(id_file)) == ["tt0083658", "tt1234567"]
+
+    def test_atomic_write(self, tmp_path):
+        target = tmp_path / "sheepy.csv"
+        target.write_bytes(b"old")
+        with file.atomic_write(str(target)) as f:
+            f.write(b"new")
+        assert target.read_bytes() == b"new"
+        assert os.listdir(tmp_path) == ["sheepy.csv"]
+
+    def test_atomic_write_keeps_file_on_error(self, tmp_path):
+        target = tmp_path / "sheepy.csv"
+        target.write_bytes(b"old")
+        with pytest.raises(RuntimeError):
+            with file.atomic_write(str(target)) as f:
+                f.write(b"partial")
+                raise RuntimeError
+        assert target.read_bytes() == b"old"
+        assert os.listdir(tmp_path) == ["sheepy.csv"]
+
+    def test_file_lock(self, tmp_path):
+        target = str(tmp_path / "state.json")
+        events = []
+
+        def locked(name):
+            with file.file_lock(target):
+                events.append(f"{name} start")
+                time.sleep(0.05)
+                events.append(f"{name} end")
+
+        threads = [threading.Thread(target=locked, args=(n,)) for n in "ab"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert events[0].split()[0] == events[1].split()[0]
+        assert events[2].split()[0] == events[3].split()[0]
@@ -0,0 +1,164 @@
+import sqlite3
+
+import pytest
+
+from sheepy.mirror.mirror import FIELDS, SheetMirror
+from sheepy.spreadsheet.memory import InMemorySheets, memory_client
+from sheepy.spreadsheet.sheet_config import COLUMNS
+from sheepy.spreadsheet.spreadsheet import SheepySpreadsheet
+
+
+@pytest.fixture
+def mirror(tmp_path) -> SheetMirror:
+    return SheetMirror(path=str(tmp_path / "mirror.sqlite3"))
+
+
+@pytest.fixture
+def rows() -> list[list]:
+    # values as displayed, posters as formulas, see SheepySpreadsheet.read_rows
+    return [
+        ["FALSE", "Blade Runner", "1982", "Action, Drama, Sci-Fi", "117 min",
+         "Jannes", "8.1", "89%", "Ridley Scott", "Replicants.", '=IMAGE("url")'],
+        ["TRUE", "Blade Runner 2049", "2017", "Action, Drama, Mystery", "164 min",
+         "Jannes", "8", "88%", "Denis Villeneuve", "A new blade runner.",
+         '=IMAGE("url")'],
+    ]  # fmt: skip
+
+
+class TestSheetMirror:
+    def test_first_sync(self, mirror, rows):
+        result = mirror.sync("abc:0", "1", rows)
+        assert (result.added, result.updated, result.deleted) == (2, 0, 0)
+        assert mirror.get_revision("abc:0") == "1"
+        movies = mirror.movies("abc:0")
+        assert movies[0]["watched"] == "FALSE"
+        assert movies[0]["year"] == "1982"
+        assert movies[1]["imdb_rating"] == "8"
+        assert movies[1]["poster"] == '=IMAGE("url")'
+
+    def test_sync_writes_changed_rows_only(self, mirror, rows):
+        mirror.sync("abc:0", "1", rows)
+        rows[1][0] = "FALSE"
+        result = mirror.sync("abc:0", "2", rows)
+        assert (result.added, result.updated, result.deleted) == (0, 1, 0)
+        assert mirror.movies("abc:0")[1]["watched"] == "FALSE"
+
+    def test_sync_deletes_removed_rows(self, mirror, rows):
+        mirror.sync("abc:0", "1", rows)
+        result = mirror.sync("abc:0", "2", rows[:1] + [[]])
+        assert (result.added, result.updated, result.deleted) == (0, 0, 1)
+        assert [m["title"] for m in mirror.movies("abc:0")] == ["Blade Runner"]
+
+    def test_sheets_are_separate(self, mirror, rows):
+        mirror.sync("abc:0", "1", rows)
+        assert mirror.movies("abc:1") == []
+        assert mirror.get_revision("abc:1") is None
+
+
+@pytest.fixture
+def indexed(mirror) -> SheetMirror:
+    def row(title, watched, year, genre, runtime, rating, tomatometer, director):
+        return [
+            watched,
+            title,
+            year,
+            genre,
+            runtime,
+            "Jannes",
+            rating,
+            tomatometer,
+            director,
+            "",
+            "",
+        ]
+
+    mirror.sync(
+        "abc:0",
+        "1",
+        [
+            row("Se7en", "TRUE", "1995", "Crime, Drama, Mystery", "127 min",
+                "8.6", "83%", "David Fincher"),
+            row("Zodiac", "FALSE", "2007", "Crime, Drama, Mystery, Thriller",
+                "157 min", "7.7", "90%", "David Fincher"),
+            row("Gone Girl", "FALSE", "2014", "Drama, Mystery, Thriller",
+                "149 min", "8.1", "87%", "David Fincher"),
+            row("Alien", "FALSE", "1979", "Horror, Sci-Fi", "117 min", "8.5",
+                "N/A", "Ridley Scott"),
+        ],
+    )  # fmt: skip
+    return mirror
+
+
+class TestMirrorSearch:
+    def test_unwatched_thrillers_by_fincher(self, indexed):
+        movies = indexed.search(
+            "abc:0",
+            watched=False,
+            terms={"genre": ["thriller"], "director": ["Fincher"]},
+            ranges={"imdb_rating": (7.8, None)},
+        )
+        assert [m["title"] for m in movies] == ["Gone Girl"]
+
+    def test_genre_with_separator(self, indexed):
+        movies = indexed.search("abc:0", terms={"genre": ["sci-fi"]})
+        assert [m["title"] for m in movies] == ["Alien"]
+
+    def test_title(self, indexed):
+        movies = indexed.search("abc:0", terms={"title": ["gone"]})
+        assert [m["title"] for m in movies] == ["Gone Girl"]
+
+    def test_ranges(self, indexed):
+        movies = indexed.search(
+            "abc:0", ranges={"year": (1990, 2010), "runtime": (None, 130)}
+        )
+        assert [m["title"] for m in movies] == ["Se7en"]
+        movies = indexed.search("abc:0", ranges={"tomatometer": (0, None)})
+        assert [m["title"] for m in movies] == ["Se7en", "Zodiac", "Gone Girl"]
+
+    def test_no_filters(self, indexed):
+        assert len(indexed.search("abc:0")) == 4
+        assert indexed.search("abc:1") == []
+
+    def test_index_follows_sync(self, indexed):
+        rows = [[m[f] for f in FIELDS] for m in indexed.movies("abc:0")]
+        rows[3][3] = "Horror, Thriller"
+        result = indexed.sync("abc:0", "2", rows[1:])
+        assert (result.updated, result.deleted) == (3, 1)
+        movies = indexed.search("abc:0", terms={"genre": ["thriller"]})
+        assert [m["title"] for m in movies] == ["Zodiac", "Gone Girl", "Alien"]
+        assert indexed.search("abc:0", terms={"title": ["se7en"]}) == []
+
+    def test_old_schema_is_dropped(self, tmp_path, rows):
+        path = str(tmp_path / "old.sqlite3")
+        with sqlite3.connect(path) as conn:
+            conn.execute("CREATE TABLE movies (sheet TEXT, row INTEGER)")
+            conn.execute("CREATE TABLE syncs (sheet TEXT, revision TEXT)")
+            conn.execute("INSERT INTO syncs VALUES ('abc:0', '1')")
+        mirror = SheetMirror(path=path)
+        assert mirror.get_revision("abc:0") is None
+        mirror.sync("abc:0", "1", rows)
+        assert len(mirror.search("abc:0", terms={"title": ["blade"]})) == 2
+
+    def test_tomatometer_of_synced_sheet(self, mirror):
+        backend = InMemorySheets()
+        backend.create_spreadsheet("abc", worksheet="Sheepy")
+        backend.add_rows("abc", [list(COLUMNS)])
+        ss = SheepySpreadsheet("abc", "0", client=memory_client(backend))
+        ss.add_rows_to_sheet(
+            [
+                dict(zip(FIELDS, row, strict=True))
+                for row in [
+                    ["TRUE", "Se7en", "1995", "Crime", "127 min", "Jannes", "8.6",
+                     "83%", "David Fincher", "", '=IMAGE("url")'],
+                    ["FALSE", "Zodiac", "2007", "Crime", "157 min", "Jannes", "7.7",
+                     "90%", "David Fincher", "", '=IMAGE("url")'],
+                ]
+            ]
+        )  # fmt: skip
+        mirror.sync("abc:0", ss.revision, ss.read_rows())
+        movies = mirror.search("abc:0", ranges={"tomatometer": (85, None)})
+        assert [m["title"] for m in movies] == ["Zodiac"]
+
+    def test_invalid_field(self, indexed):
+        with pytest.raises(ValueError):
+            indexed.search("abc:0", ranges={"title": (1, 2)})
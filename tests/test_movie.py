@@ -1,6 +1,8 @@
+import dataclasses
+
 import pytest
 
-from sheepy.model.movie import Movie
+from sheepy.model.movie import MOVIE_FIELDS, Movie
 from sheepy.model.rating import Rating
 
 
@@ -11,7 +13,7 @@ def build_dict_valid_ratings() -> dict:
     mov_dict["title"] = "Test"
     mov_dict["year"] = "1992"
     mov_dict["genre"] = "Horror, Thriller, Drama"
-    mov_dict["runtime"] = "109"
+    mov_dict["runtime"] = "109 min"
     mov_dict["suggested_by"] = "Jannes"
     mov_dict["imdb_rating"] = "4.5"
     mov_dict["tomatometer"] = "45%"
@@ -28,7 +30,7 @@ def build_dict_no_ratings() -> dict:
     mov_dict["title"] = "Test"
     mov_dict["year"] = "1992"
     mov_dict["genre"] = "Horror, Thriller, Drama"
-    mov_dict["runtime"] = "109"
+    mov_dict["runtime"] = "109 min"
     mov_dict["suggested_by"] = "Jannes"
     mov_dict["imdb_rating"] = "N/A"
     mov_dict["tomatometer"] = "N/A"
@@ -46,7 +48,7 @@ class TestMovie:
             "Test",
             "1992",
             "Horror, Thriller, Drama",
-            "109",
+            "109 min",
             "Jannes",
             Rating("4.5", "45%"),
             "Somebody",
@@ -65,7 +67,7 @@ class TestMovie:
             "Not the Same",
             "1992",
             "Horror, Thriller, Drama",
-            "109",
+            "109 min",
             "Jannes",
             Rating("3.5", "35%"),
             "Somebody",
@@ -92,3 +94,48 @@ class TestMovie:
         mov.rating = Rating("4.5", "45%")
         got = mov.build_dict()
         assert build_dict_valid_ratings == got
+
+    def test_numeric_fields_parsed(self, mov):
+        assert mov.year == 1992
+        assert mov.runtime == 109
+        assert mov.rating.imdb_rating == 4.5
+        assert mov.rating.tomatometer == 45
+
+    def test_build_dict_no_ratings(self, build_dict_no_ratings, mov):
+        mov.rating = Rating("N/A", "N/A")
+        assert mov.rating.imdb_rating is None
+        assert build_dict_no_ratings == mov.build_dict()
+
+    def test_build_dict_typed_values(self, build_dict_valid_ratings, mov):
+        typed = Movie(
+            "TRUE",
+            "Test",
+            1992,
+            "Horror, Thriller, Drama",
+            109,
+            "Jannes",
+            Rating(4.5, 45),
+            "Somebody",
+            "Something happens",
+            "some url",
+        )
+        assert typed == mov
+        assert build_dict_valid_ratings == typed.build_dict()
+
+    def test_to_row(self, build_dict_valid_ratings, mov):
+        assert mov.to_row() == list(build_dict_valid_ratings.values())
+        assert tuple(mov.build_dict()) == MOVIE_FIELDS
+
+    @pytest.mark.parametrize(
+        "year,first_year",
+        [("2008–2013", 2008), ("2019–", 2019), ("1992", 1992), ("N/A", None)],
+    )
+    def test_series_year(self, mov, year, first_year):
+        series = dataclasses.replace(mov, year=year)
+        assert series.year == first_year
+        assert series.build_dict()["year"] == year
+        assert str(series) == f"Test ({year})"
+
+    def test_slots(self, mov):
+        assert not hasattr(mov, "__dict__")
+        assert not hasattr(mov.rating, "__dict__")
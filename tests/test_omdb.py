@@ -1,9 +1,16 @@
 import pytest
+import requests
 from tabulate import tabulate
 
 from sheepy.model.movie import Movie
 from sheepy.model.rating import Rating
 from sheepy.omdb import api
+from sheepy.util.exceptions import (
+    MovieRetrievalError,
+    OmdbConnectionError,
+    OmdbHTTPError,
+    OmdbQuotaError,
+)
 
 
 @pytest.fixture
@@ -139,6 +146,12 @@ class TestOmdb:
             raw_movie_info, watched=True, add=True
         )
 
+    def test_extract_series_year(self, raw_movie_info):
+        raw_movie_info["Year"] = "2008–2013"
+        movie = api._extract_movie_data(raw_movie_info, watched=False, add=True)
+        assert movie.year == 2008
+        assert movie.build_dict()["year"] == "2008–2013"
+
     def test_extract_tomatometer(self, ratings):
         assert Rating.extract_tomatometer(ratings) == "89%"
 
@@ -190,3 +203,131 @@ class TestOmdb:
             stralign="center",
             numalign="center",
         ) == api.show_info(movie_dict)
+
+
+def _response(status_code: int, content: bytes = b"{}") -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.url = "http://www.omdbapi.com/"
+    return response
+
+
+class TestOmdbRequest:
+    @pytest.fixture(autouse=True)
+    def no_sleep(self, mocker):
+        return mocker.patch("sheepy.omdb.api.time.sleep")
+
+    def test_retry_on_server_error(self, mocker, no_sleep):
+        get = mocker.patch.object(
+            api.get_session(),
+            "get",
+            side_effect=[_response(503), _response(200, b'{"Response": "True"}')],
+        )
+        assert api._request_omdb("http://www.omdbapi.com/") == {"Response": "True"}
+        assert get.call_count == 2
+        assert get.call_args.kwargs["timeout"] == (
+            api.CONNECT_TIMEOUT,
+            api.READ_TIMEOUT,
+        )
+        no_sleep.assert_called_once()
+
+    def test_no_retry_on_client_error(self, mocker):
+        get = mocker.patch.object(api.get_session(), "get", return_value=_response(401))
+        with pytest.raises(OmdbHTTPError):
+            api._request_omdb("http://www.omdbapi.com/")
+        assert get.call_count == 1
+
+    def test_quota_response(self, mocker):
+        mocker.patch.object(
+            api.get_session(),
+            "get",
+            return_value=_response(401, b'{"Error": "Request limit reached!"}'),
+        )
+        with pytest.raises(OmdbQuotaError):
+            api._request_omdb("http://www.omdbapi.com/")
+        assert api.get_quota().remaining() == 0
+
+    def test_bulk_quota_response_gives_up(self, mocker):
+        quota = mocker.patch("sheepy.omdb.api.get_quota").return_value
+        get = mocker.patch.object(
+            api.get_session(),
+            "get",
+            return_value=_response(401, b'{"Error": "Request limit reached!"}'),
+        )
+        with api.bulk_requests(), pytest.raises(OmdbQuotaError):
+            api._request_omdb("http://www.omdbapi.com/")
+        assert get.call_count == api.MAX_RETRIES + 1
+        quota.acquire.assert_called_with(True)
+
+    def test_connection_error_gives_up(self, mocker, no_sleep):
+        get = mocker.patch.object(
+            api.get_session(),
+            "get",
+            side_effect=requests.exceptions.ConnectionError("reset"),
+        )
+        with pytest.raises(OmdbConnectionError):
+            api._request_omdb("http://www.omdbapi.com/")
+        assert get.call_count == api.MAX_RETRIES + 1
+        assert no_sleep.call_count == api.MAX_RETRIES
+
+
+def _search(query: str, page: int, year: int | None = None) -> dict:
+    if page > 2:
+        return {"Search": [], "totalResults": "15", "Response": "True"}
+    return {
+        "Search": [
+            {"Title": f"{query} {i}", "Year": "1982", "imdbID": f"tt{i:07d}"}
+            for i in range((page - 1) * 10, min(page * 10, 15))
+        ],
+        "totalResults": "15",
+        "Response": "True",
+    }
+
+
+class TestOmdbSearch:
+    @pytest.fixture(autouse=True)
+    def api_key(self, monkeypatch):
+        monkeypatch.setenv("OMDB_API_KEY", "abc123")
+
+    def test_search_omdb(self, mocker, mock_data):
+        mocker.patch("sheepy.omdb.api._search_page", side_effect=_search)
+        get_movie_data = mocker.patch(
+            "sheepy.omdb.api._get_movie_data", return_value=mock_data
+        )
+
+        results = api.search_omdb("Blade Runner", pages=3, hydrate=2)
+
+        assert len(results) == 15
+        assert results[:2] == [mock_data, mock_data]
+        assert results[2]["Title"] == "Blade Runner 2"
+        assert [c.args[0] for c in get_movie_data.call_args_list] == [
+            "tt0000000",
+            "tt0000001",
+        ]
+
+    def test_search_omdb_failed_record(self, mocker):
+        mocker.patch("sheepy.omdb.api._search_page", side_effect=_search)
+        mocker.patch(
+            "sheepy.omdb.api._get_movie_data",
+            side_effect=MovieRetrievalError("Incorrect IMDb ID."),
+        )
+        results = api.search_omdb("Blade Runner", pages=1, hydrate=1)
+        assert results[0]["Title"] == "Blade Runner 0"
+
+    def test_search_page_not_found(self, mocker):
+        request = mocker.patch(
+            "sheepy.omdb.api._request_omdb",
+            return_value={"Response": "False", "Error": api.NOT_FOUND_ERROR},
+        )
+        assert api._search_page("Blade Runner", 4)["Search"] == []
+        assert api._search_page("Blade Runner", 4)["Search"] == []
+        request.assert_called_once()
+
+    def test_search_page_error(self, mocker):
+        mocker.patch(
+            "sheepy.omdb.api._request_omdb",
+            return_value={"Response": "False", "Error": "Too many results."},
+        )
+        with pytest.raises(MovieRetrievalError):
+            api._search_page("a", 1)
@@ -1,8 +1,15 @@
+import time
 from dataclasses import dataclass
 
-import pytest  # noqa: F401
+import pytest
 
-from sheepy.parser.clipboard_parser import check_for_imdb_id
+from sheepy.parser.clipboard_parser import ClipboardWorker
+from sheepy.parser.import_parser import ImportEntry, read_import_file
+from sheepy.util.string_util import (
+    check_for_imdb_id,
+    contains_imdb_id,
+    extract_imdb_ids,
+)
 
 
 class TestParser:
@@ -39,3 +46,93 @@ class TestParser:
         for case in testcases:
             actual = check_for_imdb_id(case.input)
             assert actual == case.expected, f"error in testcase {case.name}"
+
+    @pytest.mark.parametrize(
+        "content,expected",
+        [
+            ("tt0083658", ["tt0083658"]),
+            ("https://www.imdb.com/title/tt0083658/?ref_=fn_al_tt_1", ["tt0083658"]),
+            (
+                "watch tt0083658 and TT1856101, then tt0083658 again",
+                ["tt0083658", "tt1856101"],
+            ),
+            (
+                "imdb.com/title/tt12345678/\nimdb.com/title/tt0083658/",
+                ["tt12345678", "tt0083658"],
+            ),
+            ("tt123456789 att1234567 tt123456", []),
+            ("no ids here", []),
+        ],
+    )
+    def test_extract_imdb_ids(self, content, expected):
+        assert extract_imdb_ids(content) == expected
+        assert contains_imdb_id(content) == bool(expected)
+
+
+class TestClipboardWorker:
+    def test_coalesce_and_dedupe(self):
+        batches: list[list[str]] = []
+        worker = ClipboardWorker(lambda ids: batches.append(ids) or [], 0.2)
+        for value in ["tt0083658", "tt1856101", "TT0083658"]:
+            worker.submit(value)
+        worker._process([worker._queue.get() for _ in range(3)])
+        worker._process(["tt1856101"])
+        assert batches == [["tt0083658", "tt1856101"]]
+
+    def test_failed_values_are_retried(self):
+        batches: list[list[str]] = []
+
+        def callback(ids: list[str]) -> list[str]:
+            batches.append(ids)
+            return ["tt0000000"]
+
+        worker = ClipboardWorker(callback)
+        worker._process(["tt0083658", "tt0000000"])
+        worker._process(["tt0083658", "tt0000000"])
+        assert batches == [["tt0083658", "tt0000000"], ["tt0000000"]]
+
+    def test_run_batches_values(self):
+        batches: list[list[str]] = []
+        worker = ClipboardWorker(lambda ids: batches.append(ids) or [], 0.2)
+        worker.start()
+        worker.submit("tt0083658")
+        worker.submit("tt1856101")
+        for _ in range(50):
+            if batches:
+                break
+            time.sleep(0.05)
+        worker.stop()
+        worker.join()
+        assert batches == [["tt0083658", "tt1856101"]]
+
+
+class TestImportParser:
+    def test_imdb_export(self, tmp_path):
+        export = tmp_path / "ratings.csv"
+        export.write_text(
+            "Const,Your Rating,Title,URL,Year\n"
+            "tt0083658,9,Blade Runner,https://www.imdb.com/title/tt0083658/,1982\n"
+        )
+        assert list(read_import_file(str(export))) == [
+            (2, ImportEntry(imdb_id="tt0083658"))
+        ]
+
+    def test_letterboxd_export(self, tmp_path):
+        export = tmp_path / "watched.csv"
+        export.write_text(
+            "Date,Name,Year,Letterboxd URI\n"
+            '2024-01-01,"Blade Runner, The Final Cut",1982,https://boxd.it/1\n'
+            "2024-01-02,No Year,,https://boxd.it/2\n"
+        )
+        assert list(read_import_file(str(export))) == [
+            (2, ImportEntry(title="Blade Runner, The Final Cut", year=1982))
+        ]
+
+    def test_tsv_without_header(self, tmp_path):
+        export = tmp_path / "movies.tsv"
+        export.write_text("Alien\t1979\n\n# comment\ntt0083658\n")
+        entries = list(read_import_file(str(export)))
+        assert entries == [
+            (1, ImportEntry(title="Alien", year=1979)),
+            (4, ImportEntry(imdb_id="tt0083658")),
+        ]
@@ -0,0 +1,77 @@
+import pytest
+
+from sheepy.omdb import quota as quota_module
+from sheepy.omdb.quota import OmdbQuota, next_reset
+from sheepy.util.exceptions import OmdbQuotaError
+
+# 2024-01-01 12:00 UTC
+NOON = 1704110400.0
+
+
+@pytest.fixture
+def clock(mocker):
+    """Fake clock, sleeping advances it"""
+    now = [NOON]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    mocker.patch.object(quota_module.time, "time", side_effect=lambda: now[0])
+    return mocker.patch.object(quota_module.time, "sleep", side_effect=sleep)
+
+
+@pytest.fixture
+def quota(tmp_path, clock) -> OmdbQuota:
+    return OmdbQuota(
+        path=str(tmp_path / "quota.sqlite3"),
+        daily_limit=3,
+        rate_limit=100,
+        interactive_reserve=1,
+    )
+
+
+class TestOmdbQuota:
+    def test_next_reset(self):
+        assert next_reset(NOON) == NOON + 12 * 60 * 60
+
+    def test_acquire(self, quota):
+        quota.acquire()
+        assert quota.remaining() == 2
+
+    def test_shared_between_instances(self, quota):
+        quota.acquire()
+        other = OmdbQuota(path=quota.path, daily_limit=3)
+        other.acquire()
+        assert quota.remaining() == 1
+
+    def test_interactive_fails_when_used_up(self, quota, clock):
+        for _ in range(3):
+            quota.acquire()
+        with pytest.raises(OmdbQuotaError):
+            quota.acquire()
+        clock.assert_not_called()
+
+    def test_bulk_leaves_reserve_and_waits_for_reset(self, quota, clock):
+        quota.acquire(bulk=True)
+        quota.acquire(bulk=True)
+        quota.acquire(bulk=True)
+        clock.assert_called_once_with(12 * 60 * 60)
+        assert quota.remaining() == 2
+
+    def test_interactive_uses_reserve(self, quota, clock):
+        quota.acquire(bulk=True)
+        quota.acquire(bulk=True)
+        quota.acquire()
+        clock.assert_not_called()
+
+    def test_exhaust(self, quota):
+        quota.exhaust()
+        assert quota.remaining() == 0
+        with pytest.raises(OmdbQuotaError):
+            quota.acquire()
+
+    def test_rate_limit(self, tmp_path, clock):
+        quota = OmdbQuota(path=str(tmp_path / "quota.sqlite3"), rate_limit=2)
+        for _ in range(3):
+            quota.acquire()
+        clock.assert_called_once_with(pytest.approx(0.5))
@@ -0,0 +1,173 @@
+import http.client
+import io
+import os
+import stat
+import threading
+
+import pytest
+
+from sheepy.server import auth, client
+from sheepy.server.server import SheepyServer
+from sheepy.util.exceptions import MovieRetrievalError, ServerError
+
+
+@pytest.fixture
+def server(mocker, monkeypatch):
+    monkeypatch.setenv("SPREADSHEET_ID", "abc")
+    monkeypatch.setenv("WORKSHEET_INDEX", "0")
+    ss = mocker.Mock(spreadsheet_id="abc", worksheet_index="0")
+    ss.iter_csv.side_effect = lambda: iter(
+        [b"Watched?,Title\r\n", b"FALSE,Blade Runner"]
+    )
+    srv = SheepyServer(ss, port=0)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+class TestServer:
+    def test_forward_add(self, mocker, server):
+        add = mocker.patch(
+            "sheepy.server.server.add_movies_to_sheet",
+            return_value={"tt0000000": MovieRetrievalError("Incorrect IMDb ID.")},
+        )
+        failed = client.forward_add(
+            ["tt0083658", "tt0000000"],
+            True,
+            4,
+            port=server.server_address[1],
+            bulk=True,
+        )
+        assert failed == {"tt0000000": "Incorrect IMDb ID."}
+        add.assert_called_once_with(
+            ss=server.ss,
+            imdb_ids=["tt0083658", "tt0000000"],
+            watched=True,
+            max_workers=4,
+            bulk=True,
+        )
+
+    def test_forward_view(self, mocker, server):
+        mocker.patch(
+            "sheepy.server.server.process_movie_request_imdb_id",
+            return_value={"title": "Blade Runner"},
+        )
+        mocker.patch("sheepy.server.server.show_info", return_value="Blade Runner")
+        assert client.forward_view("tt0083658", server.server_address[1]) == (
+            "Blade Runner"
+        )
+
+    def test_forward_view_error(self, mocker, server):
+        mocker.patch(
+            "sheepy.server.server.process_movie_request_imdb_id",
+            side_effect=MovieRetrievalError("Incorrect IMDb ID."),
+        )
+        with pytest.raises(MovieRetrievalError):
+            client.forward_view("tt0000000", server.server_address[1])
+
+    def test_forward_download(self, server):
+        out = io.BytesIO()
+        assert client.forward_download(out, server.server_address[1])
+        assert out.getvalue() == b"Watched?,Title\r\nFALSE,Blade Runner"
+
+    def test_forward_download_error(self, server):
+        server.ss.iter_csv.side_effect = RuntimeError("export failed")
+        with pytest.raises(ServerError, match="export failed"):
+            client.forward_download(io.BytesIO(), server.server_address[1])
+
+    def test_download_does_not_block_add(self, mocker, server):
+        add = mocker.patch("sheepy.server.server.add_movies_to_sheet", return_value={})
+        streaming = threading.Event()
+
+        def slow_csv():
+            yield b"Watched?,Title\r\n"
+            # the export response is still streamed while movies are added
+            assert streaming.wait(5)
+            yield b"FALSE,Blade Runner"
+
+        server.ss.iter_csv.side_effect = slow_csv
+        out = io.BytesIO()
+        download = threading.Thread(
+            target=client.forward_download, args=(out, server.server_address[1])
+        )
+        download.start()
+        assert (
+            client.forward_add(["tt0083658"], False, 4, server.server_address[1]) == {}
+        )
+        streaming.set()
+        download.join()
+        add.assert_called_once()
+        assert out.getvalue() == b"Watched?,Title\r\nFALSE,Blade Runner"
+
+    @pytest.mark.parametrize(
+        "env", [{"SPREADSHEET_ID": "other"}, {"WORKSHEET_INDEX": "1"}]
+    )
+    def test_other_sheet_runs_locally(self, mocker, monkeypatch, server, env):
+        add = mocker.patch("sheepy.server.server.add_movies_to_sheet")
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        port = server.server_address[1]
+        assert client.forward_add(["tt0083658"], False, 4, port) is None
+        assert not client.forward_download(io.BytesIO(), port)
+        add.assert_not_called()
+        server.ss.iter_csv.assert_not_called()
+
+    def test_forward_add_error(self, mocker, server):
+        mocker.patch(
+            "sheepy.server.server.add_movies_to_sheet",
+            side_effect=RuntimeError("sheet unavailable"),
+        )
+        with pytest.raises(ServerError, match="sheet unavailable"):
+            client.forward_add(["tt0083658"], False, 4, port=server.server_address[1])
+
+    def test_connection_closed(self, mocker, server):
+        mocker.patch(
+            "urllib.request.urlopen",
+            side_effect=http.client.RemoteDisconnected("closed"),
+        )
+        with pytest.raises(ServerError):
+            client.forward_view("tt0083658", server.server_address[1])
+
+    @pytest.mark.parametrize(
+        "headers",
+        [
+            {"Host": "evil.example"},
+            {"Origin": "http://evil.example"},
+            {auth.TOKEN_HEADER: "wrong"},
+            {auth.TOKEN_HEADER: ""},
+        ],
+    )
+    def test_rejected_requests(self, mocker, server, headers):
+        add = mocker.patch("sheepy.server.server.add_movies_to_sheet")
+        connection = http.client.HTTPConnection(*server.server_address)
+        connection.request(
+            "POST",
+            "/add",
+            body=b'{"imdb_ids": ["tt0083658"]}',
+            headers={
+                "Content-Type": "text/plain",
+                auth.TOKEN_HEADER: server.token,
+                **headers,
+            },
+        )
+        assert connection.getresponse().status == 403
+        connection.close()
+        add.assert_not_called()
+
+    def test_token_file(self, server):
+        assert auth.read_token() == server.token
+        assert stat.S_IMODE(os.stat(auth._token_path()).st_mode) == 0o600
+        server.server_close()
+        assert auth.read_token() is None
+
+    def test_no_server_running(self, server):
+        port = server.server_address[1]
+        server.shutdown()
+        server.server_close()
+        assert client.forward_view("tt0083658", port) is None
+
+    def test_no_token(self, server):
+        os.remove(auth._token_path())
+        assert client.forward_view("tt0083658", server.server_address[1]) is None
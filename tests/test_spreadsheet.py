@@ -0,0 +1,402 @@
+import json
+import os
+import threading
+import time
+
+import gspread
+import pytest
+from gspread.http_client import HTTPClient
+from gspread.utils import a1_range_to_grid_range
+from gspread_formatting import CellFormat, format_cell_range
+
+from sheepy.spreadsheet import formatting, sheet_state
+from sheepy.spreadsheet.memory import InMemorySheets, memory_client
+from sheepy.spreadsheet.sheet_config import COLUMNS, SHEET_BACKGROUND_COLOR_ODD
+from sheepy.spreadsheet.spreadsheet import SheepySpreadsheet
+
+
+@pytest.fixture
+def ss(mocker) -> SheepySpreadsheet:
+    sh = SheepySpreadsheet.__new__(SheepySpreadsheet)
+    sh.logger = mocker.Mock()
+    sh.spreadsheet = mocker.Mock()
+    sh.spreadsheet_id = None
+    sh.worksheet_index = None
+    sh.formatted_rows = None
+    sh.worksheet = mocker.Mock(id=0, row_count=1000)
+    sh.worksheet._properties = {"gridProperties": {"rowCount": 1000}}
+    sh.worksheet.col_values.return_value = ["Title", "Blade Runner"]
+    return sh
+
+
+@pytest.fixture
+def movie_dict() -> dict[str, str]:
+    return {
+        "watched": "FALSE",
+        "title": "Blade Runner",
+        "year": "1982",
+        "genre": "Action, Drama, Sci-Fi",
+        "runtime": "117 min",
+        "suggested_by": "Jannes",
+        "imdb_rating": "8.1",
+        "tomatometer": "89%",
+        "director": "Ridley Scott",
+        "plot": "A blade runner must pursue and terminate four replicants.",
+        "poster": '=IMAGE("https://m.media-amazon.com/images/poster.jpg")',
+    }
+
+
+class TestSpreadsheet:
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            ('=IMAGE("url")', {"formulaValue": '=IMAGE("url")'}),
+            ("TRUE", {"boolValue": True}),
+            ("FALSE", {"boolValue": False}),
+            ("1982", {"numberValue": 1982.0}),
+            ("8.1", {"numberValue": 8.1}),
+            ("89%", {"numberValue": 0.89}),
+            ("N/A%", {"stringValue": "N/A%"}),
+            ("117 min", {"stringValue": "117 min"}),
+            ("N/A", {"stringValue": "N/A"}),
+            ("Inf", {"stringValue": "Inf"}),
+        ],
+    )
+    def test_to_extended_value(self, value, expected):
+        assert formatting._to_extended_value(value) == expected
+
+    def test_insert_rows_requests(self, ss, movie_dict):
+        requests = formatting.insert_rows_requests(
+            ss, 3, [list(movie_dict.values())] * 2
+        )
+        assert [next(iter(r)) for r in requests] == ["updateCells"]
+        update_cells = requests[0]["updateCells"]
+        assert update_cells["start"]["rowIndex"] == 2
+        assert len(update_cells["rows"]) == 2
+
+    def test_extend_data_rows_requests(self, ss):
+        ss.worksheet.row_count = 2000
+        requests, formatted_rows = formatting.extend_data_rows_requests(ss, 10, 20)
+        kinds = [next(iter(r)) for r in requests]
+        assert kinds == ["repeatCell", "updateDimensionProperties"]
+        assert "dataValidation" in requests[0]["repeatCell"]["cell"]
+        assert requests[0]["repeatCell"]["range"]["startRowIndex"] == 10
+        assert formatted_rows == 1020
+        assert formatting.extend_data_rows_requests(ss, 1020, 20) == ([], 1020)
+
+    def test_extend_data_rows_requests_grows_sheet(self, ss):
+        requests, formatted_rows = formatting.extend_data_rows_requests(ss, 990, 995)
+        assert requests[0]["appendDimension"]["length"] == 995
+        assert formatted_rows == 1995
+
+    def test_add_rows_to_sheet_single_request(self, ss, movie_dict):
+        ss.add_rows_to_sheet([movie_dict, movie_dict], append=False)
+        ss.spreadsheet.batch_update.assert_called_once()
+        ss.worksheet.update.assert_not_called()
+
+    def test_add_rows_to_sheet_append(self, ss, movie_dict):
+        ss.worksheet.append_rows.return_value = {
+            "updates": {"updatedRange": "'Sheepy'!A42:K43"}
+        }
+        ss.add_rows_to_sheet([movie_dict, movie_dict])
+        ss.worksheet.col_values.assert_not_called()
+        requests = ss.spreadsheet.batch_update.call_args.args[0]["requests"]
+        assert requests[0]["appendDimension"]["length"] == 43
+        assert requests[1]["repeatCell"]["range"]["startRowIndex"] == 41
+        assert requests[1]["repeatCell"]["range"]["endRowIndex"] == 1043
+        assert ss.formatted_rows == 1043
+
+    def test_add_rows_to_sheet_only_writes_values(self, ss, movie_dict):
+        ss.formatted_rows = 1043
+        ss.worksheet.append_rows.return_value = {
+            "updates": {"updatedRange": "'Sheepy'!A44:K45"}
+        }
+        ss.add_rows_to_sheet([movie_dict, movie_dict])
+        ss.spreadsheet.batch_update.assert_not_called()
+
+
+class TestDownloadCsv:
+    @pytest.fixture
+    def dl_ss(self, ss, mocker):
+        ss.client = mocker.Mock()
+        ss.worksheet = mocker.Mock(id=0, spreadsheet_id="abc")
+        ss.worksheet.title = "Sheepy"
+        ss.revision = "7"
+        response = mocker.MagicMock()
+        response.iter_content.return_value = [b"a,b\n", b"1,2\n"]
+        ss.client.http_client.session.get.return_value = response
+        return ss
+
+    def test_download_streams_to_file(self, dl_ss, tmp_path):
+        out = tmp_path / "movies.csv"
+        assert dl_ss.download_csv(str(out)) == [str(out)]
+        assert out.read_bytes() == b"a,b\n1,2\n"
+        params = dl_ss.client.http_client.session.get.call_args.kwargs["params"]
+        assert params == {"format": "csv", "gid": 0}
+
+    def test_download_to_stdout(self, dl_ss, capsysbinary):
+        dl_ss.download_csv("-")
+        assert capsysbinary.readouterr().out == b"a,b\n1,2\n"
+
+    def test_download_all_worksheets(self, dl_ss, mocker, tmp_path):
+        other = mocker.Mock(id=1, spreadsheet_id="abc")
+        other.title = "Watched"
+        dl_ss.spreadsheet.worksheets.return_value = [dl_ss.worksheet, other]
+        files = dl_ss.download_csv(str(tmp_path / "movies.csv"), all_worksheets=True)
+        assert files == [
+            str(tmp_path / "movies_Sheepy.csv"),
+            str(tmp_path / "movies_Watched.csv"),
+        ]
+        assert all(os.path.isfile(f) for f in files)
+
+    def test_download_all_worksheets_to_stdout(self, dl_ss):
+        with pytest.raises(ValueError):
+            dl_ss.download_csv("-", all_worksheets=True)
+
+    def test_download_skipped_if_unchanged(self, dl_ss, tmp_path):
+        out = str(tmp_path / "movies.csv")
+        dl_ss.download_csv(out)
+        assert dl_ss.download_csv(out) == []
+        dl_ss.client.http_client.session.get.assert_called_once()
+
+    def test_download_if_changed(self, dl_ss, tmp_path):
+        out = str(tmp_path / "movies.csv")
+        dl_ss.download_csv(out)
+        dl_ss.revision = "8"
+        assert dl_ss.download_csv(out) == [out]
+        assert dl_ss.client.http_client.session.get.call_count == 2
+
+    def test_download_forced(self, dl_ss, tmp_path):
+        out = str(tmp_path / "movies.csv")
+        dl_ss.download_csv(out)
+        assert dl_ss.download_csv(out, force=True) == [out]
+
+
+class TestOpenWorksheet:
+    @pytest.fixture(autouse=True)
+    def cache_dir(self, mocker, tmp_path):
+        mocker.patch("sheepy.util.file.CACHE_DIR", str(tmp_path))
+
+    @pytest.fixture
+    def revision(self) -> dict[str, str]:
+        return {"version": "5"}
+
+    @pytest.fixture
+    def new_ss(self, mocker, revision):
+        def build() -> SheepySpreadsheet:
+            sh = SheepySpreadsheet.__new__(SheepySpreadsheet)
+            sh.logger = mocker.Mock()
+            sh.client = mocker.Mock()
+            sh.client.http_client = mocker.Mock(spec=HTTPClient)
+            sh.client.http_client.request.return_value.json.side_effect = lambda: (
+                revision
+            )
+            spreadsheet = sh.client.open_by_key.return_value
+            spreadsheet.id = "abc"
+            spreadsheet._properties = {"id": "abc", "title": "Sheepy_Spreadsheet"}
+            worksheet = spreadsheet.get_worksheet.return_value
+            worksheet._properties = {"sheetId": 0, "title": "Sheepy", "index": 0}
+            worksheet.row_values.return_value = list(COLUMNS)
+            return sh
+
+        return build
+
+    def test_first_open_stores_metadata(self, new_ss):
+        sh = new_ss()
+        sh.open_worksheet("abc", "0")
+        sh.client.open_by_key.assert_called_once_with("abc")
+        sh.worksheet.row_values.assert_called_once_with(1)
+
+    def test_reopen_skips_metadata_and_headers(self, new_ss, mocker):
+        new_ss().open_worksheet("abc", "0")
+        sh = new_ss()
+        check_headers = mocker.patch("sheepy.spreadsheet.spreadsheet.check_headers")
+        sh.open_worksheet("abc", "0")
+        sh.client.open_by_key.assert_not_called()
+        check_headers.assert_not_called()
+        assert sh.spreadsheet.id == "abc"
+        assert sh.worksheet.id == 0
+        assert sh.client.http_client.request.call_count == 1
+
+    def test_reopen_checks_headers_on_new_revision(self, new_ss, mocker, revision):
+        new_ss().open_worksheet("abc", "0")
+        revision["version"] = "6"
+        sh = new_ss()
+        check_headers = mocker.patch("sheepy.spreadsheet.spreadsheet.check_headers")
+        sh.open_worksheet("abc", "0")
+        sh.client.open_by_key.assert_not_called()
+        check_headers.assert_called_once_with(sh)
+
+    def test_reopen_checks_headers_on_new_columns(self, new_ss, mocker):
+        new_ss().open_worksheet("abc", "0")
+        mocker.patch(
+            "sheepy.spreadsheet.spreadsheet.columns_hash", return_value="changed"
+        )
+        sh = new_ss()
+        check_headers = mocker.patch("sheepy.spreadsheet.spreadsheet.check_headers")
+        sh.open_worksheet("abc", "0")
+        check_headers.assert_called_once_with(sh)
+
+    def test_concurrent_state_updates(self, mocker):
+        read_states = sheet_state._read_states
+
+        def slow_read_states():
+            states = read_states()
+            time.sleep(0.01)
+            return states
+
+        mocker.patch.object(sheet_state, "_read_states", slow_read_states)
+        threads = [
+            threading.Thread(
+                target=sheet_state.save_sheet_state, args=(f"abc:{i}", {"i": i})
+            )
+            for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        sheet_state.update_sheet_state("abc:0", formatted_rows=1000)
+        sheet_state.update_sheet_state("missing:0", formatted_rows=1000)
+        assert sheet_state.load_sheet_state("abc:0") == {"i": 0, "formatted_rows": 1000}
+        assert all(sheet_state.load_sheet_state(f"abc:{i}") for i in range(8))
+        assert sheet_state.load_sheet_state("missing:0") is None
+
+
+class TestInMemoryBackend:
+    @pytest.fixture
+    def backend(self) -> InMemorySheets:
+        backend = InMemorySheets(seed=1)
+        backend.create_spreadsheet("abc", worksheet="Sheepy")
+        backend.add_rows("abc", [list(COLUMNS)])
+        return backend
+
+    @pytest.fixture
+    def mem_ss(self, backend) -> SheepySpreadsheet:
+        return SheepySpreadsheet("abc", "0", client=memory_client(backend))
+
+    def test_open_worksheet(self, mem_ss, backend):
+        assert mem_ss.worksheet.title == "Sheepy"
+        assert mem_ss.revision == "1"
+        assert backend.calls["values.get"] == 1
+
+    def test_headers_written_to_empty_sheet(self, backend):
+        backend.create_spreadsheet("empty", worksheet="Sheepy")
+        SheepySpreadsheet("empty", "0", client=memory_client(backend))
+        assert backend.spreadsheets["empty"].sheets[0].rows == [list(COLUMNS)]
+
+    def test_unknown_spreadsheet(self, backend):
+        with pytest.raises(SystemExit):
+            SheepySpreadsheet("missing", "0", client=memory_client(backend))
+
+    @pytest.mark.parametrize("append", [True, False])
+    def test_add_rows(self, mem_ss, backend, movie_dict, append):
+        backend.reset_calls()
+        mem_ss.add_rows_to_sheet([movie_dict] * 3, append=append)
+        assert backend.total_calls == 2
+        assert mem_ss.find_free_row() == 5
+        assert mem_ss.read_rows()[-1][1] == "Blade Runner"
+        assert mem_ss.read_row(4)[2] == "1982"
+        backend.reset_calls()
+        mem_ss.add_rows_to_sheet([movie_dict] * 3, append=append)
+        assert backend.updates == ({} if append else {"updateCells": 1})
+        assert backend.total_calls == 1 + (not append)
+
+    def test_insert_paths_write_same_cells(self, mem_ss, backend, movie_dict):
+        mem_ss.add_rows_to_sheet([movie_dict], append=True)
+        mem_ss.add_rows_to_sheet([movie_dict], append=False)
+        sheet = backend.spreadsheets["abc"].sheets[0]
+        assert sheet.rows[1] == sheet.rows[2]
+        assert sheet.number_formats == {(1, 7): "PERCENT", (2, 7): "PERCENT"}
+        assert mem_ss.read_rows() == [list(movie_dict.values())] * 2
+
+    def test_read_rows_as_displayed(self, mem_ss, backend, movie_dict):
+        mem_ss.add_rows_to_sheet([movie_dict])
+        cells = backend.spreadsheets["abc"].sheets[0].rows[1]
+        # Sheets stores "89%" as percent formatted number
+        assert cells[7] == 0.89
+        assert mem_ss.read_rows() == [list(movie_dict.values())]
+
+    def test_formatted_rows_stored(self, mem_ss, backend, movie_dict):
+        mem_ss.add_rows_to_sheet([movie_dict])
+        reopened = SheepySpreadsheet("abc", "0", client=memory_client(backend))
+        assert reopened.formatted_rows == mem_ss.formatted_rows == 1002
+        assert reopened.worksheet.row_count == 1002
+
+    def test_download_csv(self, mem_ss, movie_dict, tmp_path):
+        mem_ss.add_rows_to_sheet([movie_dict])
+        out = str(tmp_path / "movies.csv")
+        assert mem_ss.download_csv(out) == [out]
+        with open(out) as f:
+            assert f.read().splitlines()[1].startswith("FALSE,Blade Runner,1982")
+
+    def test_new_spreadsheet(self, backend):
+        sh = SheepySpreadsheet.from_new(client=memory_client(backend))
+        assert sh.worksheet.title == "Sheepy"
+        assert sh.read_row(1) == list(COLUMNS)
+
+    def test_new_spreadsheet_requests(self, backend):
+        backend.reset_calls()
+        sh = SheepySpreadsheet.from_new(
+            client=memory_client(backend), share_with="test@example.com"
+        )
+        assert backend.calls == {
+            "drive.create": 1,
+            "batchUpdate": 1,
+            "drive.permissions": 1,
+        }
+        assert sh.formatted_rows == sh.worksheet.row_count == 1000
+        assert backend.spreadsheets[sh.spreadsheet_id].permissions[0]["role"] == (
+            "writer"
+        )
+
+    def test_new_spreadsheet_banding(self, backend):
+        sh = SheepySpreadsheet.from_new(client=memory_client(backend))
+        sheet = backend.spreadsheets[sh.spreadsheet_id].sheets[sh.worksheet.index]
+        assert len(sheet.banded_ranges) == 1
+        backgrounds = [f for f in sheet.formats if "backgroundColor" in json.dumps(f)]
+        # backgrounds of single cells would cover the banding
+        assert backgrounds == []
+
+    def test_reformat(self, mem_ss, backend):
+        mem_ss.spreadsheet.batch_update({"requests": formatting.setup_requests(mem_ss)})
+        format_cell_range(
+            mem_ss.worksheet,
+            "A2:L2",
+            CellFormat(backgroundColor=SHEET_BACKGROUND_COLOR_ODD),
+        )
+        backend.reset_calls()
+        formatting.reformat_sheet(mem_ss)
+        sheet = backend.spreadsheets["abc"].sheets[0]
+        assert len(sheet.banded_ranges) == 1
+        assert backend.calls == {"spreadsheets.get": 1, "batchUpdate": 1}
+        assert backend.updates["deleteBanding"] == 1
+        formatting.reformat_sheet(mem_ss)
+        assert len(sheet.banded_ranges) == 1
+
+    def test_reformat_keeps_other_banding(self, mem_ss, backend):
+        mem_ss.spreadsheet.batch_update({"requests": formatting.setup_requests(mem_ss)})
+        other_range = a1_range_to_grid_range("N2:P9", mem_ss.worksheet.id)
+        mem_ss.spreadsheet.batch_update(
+            {"requests": [{"addBanding": {"bandedRange": {"range": other_range}}}]}
+        )
+        backend.reset_calls()
+        formatting.reformat_sheet(mem_ss)
+        sheet = backend.spreadsheets["abc"].sheets[0]
+        assert backend.updates["deleteBanding"] == 1
+        assert len(sheet.banded_ranges) == 2
+        assert sheet.banded_ranges[0]["range"] == other_range
+
+    def test_rate_limit(self, backend, mocker):
+        backend.rate_limit = 1.0
+        with pytest.raises(gspread.exceptions.APIError) as e:
+            SheepySpreadsheet("abc", "0", client=memory_client(backend))
+        assert e.value.code == 429
+        assert backend.calls["rate_limited"] == 1
+
+    def test_insert_into_large_sheet(self, mem_ss, backend, movie_dict):
+        backend.add_rows("abc", [list(movie_dict.values())] * 100_000)
+        backend.reset_calls()
+        mem_ss.add_rows_to_sheet([movie_dict] * 50)
+        assert backend.total_calls == 2
+        assert len(backend.spreadsheets["abc"].sheets[0].rows) == 100_051
@@ -0,0 +1,64 @@
+import subprocess
+import sys
+
+import pytest
+
+LAZY_MODULES = [
+    "dotenv",
+    "gspread",
+    "gspread_formatting",
+    "requests",
+    "tabulate",
+    "pyperclip",
+]
+
+
+def _import_times(statement: str) -> dict[str, int]:
+    """Runs statement in a fresh interpreter with -X importtime
+
+    Returns:
+        dict[str, int]: cumulative import time in microseconds per module
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+class TestStartup:
+    @pytest.mark.parametrize(
+        "statement",
+        [
+            "import sheepy",
+            "import sheepy.__main__",
+            "from sheepy.cli.cli import read_user_cli_args",
+            "import sheepy.parser.import_parser",
+        ],
+    )
+    def test_no_eager_imports(self, statement):
+        times = _import_times(statement)
+        assert not [m for m in LAZY_MODULES if m in times]
+
+    def test_no_import_side_effects(self, tmp_path):
+        subprocess.run(
+            [sys.executable, "-c", "import sheepy.__main__, sheepy.cli.cli"],
+            cwd=tmp_path,
+            env={"PATH": "", "PYTHONPATH": ":".join(sys.path)},
+            check=True,
+        )
+        assert list(tmp_path.iterdir()) == []
+
+    def test_startup_benchmark(self):
+        cli_time = _import_times("import sheepy.__main__")["sheepy.__main__"]
+        times = _import_times("import sheepy.core, sheepy.spreadsheet.spreadsheet")
+        full_time = times["sheepy.core"] + times["sheepy.spreadsheet.spreadsheet"]
+        assert cli_time < full_time
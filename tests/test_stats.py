@@ -0,0 +1,73 @@
+import io
+import json
+
+import pytest
+import requests
+
+from sheepy.util.stats import StatsRecorder
+
+
+def _fake_send(session, request, **kwargs) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b'{"values": []}'
+    response.headers["Content-Length"] = "14"
+    response.request = request
+    return response
+
+
+def sheets_call(session: requests.Session) -> None:
+    session.post(
+        "https://sheets.googleapis.com/v4/spreadsheets/abc:batchUpdate",
+        data=b"{}",
+    )
+
+
+@pytest.fixture
+def recorder(mocker) -> StatsRecorder:
+    # patching first restores the original send after the test
+    mocker.patch.object(requests.Session, "send", _fake_send)
+    recorder = StatsRecorder()
+    recorder.install()
+    return recorder
+
+
+class TestStatsRecorder:
+    def test_records_calls(self, recorder):
+        session = requests.Session()
+        sheets_call(session)
+        session.get("https://www.omdbapi.com/", params={"apikey": "secret"})
+        sheets, omdb = recorder.calls
+        assert sheets.category == "sheets"
+        assert sheets.endpoint == (
+            "POST sheets.googleapis.com/v4/spreadsheets/abc:batchUpdate"
+        )
+        assert sheets.caller == "unknown"
+        assert (sheets.status, sheets.sent, sheets.received) == (200, 2, 14)
+        assert omdb.category == "omdb"
+        assert "secret" not in omdb.endpoint
+
+    def test_summary(self, recorder):
+        session = requests.Session()
+        for _ in range(3):
+            sheets_call(session)
+        session.get("https://docs.google.com/export", stream=True)
+        summary = recorder.summary()
+        assert summary["categories"]["sheets"]["count"] == 3
+        assert summary["categories"]["sheets"]["received"] == 42
+        assert summary["categories"]["export"]["count"] == 1
+        assert len(summary["calls"]) == 4
+        assert summary["cache"] is None or "hits" in summary["cache"]
+
+    def test_print_summary_json(self, recorder):
+        sheets_call(requests.Session())
+        out = io.StringIO()
+        recorder.print_summary("json", out)
+        assert json.loads(out.getvalue())["categories"]["sheets"]["count"] == 1
+
+    def test_print_summary_text(self, recorder):
+        sheets_call(requests.Session())
+        out = io.StringIO()
+        recorder.print_summary("text", out)
+        assert "sheets" in out.getvalue()
+        assert "batchUpdate" in out.getvalue()
@@ -37,3 +37,21 @@ class TestUtil:
         assert test_url_name_year == string_util.build_request_url(
             self.base_url, self.fake_api_key, self.title, self.year
         )
+
+    def test_build_search_url(self):
+        assert string_util.build_search_url(
+            self.base_url, self.fake_api_key, self.title, 2, self.year
+        ) == ("http://www.omdbapi.com/?apikey=abc123&s=Test+Movie+2&page=2&y=1992")
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            ("117 min", 117),
+            ("89%", 89),
+            ("8.1", 8.1),
+            ("2010–2015", 2010),
+            ("N/A", None),
+        ],
+    )
+    def test_parse_number(self, value, expected):
+        assert string_util.parse_number(value) == expected